@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+The live readings stream (api/live/readings/) is an async view: serve the
+project through this application (e.g. `uvicorn core.asgi:application`) so
+open streams wait on Redis without holding a worker thread each.
 """
 
 import os
@@ -146,6 +146,15 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
         ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_RENDERER_CLASSES': (
+        'health_metrics.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'health_metrics.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 AUTH_USER_MODEL = 'users.UserProfile'
@@ -157,10 +166,82 @@ SIMPLE_JWT ={
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/1',
+        'OPTIONS': {
+            'socket_connect_timeout': 0.5,
+            'socket_timeout': 0.5,
+        },
+    }
+}
+
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
-CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
\ No newline at end of file
+CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+# Monthly partitions of the HeartRate/SpO2 tables (see health_metrics/partitions.py).
+# Months older than RETENTION_MONTHS are detached; None keeps everything.
+HEALTH_METRIC_PARTITIONS = {
+    'MONTHS_AHEAD': 3,
+    'RETENTION_MONTHS': None,
+    'DROP_DETACHED': False,
+}
+
+# Raw readings older than these many days are deleted once their hourly/daily
+# rollups are final (see health_metrics/retention.py). Keys are metric names,
+# then sources; 'default' covers the other sources and None keeps readings.
+HEALTH_METRIC_RETENTION = {
+    'heartrate': {'default': 30, 'manual': None},
+    'spo2': {'default': 30, 'manual': None},
+}
+
+# Streaming anomaly detection on ingested readings (see health_metrics/anomaly.py).
+# FIELDS maps metrics to value fields and their largest normal change per minute.
+HEALTH_METRIC_ANOMALY = {
+    'FIELDS': {
+        'heartrate': {'value': 25},
+        'spo2': {'value': 4},
+        'bloodpressure': {'systolic': 30, 'diastolic': 20},
+    },
+    'ZSCORE_THRESHOLD': 4.0,
+}
+
+# Pub/sub for the live readings stream at api/live/readings/ (see health_metrics/live.py).
+HEALTH_METRIC_LIVE = {
+    'ENABLED': True,
+    'REDIS_URL': 'redis://localhost:6379/2',
+    'KEEPALIVE_SECONDS': 15,
+}
+
+# ETag/Last-Modified of metric and dashboard endpoints (see health_metrics/conditional.py).
+# Validators also change every WINDOW_SECONDS, as many responses are relative to now.
+HEALTH_METRIC_CONDITIONAL_GET = {
+    'ENABLED': True,
+    'WINDOW_SECONDS': 60,
+}
+
+# Cached results of analytics actions (see health_metrics/result_cache.py).
+# Writes invalidate a user's results through MetricVersion; TIMEOUT_SECONDS bounds staleness of "last N days" results.
+HEALTH_METRIC_RESULT_CACHE = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'TIMEOUT_SECONDS': 60,
+}
+
+# Simulated readings (see data_simulation/engine.py and ticks.py): each tick is
+# split into chunk tasks of CHUNK_SIZE users, written BATCH_SIZE readings at a
+# time. A tick is skipped while the previous one runs, for at most LOCK_SECONDS.
+# With an integer SEED, every user's readings of a tick are reproducible.
+DATA_SIMULATION = {
+    'BATCH_SIZE': 5000,
+    'CHUNK_SIZE': 5000,
+    'CHUNK_RETRIES': 3,
+    'LOCK_SECONDS': 600,
+    'CACHE': 'default',
+    'SEED': None,
+}
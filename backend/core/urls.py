@@ -22,6 +22,7 @@ from django.urls import path, include
 urlpatterns = [
     path('api/', include('health_metrics.urls')),
     path('api/', include('users.urls')),
+    path('api/', include('data_simulation.urls')),
     path('api/token', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh', TokenRefreshView.as_view(), name='token_refresh_view'),
     path('admin/', admin.site.urls),
@@ -0,0 +1,257 @@
+"""
+Historical backfill of simulated readings, for load-testing datasets.
+
+The periodic tasks only simulate readings at the current time. A backfill
+replays their schedule over the past D days instead: heart rate and SpO2
+every few seconds to minutes, blood pressure at 06:00 and 18:00, daily
+steps and last night's sleep at 09:00 (UTC, as the beat schedule).
+
+High-frequency metrics are drawn for a block of users and every timestamp
+at once. Around the user's mean (scaled by the hour-of-day activity factor
+of the heart rate ticks), readings follow an AR(1) process, so consecutive
+readings drift like a real sensor instead of jumping independently; the
+spread over time is still the configured variance. Daily metrics reuse
+the tick functions of engine.py, once per scheduled time. Every user draws
+from their own streams (seeding.py), so a seed reproduces the same history
+however users are split into blocks and processes.
+
+Readings are written with COPY from CSV produced by pyarrow, bypassing the
+readings_created handlers; the command rebuilds rollups, baselines and
+versions of the backfilled users afterwards. Blocks of users are spread
+over worker processes, each with its own database connection.
+"""
+import io
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+from django.db import connection, transaction
+from health_metrics.models import BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
+from users.models import UserProfile
+from .engine import SIMULATORS, ConfigArrays, heart_rate_activity
+from .models import SimulationConfig
+from .seeding import METRIC_KEYS, UserStreams
+
+# Readings per COPY statement (and per block of users drawn at once)
+ROWS_PER_COPY = 1_000_000
+
+# Correlation time of the AR(1) noise of high-frequency readings, in seconds
+CORRELATION_SECONDS = 600
+
+ACTIVITY_LEVELS = ('sleeping', 'resting', 'active')
+
+# Fixed times of day (UTC) of the low-frequency metrics, as scheduled by setup_periodic_tasks
+DAILY_TIMES = {
+    BloodPressure: (timedelta(hours=6), timedelta(hours=18)),
+    DailySteps: (timedelta(hours=9),),
+    SleepDuration: (timedelta(hours=9),),
+}
+
+HIGH_FREQUENCY = (HeartRate, SpO2)
+
+
+def hourly_activity():
+    """Activity level index (into ACTIVITY_LEVELS) and factor of each UTC hour."""
+    levels, factors = zip(*(heart_rate_activity(hour) for hour in range(24)))
+    return np.array([ACTIVITY_LEVELS.index(level) for level in levels]), np.array(factors)
+
+
+def ar1(shocks, phi):
+    """
+    x[:, t] = phi * x[:, t - 1] + shocks[:, t] for every row, starting from 0 (0 < phi < 1).
+
+    Computed in blocks of time steps short enough for phi ** -length to stay
+    well within float64, each block with a cumulative sum instead of a loop.
+    """
+    if phi <= 0:
+        return shocks.copy()
+    length = max(1, min(256, int(12 / -math.log(phi))))
+    steps = np.arange(length)
+    powers, inverse = phi ** steps, phi ** -steps
+
+    out = np.empty_like(shocks)
+    carry = np.zeros(shocks.shape[0])
+    for start in range(0, shocks.shape[1], length):
+        block = shocks[:, start:start + length]
+        size = block.shape[1]
+        values = powers[:size] * (phi * carry[:, None] + np.cumsum(block * inverse[:size], axis=1))
+        out[:, start:start + size] = values
+        carry = values[:, -1]
+    return out
+
+
+def correlated_noise(rng, spread, steps, interval):
+    """AR(1) noise of `steps` readings `interval` seconds apart, with standard deviation `spread` per row."""
+    phi = math.exp(-interval / CORRELATION_SECONDS)
+    shocks = rng.standard_normal((len(spread), steps)) * math.sqrt(1 - phi ** 2)
+    return ar1(shocks, phi) * spread[:, None]
+
+
+def timestamp_array(epoch_seconds):
+    return pa.array(np.asarray(epoch_seconds, dtype=np.int64) * 1_000_000, type=pa.timestamp('us', tz='UTC'))
+
+
+def high_frequency_table(model, configs, start, steps, interval, rng):
+    """Readings of a block of users every `interval` seconds from `start` (epoch seconds)."""
+    times = start + np.arange(steps, dtype=np.int64) * interval
+    users = len(configs)
+    if model is HeartRate:
+        levels, factors = hourly_activity()
+        hours = (times // 3600) % 24
+        mean = configs.heart_rate_mean[:, None] + correlated_noise(rng, configs.heart_rate_variance, steps, interval)
+        values = np.clip(np.round(mean * factors[hours]), 40, 180)
+        extra = {
+            'activity_level': pc.take(pa.array(ACTIVITY_LEVELS), pa.array(np.tile(levels[hours], users)))
+        }
+    else:
+        mean = configs.spo2_mean[:, None] + correlated_noise(rng, configs.spo2_variance, steps, interval)
+        values = np.clip(np.round(mean), 70, 100)
+        extra = {'measurement_method': pa.array(np.full(users * steps, 'OTHER'))}
+
+    return pa.table({
+        'user_id': pa.array(np.repeat(configs.user_ids, steps)),
+        'timestamp': timestamp_array(np.tile(times, users)),
+        'value': pa.array(values.astype(np.int16).ravel()),
+        **extra,
+    })
+
+
+def arrow_column(values):
+    if isinstance(values, np.ndarray):
+        return pa.array(values)
+    if values and isinstance(values[0], datetime):
+        return pa.array(values, type=pa.timestamp('us', tz='UTC'))
+    return pa.array(values)
+
+
+def daily_table(model, configs, start, end, rng):
+    """Readings of a block of users at each of the metric's times of day between start and end."""
+    draw = SIMULATORS[model][1]
+    midnight = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    ticks = [
+        midnight + timedelta(days=day) + offset
+        for day in range((end - midnight).days + 1)
+        for offset in DAILY_TIMES[model]
+    ]
+    parts = []
+    for now in ticks:
+        if not start <= now < end:
+            continue
+        columns, constants = draw(configs, now, rng)
+        columns.update((name, [value] * len(configs)) for name, value in constants.items())
+        parts.append(pa.table({
+            'user_id': pa.array(configs.user_ids),
+            **{name: arrow_column(values) for name, values in columns.items()}
+        }))
+    return pa.concat_tables(parts) if parts else None
+
+
+def copy_table(model, table, loaded_at):
+    """Write a table of readings into the model's table with COPY ... FROM STDIN (CSV)."""
+    columns = {
+        **{name: table.column(name) for name in table.column_names},
+        'source': pa.array(np.full(table.num_rows, 'simulated')),
+        'created_at': timestamp_array(np.full(table.num_rows, loaded_at)),
+        'updated_at': timestamp_array(np.full(table.num_rows, loaded_at)),
+    }
+    table = pa.table(columns)
+    buffer = io.BytesIO()
+    pa_csv.write_csv(table, buffer, write_options=pa_csv.WriteOptions(include_header=False))
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    names = ', '.join(quote(model._meta.get_field(name).column) for name in table.column_names)
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(
+            f'COPY {quote(model._meta.db_table)} ({names}) FROM STDIN WITH (FORMAT csv)', buffer
+        )
+    return table.num_rows
+
+
+def backfill_users(models, user_ids, start, end, intervals, seed):
+    """
+    Write the history of these users' readings from `start` to `end` (UTC
+    datetimes). Run in a worker process for one block of users.
+
+    Args:
+        models: Metric models to backfill
+        user_ids: Users whose SimulationConfig drives the readings
+        intervals: Seconds between readings of each high-frequency model
+        seed: Seed of the users' streams, see seeding.py
+
+    Returns:
+        Dictionary of model name -> readings written
+    """
+    loaded_at = int(datetime.now(dt_timezone.utc).timestamp())
+    fields = sorted({field for model in models for field in SIMULATORS[model][0]})
+    configs = ConfigArrays.load(SimulationConfig.objects.filter(user_id__in=user_ids), fields)
+    written = {}
+
+    with transaction.atomic():
+        for model in models:
+            count = 0
+            if model in HIGH_FREQUENCY:
+                interval = intervals[model]
+                first = -(-int(start.timestamp()) // interval) * interval
+                steps = max(0, math.ceil((end.timestamp() - first) / interval))
+                block = max(1, ROWS_PER_COPY // max(steps, 1))
+                for offset in range(0, len(configs), block):
+                    users = ConfigArrays(
+                        configs.user_ids[offset:offset + block],
+                        {name: column[offset:offset + block] for name, column in configs.columns.items()}
+                    )
+                    if steps:
+                        rng = UserStreams(seed, users.user_ids, METRIC_KEYS[model])
+                        count += copy_table(model, high_frequency_table(model, users, first, steps, interval, rng),
+                                            loaded_at)
+            else:
+                rng = UserStreams(seed, configs.user_ids, METRIC_KEYS[model])
+                table = daily_table(model, configs, start, end, rng)
+                if table is not None:
+                    count += copy_table(model, table, loaded_at)
+            written[model._meta.model_name] = count
+    return written
+
+
+def ensure_users(count, prefix, rng):
+    """
+    The ids of `count` synthetic users `{prefix}-{i}@example.com`, creating
+    missing users with bulk_create and a SimulationConfig of their own means
+    and variances drawn around the model defaults.
+    """
+    emails = [f'{prefix}-{i}@example.com' for i in range(count)]
+    existing = set(UserProfile.objects.filter(email__in=emails).values_list('email', flat=True))
+    UserProfile.objects.bulk_create(
+        [UserProfile(email=email, password='!') for email in emails if email not in existing], batch_size=5000
+    )
+    user_ids = list(UserProfile.objects.filter(email__in=emails).order_by('id').values_list('id', flat=True))
+
+    # bulk_create skips the post_save handler creating configs
+    missing = sorted(set(user_ids) - set(
+        SimulationConfig.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True)
+    ))
+    size = len(missing)
+    draws = {
+        'heart_rate_mean': np.clip(rng.normal(72, 8, size), 55, 95),
+        'heart_rate_variance': rng.uniform(3, 8, size),
+        'systolic_mean': np.clip(rng.normal(120, 12, size), 95, 165),
+        'systolic_variance': rng.uniform(5, 12, size),
+        'diastolic_mean': np.clip(rng.normal(80, 8, size), 60, 105),
+        'diastolic_variance': rng.uniform(3, 7, size),
+        'pulse_mean': np.clip(np.round(rng.normal(72, 8, size)), 50, 95).astype(np.int64),
+        'pulse_variance': rng.integers(1, 5, size, endpoint=True),
+        'spo2_mean': np.clip(rng.normal(97, 1, size), 93, 99.5),
+        'spo2_variance': rng.uniform(0.5, 1.5, size),
+        'steps_mean': np.clip(np.round(rng.normal(8000, 2500, size)), 2000, 16000).astype(np.int64),
+        'steps_variance': rng.integers(1000, 3000, size, endpoint=True),
+        'sleep_mean': np.clip(rng.normal(7.3, 0.8, size), 5, 9.5),
+        'sleep_variance': rng.uniform(0.5, 1.2, size),
+    }
+    names = list(draws)
+    SimulationConfig.objects.bulk_create([
+        SimulationConfig(user_id=user_id, **dict(zip(names, row)))
+        for user_id, *row in zip(missing, *(column.tolist() for column in draws.values()))
+    ], batch_size=5000)
+    return user_ids
@@ -0,0 +1,178 @@
+"""
+Vectorized simulation of readings for many users at once.
+
+A simulation tick loads the SimulationConfig of every simulated user with a
+single query, as one NumPy array per field, draws all users' values with one
+call per reading field, and writes the readings with bulk_insert() in
+BATCH_SIZE chunks, so rollups, baselines, anomaly detection and the live
+feed see them as they see any other readings.
+
+The value rules (clipping, activity levels, bedtimes) live in the
+per-metric functions of SIMULATORS. Configured through
+settings.DATA_SIMULATION; with a SEED, ticks are reproducible (seeding.py).
+"""
+from datetime import timedelta
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from health_metrics.models import BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
+from .seeding import tick_streams
+
+DEFAULTS = {
+    'BATCH_SIZE': 5000,
+    # Sharded ticks, see ticks.py
+    'CHUNK_SIZE': 5000,
+    'CHUNK_RETRIES': 3,
+    'LOCK_SECONDS': 600,
+    'CACHE': 'default',
+    # Reproducible ticks, see seeding.py
+    'SEED': None,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'DATA_SIMULATION', {})}
+
+
+class ConfigArrays:
+    """The SimulationConfig fields of many users, one array per field, in user id order."""
+
+    def __init__(self, user_ids, columns):
+        self.user_ids = user_ids
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def __getattr__(self, name):
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @classmethod
+    def load(cls, queryset, fields):
+        """Read `fields` of every config in the queryset with one query."""
+        rows = queryset.order_by('user_id').values_list('user_id', *fields)
+        table = np.array(list(rows), dtype=np.float64).reshape(-1, len(fields) + 1)
+        return cls(table[:, 0].astype(np.int64), dict(zip(fields, table[:, 1:].T)))
+
+
+def heart_rate_activity(hour):
+    """Activity level of simulated heart rates at this hour, and the factor applied to the drawn value."""
+    if hour < 6 or hour > 22:
+        return 'sleeping', 0.9
+    if 9 <= hour < 17:
+        return 'active', 1.1
+    return 'resting', 1.05
+
+
+def heart_rates(configs, now, rng):
+    activity_level, factor = heart_rate_activity(now.hour)
+    values = rng.normal(configs.heart_rate_mean, configs.heart_rate_variance) * factor
+    return {'value': np.clip(np.round(values), 40, 180).astype(np.int64)}, {
+        'activity_level': activity_level, 'timestamp': now
+    }
+
+
+def blood_pressures(configs, now, rng):
+    systolic = np.clip(np.round(rng.normal(configs.systolic_mean, configs.systolic_variance)), 90, 180)
+    diastolic = np.maximum(60, np.minimum(systolic - 10, np.round(
+        rng.normal(configs.diastolic_mean, configs.diastolic_variance)
+    )))
+    pulse = np.clip(np.round(rng.normal(configs.pulse_mean, configs.pulse_variance)), 40, 100)
+    return {
+        'systolic': systolic.astype(np.int64),
+        'diastolic': diastolic.astype(np.int64),
+        'pulse': pulse.astype(np.int64),
+    }, {'timestamp': now}
+
+
+def spo2_levels(configs, now, rng):
+    values = np.clip(np.round(rng.normal(configs.spo2_mean, configs.spo2_variance)), 70, 100)
+    return {'value': values.astype(np.int64)}, {'measurement_method': 'OTHER', 'timestamp': now}
+
+
+def daily_steps(configs, now, rng):
+    count = np.clip(np.round(rng.normal(configs.steps_mean, configs.steps_variance)), 1000, 25000)
+    goal = np.clip(np.round(rng.normal(configs.steps_mean, configs.steps_variance)), 10000, 50000)
+    steps_per_km = rng.integers(1000, 2000, len(configs), endpoint=True)
+    return {
+        'count': count.astype(np.int64),
+        'goal': goal.astype(np.int64),
+        'distance': np.round(count / steps_per_km, 2),
+    }, {'timestamp': now, 'device': 'other'}
+
+
+def sleep_durations(configs, now, rng):
+    size = len(configs)
+    # Bedtime between 9 PM and 1 AM of last night, in quarter hours
+    hours = np.where(
+        rng.random(size) < 0.7, rng.integers(21, 24, size, endpoint=True), rng.integers(0, 1, size, endpoint=True)
+    ) % 24
+    minutes = hours * 60 + rng.choice([0, 15, 30, 45], size)
+    hours_asleep = np.clip(rng.normal(configs.sleep_mean, configs.sleep_variance), 3.0, 14.0)
+
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    start_time = [midnight + timedelta(minutes=value) for value in minutes.tolist()]
+    end_time = [start + timedelta(hours=value) for start, value in zip(start_time, hours_asleep.tolist())]
+    return {
+        'start_time': start_time,
+        'end_time': end_time,
+        'timestamp': start_time,
+        'quality': rng.integers(1, 10, size, endpoint=True),
+        'interruptions': rng.integers(0, 3, size, endpoint=True),
+    }, {}
+
+
+# Model -> (SimulationConfig fields it reads, function drawing its readings)
+SIMULATORS = {
+    HeartRate: (('heart_rate_mean', 'heart_rate_variance'), heart_rates),
+    BloodPressure: (
+        ('systolic_mean', 'systolic_variance', 'diastolic_mean', 'diastolic_variance', 'pulse_mean', 'pulse_variance'),
+        blood_pressures
+    ),
+    SpO2: (('spo2_mean', 'spo2_variance'), spo2_levels),
+    DailySteps: (('steps_mean', 'steps_variance'), daily_steps),
+    SleepDuration: (('sleep_mean', 'sleep_variance'), sleep_durations),
+}
+
+
+def simulate(model, configs, now=None, rng=None):
+    """
+    One simulated reading of `model` for every user of a SimulationConfig queryset.
+
+    Args:
+        model: One of SIMULATORS
+        configs: SimulationConfig queryset of the users to simulate
+        now: Time of the tick (default: now)
+        rng: numpy Generator to draw from (default: the users' own streams of this
+            tick with the SEED setting, otherwise a fresh Generator)
+
+    Returns:
+        Number of readings written
+    """
+    fields, draw = SIMULATORS[model]
+    configs = ConfigArrays.load(configs, fields)
+    if not len(configs):
+        return 0
+    now = now or timezone.now()
+    if rng is None:
+        seed = get_config()['SEED']
+        rng = np.random.default_rng() if seed is None else tick_streams(seed, model, configs.user_ids, now)
+
+    columns, constants = draw(configs, now, rng)
+    names = list(columns)
+    batch_size = get_config()['BATCH_SIZE']
+    user_ids = configs.user_ids.tolist()
+    for start in range(0, len(user_ids), batch_size):
+        end = start + batch_size
+        values = [
+            column[start:end].tolist() if isinstance(column, np.ndarray) else column[start:end]
+            for column in columns.values()
+        ]
+        model.objects.bulk_insert([
+            model(user_id=user_id, source='simulated', **dict(zip(names, row)), **constants)
+            for user_id, *row in zip(user_ids[start:end], *values)
+        ], batch_size=batch_size)
+    return len(user_ids)
@@ -0,0 +1,65 @@
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from data_simulation.engine import simulate
+from data_simulation.models import SimulationConfig
+from data_simulation.seeding import tick_streams
+from health_metrics.models import HeartRate
+from users.models import UserProfile
+
+# Time of the first tick of seeded runs
+SEEDED_START = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class Command(BaseCommand):
+    help = (
+        'Time one heart rate simulation tick (config load, draws and bulk writes with their signal '
+        'handlers) for many simulated users'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000, help='Simulated users')
+        parser.add_argument('--ticks', type=int, default=3, help='Ticks to time (best is reported)')
+        parser.add_argument(
+            '--seed', type=int,
+            help="Draw from the users' seeded streams at fixed tick times, so every run writes the same readings"
+        )
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(42)
+        size = options['users']
+
+        # Users, configs and readings are created inside a transaction that is rolled back at the end.
+        with transaction.atomic():
+            started = time.perf_counter()
+            users = UserProfile.objects.bulk_create([
+                UserProfile(email=f'benchmark-simulation-{i}@example.com', password='!') for i in range(size)
+            ], batch_size=5000)
+            SimulationConfig.objects.bulk_create([
+                SimulationConfig(user=user, heart_rate_mean=mean, heart_rate_variance=variance)
+                for user, mean, variance in zip(users, rng.normal(75, 8, size).tolist(), rng.uniform(2, 8, size).tolist())
+            ], batch_size=5000)
+            self.stdout.write(f'{size} users created in {time.perf_counter() - started:.1f}s')
+
+            configs = SimulationConfig.objects.filter(user__email__startswith='benchmark-simulation-')
+            timings = []
+            for tick in range(options['ticks']):
+                started = time.perf_counter()
+                if options['seed'] is None:
+                    created = simulate(HeartRate, configs, now=timezone.now(), rng=rng)
+                else:
+                    now = SEEDED_START + timedelta(minutes=tick)
+                    # Keyed by the users' index: ids of the rolled-back users change from run to run
+                    streams = tick_streams(options['seed'], HeartRate, range(size), now)
+                    created = simulate(HeartRate, configs, now=now, rng=streams)
+                timings.append(time.perf_counter() - started)
+                self.stdout.write(f'tick {tick + 1}: {created} readings in {timings[-1]:.2f}s')
+
+            transaction.set_rollback(True)
+
+        best = min(timings)
+        self.stdout.write(f'best tick: {best:.2f}s ({size / best:,.0f} readings/sec)')
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
@@ -11,6 +11,8 @@ class Command(BaseCommand):
             'Generate Blood Pressure',
             'Generate Oxygen Levels',
             'Generate Daily Metrics',
+            'Maintain Metric Partitions',
+            'Apply Retention Policies',
         ]
         PeriodicTask.objects.filter(name__in=task_names).delete()
 
@@ -49,6 +51,22 @@ class Command(BaseCommand):
             month_of_year='*',
         )
 
+        partition_schedule, _ = CrontabSchedule.objects.get_or_create(
+            minute='30',
+            hour='0',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+
+        retention_schedule, _ = CrontabSchedule.objects.get_or_create(
+            minute='0',
+            hour='1',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+        )
+
         # Recreate tasks
         PeriodicTask.objects.create(
             interval=heart_schedule,
@@ -80,4 +98,16 @@ class Command(BaseCommand):
             task='data_simulation.tasks.generate_daily_metrics_for_all_users',
         )
 
+        PeriodicTask.objects.create(
+            crontab=partition_schedule,
+            name='Maintain Metric Partitions',
+            task='health_metrics.tasks.maintain_metric_partitions',
+        )
+
+        PeriodicTask.objects.create(
+            crontab=retention_schedule,
+            name='Apply Retention Policies',
+            task='health_metrics.tasks.apply_retention_policies',
+        )
+
         self.stdout.write(self.style.SUCCESS('Successfully reset periodic tasks'))
@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone as dt_timezone
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from data_simulation.backfill import HIGH_FREQUENCY, backfill_users, ensure_users
+from health_metrics.models import METRIC_MODELS, BaselineStats, HeartRate, MetricRollup, MetricVersion, SpO2
+from health_metrics.partitions import ensure_partitions
+
+UNITS = {'s': 1, 'm': 60, 'h': 3600}
+
+
+def interval(value):
+    """Seconds of an interval such as 60s, 5m or 1h (plain numbers are seconds)."""
+    match = re.fullmatch(r'(\d+)([smh]?)', value.strip())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(value)
+    return int(match.group(1)) * UNITS[match.group(2) or 's']
+
+
+class Command(BaseCommand):
+    help = (
+        'Load simulated history of synthetic users: D days of readings on the beat schedule, generated '
+        'in parallel worker processes and written with COPY. Rollups, baselines and versions of the '
+        'users are rebuilt afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Synthetic users, created if missing')
+        parser.add_argument('--days', type=int, default=30, help='Days of history')
+        parser.add_argument('--end', help='End of the history, a date in YYYY-MM-DD format (default: now)')
+        parser.add_argument('--hr-interval', type=interval, default='60s', help='Time between heart rates (e.g. 60s)')
+        parser.add_argument('--spo2-interval', type=interval, default='5m', help='Time between SpO2 readings')
+        parser.add_argument(
+            '--metric', action='append', choices=[model._meta.model_name for model in METRIC_MODELS],
+            help='Metric to backfill, may be repeated (default: all)'
+        )
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes')
+        parser.add_argument('--block-users', type=int, default=200, help='Users per worker task')
+        parser.add_argument('--prefix', default='backfill', help='Email prefix of the synthetic users')
+        parser.add_argument(
+            '--seed', type=int, help='Seed of the random draws; with --end, reproduces the same history (default: random)'
+        )
+        parser.add_argument(
+            '--skip-aggregates', action='store_true', help="Don't rebuild rollups, baselines and versions"
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['days'] < 1 or options['block_users'] < 1 or options['workers'] < 1:
+            raise CommandError('--users, --days, --block-users and --workers must be positive')
+        models = [
+            model for model in METRIC_MODELS
+            if not options['metric'] or model._meta.model_name in options['metric']
+        ]
+        intervals = {HeartRate: options['hr_interval'], SpO2: options['spo2_interval']}
+        seed = options['seed'] if options['seed'] is not None else np.random.SeedSequence().entropy
+        end = timezone.now()
+        if options['end']:
+            try:
+                end = datetime.strptime(options['end'], '%Y-%m-%d').replace(tzinfo=dt_timezone.utc)
+            except ValueError:
+                raise CommandError('--end must be a date in YYYY-MM-DD format')
+        start = end - timedelta(days=options['days'])
+        self.stdout.write(f'seed {seed}, history from {start.isoformat()} to {end.isoformat()}')
+
+        started = time.perf_counter()
+        user_ids = ensure_users(options['users'], options['prefix'], np.random.default_rng(seed))
+        for model in HIGH_FREQUENCY:
+            if model in models:
+                ensure_partitions(model, since=start)
+        self.stdout.write(f'{len(user_ids)} users ready in {time.perf_counter() - started:.1f}s')
+
+        size = options['block_users']
+        blocks = [user_ids[offset:offset + size] for offset in range(0, len(user_ids), size)]
+        totals = dict.fromkeys((model._meta.model_name for model in models), 0)
+
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+        started = time.perf_counter()
+        with ProcessPoolExecutor(options['workers'], mp_context=multiprocessing.get_context('fork')) as pool:
+            futures = [
+                pool.submit(backfill_users, models, block, start, end, intervals, seed) for block in blocks
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                for name, count in future.result().items():
+                    totals[name] += count
+                self.stdout.write(f'block {done}/{len(blocks)}: {sum(totals.values()):,} readings')
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        for name, count in totals.items():
+            self.stdout.write(f'{name}: {count:,} readings')
+        self.stdout.write(f'{rows:,} readings in {elapsed:.1f}s ({rows / elapsed:,.0f} readings/sec)')
+
+        if not options['skip_aggregates']:
+            for model in models:
+                started = time.perf_counter()
+                rollups = MetricRollup.objects.rebuild(model, users=user_ids, since=start)
+                baselines = BaselineStats.objects.rebuild(model, users=user_ids)
+                MetricVersion.objects.bump(model, user_ids)
+                self.stdout.write(
+                    f'{model._meta.model_name}: {rollups} rollup rows, {baselines} baselines '
+                    f'in {time.perf_counter() - started:.1f}s'
+                )
+        self.stdout.write(self.style.SUCCESS('Backfill complete'))
@@ -0,0 +1,81 @@
+"""
+Reproducible simulation.
+
+With a seed, every user draws from a numpy Generator of their own, derived
+from the seed, the user id and the key of the draw (metric, tick time) as a
+SeedSequence spawn key. A user's readings then depend only on the seed,
+the user and the tick, not on the chunk, worker or process simulating them,
+so two runs with the same seed write identical datasets however their work
+is sharded.
+
+Drawing one value per Generator is slower than one vectorized draw for all
+users, so seeded simulation is meant for benchmarks and fixtures. Enabled
+through settings.DATA_SIMULATION['SEED'] for the ticks, --seed for the
+management commands.
+"""
+import numpy as np
+from health_metrics.models import BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
+
+# Metric keys of the users' streams; stable, never reuse or renumber
+METRIC_KEYS = {
+    HeartRate: 1,
+    BloodPressure: 2,
+    SpO2: 3,
+    DailySteps: 4,
+    SleepDuration: 5,
+}
+
+
+def user_generator(seed, user_id, *key):
+    """The Generator of one user's draws of `key` (e.g. metric key and tick time)."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(int(user_id), *key)))
+
+
+class UserStreams:
+    """
+    Draws of one value per user, each from the user's own Generator.
+
+    Implements the part of the numpy Generator interface the simulation
+    draws use, for a size of one value per user (or a row per user for
+    standard_normal), so it can be passed wherever they take an `rng`.
+    """
+
+    def __init__(self, seed, user_ids, *key):
+        self.generators = [user_generator(seed, user_id, *key) for user_id in user_ids]
+
+    def __len__(self):
+        return len(self.generators)
+
+    def check_size(self, size):
+        if size is not None and size != len(self):
+            raise ValueError(f"UserStreams draw one value per user ({len(self)}), not {size}")
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        self.check_size(size)
+        return np.array([generator.standard_normal() for generator in self.generators]) * scale + loc
+
+    def standard_normal(self, size=None):
+        """One value per user, or a row of `size[1]` values per user for a (users, n) size."""
+        if isinstance(size, tuple):
+            self.check_size(size[0])
+            return np.array([generator.standard_normal(size[1]) for generator in self.generators]).reshape(size)
+        return self.normal(size=size)
+
+    def random(self, size=None):
+        self.check_size(size)
+        return np.array([generator.random() for generator in self.generators])
+
+    def integers(self, low, high=None, size=None, endpoint=False):
+        self.check_size(size)
+        return np.array(
+            [generator.integers(low, high, endpoint=endpoint) for generator in self.generators], dtype=np.int64
+        )
+
+    def choice(self, a, size=None):
+        options = np.asarray(a)
+        return options[self.integers(0, len(options), size=size)]
+
+
+def tick_streams(seed, model, user_ids, now):
+    """The UserStreams of a simulation tick of `model` at `now`."""
+    return UserStreams(seed, user_ids, METRIC_KEYS[model], int(now.timestamp()))
@@ -1,32 +1,69 @@
-from celery import shared_task
-from users.models import UserProfile , Role
-from .generators import(
-    BloodPressureGenerator,
-    DailyStepsGenerator,
-    HeartRateGenerator,
-    SleepDurationGenerator,
-    SpO2Generator
-)
+import time
+from celery import chord, shared_task
+from django.db import DatabaseError
+from django.utils import timezone
+from .engine import get_config
+from .ticks import acquire_lock, count_skipped, id_ranges, record_tick, release_lock, run_chunk
 
 
+def start_tick(tick):
+    """
+    Coordinate one tick: dispatch a simulate_chunk task per id range, with
+    finish_tick as the chord callback. Skipped while the previous tick runs.
+
+    Returns:
+        Number of chunks dispatched, None if the tick was skipped
+    """
+    token = acquire_lock(tick)
+    if token is None:
+        count_skipped(tick)
+        return None
+
+    started = time.monotonic()
+    timestamp = timezone.now().isoformat()
+    try:
+        ranges = id_ranges(tick)
+        if not ranges:
+            release_lock(tick, token)
+            return 0
+        chord(
+            simulate_chunk.s(tick, start_id, end_id, timestamp) for start_id, end_id in ranges
+        )(finish_tick.s(tick, timestamp, time.monotonic() - started, token))
+    except Exception:
+        release_lock(tick, token)
+        raise
+    return len(ranges)
+
+
+@shared_task(bind=True, acks_late=True)
+def simulate_chunk(self, tick, start_id, end_id, timestamp):
+    """Simulate one id range of a tick, retried with backoff on database errors"""
+    try:
+        return run_chunk(tick, start_id, end_id, timestamp)
+    except DatabaseError as exc:
+        raise self.retry(exc=exc, countdown=2 ** self.request.retries, max_retries=get_config()['CHUNK_RETRIES'])
+
+@shared_task
+def finish_tick(results, tick, timestamp, dispatch_seconds, token):
+    """Chord callback: record the tick's metrics and let the next tick start"""
+    try:
+        return record_tick(tick, timestamp, dispatch_seconds, results)
+    finally:
+        release_lock(tick, token)
+
 @shared_task
 def generate_blood_pressure_for_only_users():
-    for user_profile in UserProfile.objects.filter(role=Role.USER):
-        BloodPressureGenerator(user_profile).generate()
+    return start_tick('blood_pressure')
 
 @shared_task
 def generate_heart_rate_for_only_users():
-    for user_profile in UserProfile.objects.filter(role=Role.USER):
-        HeartRateGenerator(user_profile).generate()
+    return start_tick('heart_rate')
 
 @shared_task
 def generate_spo2_for_all_users():
-    for user_profile in UserProfile.objects.all():
-        SpO2Generator(user_profile).generate()
+    return start_tick('spo2')
 
 @shared_task
 def generate_daily_metrics_for_all_users():
     """Generate daily metrics like steps and sleep"""
-    for user_profile in UserProfile.objects.all():
-        DailyStepsGenerator(user_profile).generate()
-        SleepDurationGenerator(user_profile).generate()
\ No newline at end of file
+    return start_tick('daily_metrics')
@@ -0,0 +1,33 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+from core.celery import app
+from ..models import SimulationConfig
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def tick_cache(settings):
+    # Locks and tick metrics go to an in-process cache instead of the shared Redis one
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    yield
+    caches['default'].clear()
+
+
+@pytest.fixture
+def eager_celery():
+    app.conf.update(task_always_eager=True, task_eager_propagates=True)
+    yield
+    app.conf.update(task_always_eager=False, task_eager_propagates=False)
+
+
+@pytest.fixture
+def users():
+    users = [
+        User.objects.create_user(email=f'simulated-{i}@example.com', password=None)
+        for i in range(12)
+    ]
+    SimulationConfig.objects.filter(user=users[0]).update(heart_rate_mean=150, heart_rate_variance=0)
+    return users
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from health_metrics.models import BloodPressure, DailySteps, HeartRate, SleepDuration
+from ..backfill import ar1, backfill_users, ensure_users
+from ..models import SimulationConfig
+
+NOON = datetime(2025, 3, 10, 12, 0, tzinfo=dt_timezone.utc)
+
+
+@pytest.mark.django_db
+class TestBackfill:
+
+    def test_ar1_matches_recurrence(self):
+        """Test that the blocked AR(1) scan equals the step-by-step recurrence"""
+        shocks = np.random.default_rng(3).standard_normal((4, 1000))
+        expected = np.empty_like(shocks)
+        previous = np.zeros(4)
+        for t in range(shocks.shape[1]):
+            previous = 0.95 * previous + shocks[:, t]
+            expected[:, t] = previous
+
+        np.testing.assert_allclose(ar1(shocks, 0.95), expected, rtol=1e-9, atol=1e-9)
+
+    def test_backfill_users(self):
+        """Test that a backfill writes every scheduled reading inside the window"""
+        user_ids = ensure_users(3, 'backfill-test', np.random.default_rng(4))
+        assert SimulationConfig.objects.filter(user_id__in=user_ids).count() == 3
+        assert ensure_users(3, 'backfill-test', np.random.default_rng(4)) == user_ids
+
+        start, end = NOON - timedelta(days=2), NOON
+        written = backfill_users(
+            [HeartRate, BloodPressure, DailySteps, SleepDuration], user_ids, start, end, {HeartRate: 3600}, seed=5
+        )
+
+        assert written == {'heartrate': 3 * 48, 'bloodpressure': 3 * 4, 'dailysteps': 3 * 2, 'sleepduration': 3 * 2}
+        readings = HeartRate.objects.filter(user_id__in=user_ids)
+        assert readings.filter(timestamp__gte=start, timestamp__lt=end).count() == 3 * 48
+        assert set(readings.filter(timestamp=NOON - timedelta(hours=9)).values_list('activity_level', flat=True)) == {
+            'sleeping'
+        }
+        assert set(readings.filter(timestamp=NOON - timedelta(hours=1)).values_list('activity_level', flat=True)) == {
+            'active'
+        }
+        assert not BloodPressure.objects.filter(user_id__in=user_ids, timestamp__gte=end).exists()
+        assert set(SleepDuration.objects.filter(user_id__in=user_ids).values_list('source', flat=True)) == {'simulated'}
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from datetime import datetime, timezone as dt_timezone
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from health_metrics.models import BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
+from ..engine import heart_rate_activity, simulate
+from ..models import SimulationConfig
+
+NOON = datetime(2025, 3, 10, 12, 0, tzinfo=dt_timezone.utc)
+
+
+@pytest.mark.django_db
+class TestSimulationEngine:
+
+    def test_one_reading_per_user(self, users):
+        """Test that a tick writes one reading per config with the config's distribution"""
+        created = simulate(HeartRate, SimulationConfig.objects.all(), now=NOON, rng=np.random.default_rng(1))
+
+        readings = HeartRate.objects.filter(timestamp=NOON)
+        assert created == 12
+        assert sorted(readings.values_list('user_id', flat=True)) == sorted(user.id for user in users)
+        assert readings.get(user=users[0]).value == 165
+        assert set(readings.values_list('activity_level', 'source').distinct()) == {('active', 'simulated')}
+
+    def test_config_query_and_batches(self, users, settings):
+        """Test that configs are read with one query and readings are written in chunks"""
+        settings.DATA_SIMULATION = {'BATCH_SIZE': 5}
+
+        with CaptureQueriesContext(connection) as context:
+            simulate(SpO2, SimulationConfig.objects.all(), now=NOON)
+
+        sql = [query['sql'] for query in context.captured_queries]
+        assert sum('data_simulation_simulationconfig' in statement for statement in sql) == 1
+        assert sum(statement.startswith('INSERT INTO "health_metrics_spo2"') for statement in sql) == 3
+        assert SpO2.objects.count() == 12
+        assert all(70 <= value <= 100 for value in SpO2.objects.values_list('value', flat=True))
+
+    def test_value_rules(self, users):
+        """Test that drawn values are clipped to each metric's valid range"""
+        rng = np.random.default_rng(2)
+        for model in (BloodPressure, DailySteps, SleepDuration):
+            simulate(model, SimulationConfig.objects.all(), now=NOON, rng=rng)
+
+        for pressure in BloodPressure.objects.all():
+            assert 90 <= pressure.systolic <= 180
+            assert 60 <= pressure.diastolic <= max(60, pressure.systolic - 10)
+            assert 40 <= pressure.pulse <= 100
+        for steps in DailySteps.objects.all():
+            assert 1000 <= steps.count <= 25000 and steps.goal >= 10000
+            assert steps.count / 2000 - 0.01 <= steps.distance <= steps.count / 1000 + 0.01
+        for sleep in SleepDuration.objects.all():
+            assert 3 <= sleep.duration <= 14
+            assert sleep.start_time.minute in (0, 15, 30, 45)
+            assert sleep.start_time < NOON
+
+    def test_same_rng_same_readings(self, users):
+        """Test that a tick only depends on the configs, the time and the generator"""
+        simulate(HeartRate, SimulationConfig.objects.all(), now=NOON, rng=np.random.default_rng(3))
+        first = list(HeartRate.objects.order_by('user_id').values_list('value', flat=True))
+        HeartRate.objects.all().delete()
+
+        simulate(HeartRate, SimulationConfig.objects.all(), now=NOON, rng=np.random.default_rng(3))
+
+        assert list(HeartRate.objects.order_by('user_id').values_list('value', flat=True)) == first
+
+    def test_activity_levels(self):
+        """Test that every hour maps to an activity level"""
+        assert [heart_rate_activity(hour)[0] for hour in (3, 7, 12, 18, 22, 23)] == [
+            'sleeping', 'resting', 'active', 'resting', 'resting', 'sleeping'
+        ]
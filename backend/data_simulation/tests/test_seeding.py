@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from health_metrics.models import BloodPressure, DailySteps, HeartRate, SleepDuration
+from ..backfill import backfill_users, ensure_users
+from ..seeding import UserStreams
+from ..ticks import run_chunk
+
+NOON = datetime(2025, 3, 10, 12, 0, tzinfo=dt_timezone.utc)
+
+
+@pytest.mark.django_db
+class TestSeededSimulation:
+
+    @staticmethod
+    def readings(model, *fields):
+        return list(model.objects.order_by('user_id', 'timestamp').values_list('user_id', *fields))
+
+    def test_streams_are_per_user(self):
+        """Test that a user's draws don't depend on the other users drawn with them"""
+        together = UserStreams(7, [1, 2, 3], 1, 0)
+        alone = UserStreams(7, [3], 1, 0)
+
+        assert together.normal(0, 1)[2] == alone.normal(0, 1)[0]
+        assert together.integers(0, 100, size=3)[2] == alone.integers(0, 100, size=1)[0]
+        assert UserStreams(7, [3], 1, 60).normal(0, 1)[0] != UserStreams(7, [3], 1, 0).normal(0, 1)[0]
+        with pytest.raises(ValueError):
+            together.random(size=2)
+
+    def test_same_seed_regardless_of_chunks(self, users, settings):
+        """Test that seeded ticks write the same readings however the users are chunked"""
+        settings.DATA_SIMULATION = {'SEED': 11}
+        run_chunk('daily_metrics', users[0].id, None, NOON.isoformat())
+        steps = self.readings(DailySteps, 'count', 'goal', 'distance')
+        sleeps = self.readings(SleepDuration, 'start_time', 'end_time', 'quality')
+        DailySteps.objects.all().delete()
+        SleepDuration.objects.all().delete()
+
+        for start, end in [(0, 5), (5, 9), (9, None)]:
+            run_chunk('daily_metrics', users[start].id, end and users[end].id, NOON.isoformat())
+
+        assert self.readings(DailySteps, 'count', 'goal', 'distance') == steps
+        assert self.readings(SleepDuration, 'start_time', 'end_time', 'quality') == sleeps
+
+        settings.DATA_SIMULATION = {'SEED': 12}
+        DailySteps.objects.all().delete()
+        run_chunk('daily_metrics', users[0].id, None, NOON.isoformat())
+        assert self.readings(DailySteps, 'count', 'goal', 'distance') != steps
+
+    def test_backfill_regardless_of_blocks(self):
+        """Test that a seeded backfill writes the same history in one block or per user"""
+        user_ids = ensure_users(3, 'seeded-backfill', np.random.default_rng(4))
+        start, end = NOON - timedelta(days=1), NOON
+        backfill_users([HeartRate, BloodPressure], user_ids, start, end, {HeartRate: 600}, seed=9)
+        heart_rates = self.readings(HeartRate, 'timestamp', 'value')
+        pressures = self.readings(BloodPressure, 'timestamp', 'systolic', 'diastolic', 'pulse')
+        HeartRate.objects.all().delete()
+        BloodPressure.objects.all().delete()
+
+        for user_id in reversed(user_ids):
+            backfill_users([HeartRate, BloodPressure], [user_id], start, end, {HeartRate: 600}, seed=9)
+
+        assert self.readings(HeartRate, 'timestamp', 'value') == heart_rates
+        assert self.readings(BloodPressure, 'timestamp', 'systolic', 'diastolic', 'pulse') == pressures
@@ -0,0 +1,76 @@
+import pytest
+from datetime import datetime, timezone as dt_timezone
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from health_metrics.models import DailySteps, HeartRate, SleepDuration, SpO2
+from users.models import Role
+from ..tasks import (
+    generate_daily_metrics_for_all_users,
+    generate_heart_rate_for_only_users,
+    generate_spo2_for_all_users
+)
+from ..ticks import acquire_lock, get_tick_stats, lock_key, run_chunk
+
+User = get_user_model()
+
+NOON = datetime(2025, 3, 10, 12, 0, tzinfo=dt_timezone.utc)
+
+
+@pytest.mark.django_db
+class TestShardedTicks:
+
+    def test_chunks_cover_every_user(self, users, settings, eager_celery):
+        """Test that a tick fans out per id range and records its metrics"""
+        settings.DATA_SIMULATION = {'CHUNK_SIZE': 5}
+
+        chunks = generate_heart_rate_for_only_users()
+
+        stats = get_tick_stats()['heart_rate']
+        assert chunks == 3
+        assert HeartRate.objects.count() == 12
+        assert HeartRate.objects.values('timestamp').distinct().count() == 1
+        assert stats['readings'] == 12 and stats['chunks'] == 3 and stats['ticks'] == 1
+        assert stats['lag_seconds'] >= stats['queue_seconds'] >= 0
+        assert caches['default'].get(lock_key('heart_rate')) is None
+
+    def test_tasks_respect_roles(self, users, eager_celery):
+        """Test that heart rates are only simulated for patients, daily metrics for everyone"""
+        User.objects.filter(id=users[1].id).update(role=Role.DOCTOR)
+
+        generate_heart_rate_for_only_users()
+        generate_daily_metrics_for_all_users()
+
+        assert HeartRate.objects.count() == 11
+        assert not HeartRate.objects.filter(user=users[1]).exists()
+        assert DailySteps.objects.count() == SleepDuration.objects.count() == 12
+
+    def test_overlapping_tick_is_skipped(self, users, eager_celery):
+        """Test that a tick doesn't start while the previous one holds the lock"""
+        acquire_lock('spo2')
+
+        assert generate_spo2_for_all_users() is None
+        assert not SpO2.objects.exists()
+        assert get_tick_stats()['spo2'] == {'skipped': 1}
+
+    def test_chunk_range(self, users):
+        """Test that a chunk only simulates the users of its id range"""
+        result = run_chunk('spo2', users[3].id, users[6].id, NOON.isoformat())
+
+        assert result['readings'] == 3
+        assert set(SpO2.objects.values_list('user_id', flat=True)) == {user.id for user in users[3:6]}
+
+    def test_stats_endpoint(self, users):
+        """Test that staff can read the tick metrics and patients can't"""
+        client = APIClient()
+        client.force_authenticate(user=users[0])
+        assert client.get(reverse('simulation-ticks')).status_code == 403
+
+        staff = User.objects.create_user(email='staff@example.com', password=None, is_staff=True)
+        client.force_authenticate(user=staff)
+        response = client.get(reverse('simulation-ticks'))
+
+        assert response.status_code == 200
+        assert response.data['ticks'] == {'heart_rate': None, 'blood_pressure': None, 'spo2': None, 'daily_metrics': None}
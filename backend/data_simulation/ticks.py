@@ -0,0 +1,163 @@
+"""
+Sharded simulation ticks.
+
+Every beat task is the coordinator of one tick: it takes the tick's lock,
+splits the simulated users into id ranges of CHUNK_SIZE users and
+dispatches one chunk task per range as a Celery chord (see tasks.py). Chunks
+run on any worker, so a tick's throughput grows with the number of workers;
+the chord's callback records the tick's metrics and releases the lock.
+
+A tick is skipped while the previous tick of the same kind still holds the
+lock, so slow ticks don't pile up. The lock expires after LOCK_SECONDS in
+case the callback never runs (a chunk out of retries). A chunk writes its
+readings in one transaction, so a retried chunk never writes twice. With a
+SEED, users draw from their own streams (seeding.py), so a chunk's readings
+are the same however the tick is chunked or retried.
+
+Tick metrics (lag behind the tick time, chunk queueing, readings, skipped
+ticks) are kept in the cache for every worker to update, see get_tick_stats().
+Configured through settings.DATA_SIMULATION.
+"""
+import logging
+import uuid
+from datetime import datetime
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from health_metrics.models import BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
+from users.models import Role
+from .engine import get_config, simulate
+from .models import SimulationConfig
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'data_simulation:ticks'
+
+# Users whose readings a tick simulates
+SELECTIONS = {
+    'patients': lambda: SimulationConfig.objects.filter(user__role=Role.USER),
+    'all': lambda: SimulationConfig.objects.all(),
+}
+
+# Tick -> (metrics simulated for every user, selection)
+TICKS = {
+    'heart_rate': ((HeartRate,), 'patients'),
+    'blood_pressure': ((BloodPressure,), 'patients'),
+    'spo2': ((SpO2,), 'all'),
+    'daily_metrics': ((DailySteps, SleepDuration), 'all'),
+}
+
+
+def get_cache():
+    return caches[get_config()['CACHE']]
+
+
+def lock_key(tick):
+    return f'{KEY_PREFIX}:{tick}:lock'
+
+
+def stats_key(tick):
+    return f'{KEY_PREFIX}:{tick}:stats'
+
+
+def acquire_lock(tick):
+    """A token for release_lock(), or None while the previous tick holds the lock."""
+    token = uuid.uuid4().hex
+    if get_cache().add(lock_key(tick), token, timeout=get_config()['LOCK_SECONDS']):
+        return token
+    return None
+
+
+def release_lock(tick, token):
+    """Release the lock if it is still the one taken with this token."""
+    cache = get_cache()
+    if cache.get(lock_key(tick)) == token:
+        cache.delete(lock_key(tick))
+
+
+def id_ranges(tick):
+    """
+    Id ranges of the users a tick simulates, CHUNK_SIZE users each.
+
+    Returns:
+        List of (first user id, end user id) pairs, the end excluded and None for the last range
+    """
+    chunk_size = get_config()['CHUNK_SIZE']
+    metrics, selection = TICKS[tick]
+    user_ids = list(SELECTIONS[selection]().order_by('user_id').values_list('user_id', flat=True))
+    starts = user_ids[::chunk_size]
+    return list(zip(starts, [*starts[1:], None]))
+
+
+def run_chunk(tick, start_id, end_id, timestamp):
+    """
+    Simulate the tick's readings of the users with start_id <= id < end_id.
+
+    Returns:
+        Dictionary of readings written, the chunk's start as an ISO timestamp and its seconds
+    """
+    started = timezone.now()
+    metrics, selection = TICKS[tick]
+    configs = SELECTIONS[selection]().filter(user_id__gte=start_id)
+    if end_id is not None:
+        configs = configs.filter(user_id__lt=end_id)
+
+    now = datetime.fromisoformat(timestamp)
+    with transaction.atomic():
+        readings = sum(simulate(model, configs, now=now) for model in metrics)
+    return {
+        'readings': readings,
+        'started': started.isoformat(),
+        'seconds': round((timezone.now() - started).total_seconds(), 3),
+    }
+
+
+def count_skipped(tick):
+    """Count a tick skipped because the previous one still held the lock."""
+    cache = get_cache()
+    stats = cache.get(stats_key(tick)) or {}
+    stats['skipped'] = stats.get('skipped', 0) + 1
+    cache.set(stats_key(tick), stats, timeout=None)
+    logger.warning("Simulation tick %s skipped, the previous tick is still running", tick)
+
+
+def record_tick(tick, timestamp, dispatch_seconds, results):
+    """
+    Keep the metrics of a finished tick.
+
+    lag_seconds is the time from the tick's time to its last chunk finishing,
+    queue_seconds the longest a chunk waited for a worker.
+    """
+    finished = timezone.now()
+    tick_time = datetime.fromisoformat(timestamp)
+    lag = (finished - tick_time).total_seconds()
+    queued = max(
+        ((datetime.fromisoformat(result['started']) - tick_time).total_seconds() for result in results), default=0.0
+    )
+
+    cache = get_cache()
+    stats = cache.get(stats_key(tick)) or {}
+    stats.update({
+        'ticks': stats.get('ticks', 0) + 1,
+        'skipped': stats.get('skipped', 0),
+        'last_tick': timestamp,
+        'last_finished': finished.isoformat(),
+        'readings': sum(result['readings'] for result in results),
+        'chunks': len(results),
+        'dispatch_seconds': round(dispatch_seconds, 3),
+        'queue_seconds': round(queued, 3),
+        'lag_seconds': round(lag, 3),
+        'max_lag_seconds': round(max(lag, stats.get('max_lag_seconds', 0.0)), 3),
+    })
+    cache.set(stats_key(tick), stats, timeout=None)
+    logger.info(
+        "Simulation tick %s: %d readings in %d chunks, %.2fs behind", tick, stats['readings'], len(results), lag
+    )
+    return stats
+
+
+def get_tick_stats():
+    """The metrics of every kind of tick, None for kinds that haven't run yet."""
+    cache = get_cache()
+    stats = cache.get_many([stats_key(tick) for tick in TICKS])
+    return {tick: stats.get(stats_key(tick)) for tick in TICKS}
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import SimulationTickStatsView
+
+urlpatterns = [
+    path('simulation/ticks/', SimulationTickStatsView.as_view(), name='simulation-ticks'),
+]
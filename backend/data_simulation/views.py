@@ -1,3 +1,17 @@
-from django.shortcuts import render
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .ticks import get_tick_stats
 
-# Create your views here.
+
+class SimulationTickStatsView(APIView):
+    """Metrics of the sharded simulation ticks"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """
+        Returns:
+        - Per kind of tick: the last tick's lag, chunk queueing, readings and
+          chunks, the largest lag seen and the counts of finished and skipped ticks
+        """
+        return Response({"ticks": get_tick_stats()})
@@ -0,0 +1,88 @@
+"""
+SQL building blocks for time-bucketed aggregation of health metrics.
+
+Bucketing and aggregation are pushed into PostgreSQL so that charts receive
+one row per bucket instead of every raw reading.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.db import models
+from django.db.models import Aggregate, Avg, Count, Func, Max, Min, Value
+from django.db.models.functions import TruncDay, TruncHour
+
+
+class DateBin(Func):
+    """PostgreSQL date_bin(): buckets timestamps into fixed-width intervals."""
+    function = 'date_bin'
+    output_field = models.DateTimeField()
+
+    def __init__(self, stride, expression, origin=datetime(2000, 1, 1, tzinfo=dt_timezone.utc), **extra):
+        super().__init__(
+            Value(stride, output_field=models.DurationField()),
+            expression,
+            Value(origin, output_field=models.DateTimeField()),
+            **extra
+        )
+
+
+class Percentile(Aggregate):
+    """PostgreSQL percentile_cont() ordered-set aggregate."""
+    function = 'PERCENTILE_CONT'
+    name = 'Percentile'
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = models.FloatField()
+
+    def __init__(self, expression, percentile, **extra):
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+
+# Hour and day buckets follow the local timezone, shorter ones are fixed-width bins.
+BUCKETS = {
+    '1m': timedelta(minutes=1),
+    '5m': timedelta(minutes=5),
+    '15m': timedelta(minutes=15),
+    '1h': TruncHour,
+    '6h': timedelta(hours=6),
+    '1d': TruncDay,
+}
+
+AGGREGATES = {
+    'avg': Avg,
+    'min': Min,
+    'max': Max,
+    'count': Count,
+    'p50': lambda expression: Percentile(expression, 0.5),
+    'p95': lambda expression: Percentile(expression, 0.95),
+}
+
+
+def bucket_expression(bucket, field='timestamp'):
+    """Returns the SQL expression that maps `field` to the start of its bucket."""
+    bucket = BUCKETS[bucket]
+    if isinstance(bucket, timedelta):
+        return DateBin(bucket, field)
+    return bucket(field)
+
+
+def bucketed_series(queryset, bucket, aggregates, fields):
+    """
+    Aggregate a metric queryset per time bucket.
+
+    Args:
+        queryset: Readings of a single metric (already filtered)
+        bucket: One of BUCKETS
+        aggregates: Names from AGGREGATES
+        fields: Names from the model's value_expressions()
+
+    Returns:
+        Values queryset with a 'bucket' key and one '<field>_<aggregate>' key
+        per requested combination, ordered by bucket.
+    """
+    expressions = queryset.model.value_expressions()
+    annotations = {
+        f"{field}_{aggregate}": AGGREGATES[aggregate](expressions[field])
+        for field in fields
+        for aggregate in aggregates
+    }
+    return queryset.annotate(bucket=bucket_expression(bucket)).values('bucket').annotate(
+        **annotations
+    ).order_by('bucket')
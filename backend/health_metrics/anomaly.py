@@ -0,0 +1,252 @@
+"""
+Streaming anomaly detection on ingested readings.
+
+Every batch of new readings (see signals.readings_created) goes through three
+detectors per user and value field:
+
+- z-score of the reading against the user's rolling baseline, an
+  exponentially weighted mean and variance;
+- two-sided CUSUM over the same standardized values (clipped at the
+  z-score threshold), which catches a sustained shift too small to trip the
+  z-score;
+- rate of change between consecutive readings, per minute.
+
+Detector state lives in DetectorState, seeded from the user's BaselineStats
+the first time a series is seen. Each batch locks the rows of its users,
+runs the detectors and writes the states back in one transaction, so web
+and Celery workers ingesting readings of the same user take turns instead
+of each keeping a state of its own. Readings older than the last one seen
+for a series are backfills and are not checked. Configured through
+settings.HEALTH_METRIC_ANOMALY.
+"""
+import math
+from datetime import datetime, timezone as dt_timezone
+from operator import attrgetter
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from .models import Alert, BaselineStats, DetectorState
+
+DEFAULTS = {
+    # metric -> value field -> largest normal change per minute (None disables the rate detector)
+    'FIELDS': {
+        'heartrate': {'value': 25},
+        'spo2': {'value': 4},
+        'bloodpressure': {'systolic': 30, 'diastolic': 20},
+    },
+    'ALPHA': 0.05,
+    'WARMUP': 20,
+    'MIN_STDDEV': 1.0,
+    'ZSCORE_THRESHOLD': 4.0,
+    'CUSUM_K': 0.5,
+    'CUSUM_H': 8.0,
+    'RATE_MAX_GAP_MINUTES': 15,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'HEALTH_METRIC_ANOMALY', {})}
+
+
+class SeriesState:
+    """Detector state of one user's value field."""
+    __slots__ = ('count', 'mean', 'variance', 'cusum_high', 'cusum_low', 'last_value', 'last_time', 'dirty')
+
+    def __init__(self, count=0, mean=0.0, variance=0.0, cusum_high=0.0, cusum_low=0.0,
+                 last_value=None, last_time=None):
+        self.count = count
+        self.mean = mean
+        self.variance = variance
+        self.cusum_high = cusum_high
+        self.cusum_low = cusum_low
+        self.last_value = last_value
+        self.last_time = last_time
+        self.dirty = False
+
+
+class AnomalyDetector:
+    """
+    Runs the detectors over batches of readings.
+
+    `states` holds the states of the batch being processed; between batches
+    they live in DetectorState only.
+    """
+
+    def __init__(self, config=None):
+        self.config = config
+        self.states = {}
+
+    def get_config(self):
+        return self.config or get_config()
+
+    def process(self, model, instances):
+        """
+        Check new readings of a metric and write an Alert for every anomaly.
+
+        The users' states are locked, updated and written back in one
+        transaction, together with the alerts.
+
+        Returns:
+            List of created alerts
+        """
+        config = self.get_config()
+        metric = model._meta.model_name
+        fields = config['FIELDS'].get(metric)
+        if not fields:
+            return []
+
+        try:
+            with transaction.atomic():
+                return self._detect(config, metric, fields, instances)
+        finally:
+            self.states = {}
+
+    def _detect(self, config, metric, fields, instances):
+        instances = sorted(instances, key=attrgetter('timestamp'))
+        self.load(metric, fields, {instance.user_id for instance in instances})
+
+        alpha = config['ALPHA']
+        warmup = config['WARMUP']
+        min_stddev = config['MIN_STDDEV']
+        z_threshold = config['ZSCORE_THRESHOLD']
+        cusum_k = config['CUSUM_K']
+        cusum_h = config['CUSUM_H']
+        max_gap = config['RATE_MAX_GAP_MINUTES'] * 60
+        states = self.states
+        alerts = []
+
+        def alert(instance, field, detector, severity, value, score, message):
+            alerts.append(Alert(
+                user_id=instance.user_id, metric=metric, field=field, detector=detector,
+                severity=severity, value=value, score=round(score, 2), message=message,
+                timestamp=instance.timestamp
+            ))
+
+        for instance in instances:
+            now = instance.timestamp.timestamp()
+            for field, max_rate in fields.items():
+                value = getattr(instance, field)
+                if value is None:
+                    continue
+                state = states.get((instance.user_id, metric, field))
+                if state is None or state.last_time is not None and now < state.last_time:
+                    continue
+
+                if max_rate and state.last_value is not None and now - state.last_time <= max_gap:
+                    rate = (value - state.last_value) / max((now - state.last_time) / 60, 1)
+                    if abs(rate) > max_rate:
+                        alert(
+                            instance, field, 'rate', 'critical' if abs(rate) > 2 * max_rate else 'warning',
+                            value, rate, f"{metric} {field} changed by {rate:+.1f} per minute to {value:g}"
+                        )
+
+                if state.count >= warmup:
+                    z = (value - state.mean) / max(math.sqrt(state.variance), min_stddev)
+                    if abs(z) >= z_threshold:
+                        alert(
+                            instance, field, 'zscore', 'critical' if abs(z) >= 1.5 * z_threshold else 'warning',
+                            value, z, f"{metric} {field} {value:g} is {z:+.1f} standard deviations "
+                                      f"from the rolling baseline {state.mean:.1f}"
+                        )
+                    # Single spikes are the z-score's job; clipping keeps them from tripping CUSUM.
+                    clipped = min(max(z, -z_threshold), z_threshold)
+                    state.cusum_high = max(0.0, state.cusum_high + clipped - cusum_k)
+                    state.cusum_low = max(0.0, state.cusum_low - clipped - cusum_k)
+                    if state.cusum_high > cusum_h or state.cusum_low > cusum_h:
+                        shift = state.cusum_high if state.cusum_high > cusum_h else -state.cusum_low
+                        alert(
+                            instance, field, 'cusum', 'warning', value, shift,
+                            f"{metric} {field} shifted {'up' if shift > 0 else 'down'} "
+                            f"from the rolling baseline {state.mean:.1f}"
+                        )
+                        state.cusum_high = state.cusum_low = 0.0
+
+                if state.count:
+                    diff = value - state.mean
+                    increment = alpha * diff
+                    state.mean += increment
+                    state.variance = (1 - alpha) * (state.variance + diff * increment)
+                else:
+                    state.mean = float(value)
+                state.count += 1
+                state.last_value = value
+                state.last_time = now
+                state.dirty = True
+
+        if alerts:
+            Alert.objects.bulk_create(alerts)
+        self.checkpoint()
+        return alerts
+
+    def load(self, metric, fields, user_ids):
+        """
+        Lock the DetectorState rows of these users and load them into `states`.
+
+        Must run inside a transaction, the locks are held until it ends.
+        Series without a row get one first, seeded from BaselineStats.
+        Deleted users are skipped.
+        """
+        users = set(get_user_model().objects.filter(id__in=user_ids).values_list('id', flat=True))
+        existing = set(DetectorState.objects.filter(
+            metric=metric, field__in=fields, user_id__in=users
+        ).values_list('user_id', 'field'))
+        missing = {(user_id, field) for user_id in users for field in fields} - existing
+
+        if missing:
+            seeds = {key: DetectorState(user_id=key[0], metric=metric, field=key[1]) for key in missing}
+            for baseline in BaselineStats.objects.filter(
+                metric=metric, field__in=fields, activity_level='', user_id__in={user_id for user_id, _ in missing}
+            ):
+                seed = seeds.get((baseline.user_id, baseline.field))
+                if seed is not None:
+                    seed.count, seed.mean, seed.variance = baseline.count, baseline.mean, baseline.variance or 0.0
+            # Another worker may be seeding the same series; its row wins.
+            DetectorState.objects.bulk_create([seeds[key] for key in sorted(seeds)], ignore_conflicts=True)
+
+        # Rows are locked in key order so concurrent batches cannot deadlock each other.
+        for checkpoint in DetectorState.objects.select_for_update().filter(
+            metric=metric, field__in=fields, user_id__in=users
+        ).order_by('user_id', 'field'):
+            self.states[(checkpoint.user_id, metric, checkpoint.field)] = SeriesState(
+                checkpoint.count, checkpoint.mean, checkpoint.variance,
+                checkpoint.cusum_high, checkpoint.cusum_low, checkpoint.last_value,
+                checkpoint.last_timestamp.timestamp() if checkpoint.last_timestamp else None
+            )
+
+    def checkpoint(self):
+        """
+        Write changed states to DetectorState.
+
+        Returns:
+            Number of states written
+        """
+        dirty = {key: state for key, state in self.states.items() if state.dirty}
+        if not dirty:
+            return 0
+
+        checkpoints = []
+        for (user_id, metric, field), state in dirty.items():
+            checkpoints.append(DetectorState(
+                user_id=user_id, metric=metric, field=field, count=state.count, mean=state.mean,
+                variance=state.variance, cusum_high=state.cusum_high, cusum_low=state.cusum_low,
+                last_value=state.last_value,
+                last_timestamp=(
+                    datetime.fromtimestamp(state.last_time, tz=dt_timezone.utc)
+                    if state.last_time is not None else None
+                )
+            ))
+            state.dirty = False
+
+        DetectorState.objects.bulk_create(
+            checkpoints,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['user', 'metric', 'field'],
+            update_fields=[
+                'count', 'mean', 'variance', 'cusum_high', 'cusum_low', 'last_value', 'last_timestamp', 'updated_at'
+            ]
+        )
+        return len(checkpoints)
+
+
+detector = AnomalyDetector()
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class HealthMetricsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'health_metrics'
+
+
+    def ready(self):
+        import health_metrics.signals
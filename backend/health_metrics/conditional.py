@@ -0,0 +1,114 @@
+"""
+HTTP conditional GET for metric endpoints.
+
+Responses of a user's metric endpoints get an ETag and Last-Modified derived
+from the user's MetricVersion counters, read with a single indexed query
+before the view runs. A client that sends back a current If-None-Match (or
+If-Modified-Since) gets 304 Not Modified without the main query being run.
+
+Many responses are relative to the current time (last_days filters, "last
+30 days" analytics), so validators also change at the start of every
+WINDOW_SECONDS window: an unchanged response is reused for at most that long.
+Configured through settings.HEALTH_METRIC_CONDITIONAL_GET.
+"""
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+from .models import MetricVersion
+
+DEFAULTS = {
+    'ENABLED': True,
+    'WINDOW_SECONDS': 60,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'HEALTH_METRIC_CONDITIONAL_GET', {})}
+
+
+class NotModified(Exception):
+    """Raised from ConditionalGetMixin.initial() to answer with `status_code` instead of running the view."""
+
+    def __init__(self, status_code):
+        super().__init__(status_code)
+        self.status_code = status_code
+
+
+def get_validators(request, metric_models, user_id, versions):
+    """
+    ETag and Last-Modified of a response built from one user's readings of these metrics.
+
+    The ETag covers the full path (query string included), the negotiated
+    media type, the user, the current window and every metric's version
+    (as returned by MetricVersion.objects.for_user()).
+    """
+    window = get_config()['WINDOW_SECONDS']
+    now = datetime.now(dt_timezone.utc)
+    window_start = datetime.fromtimestamp(now.timestamp() // window * window, tz=dt_timezone.utc)
+
+    last_modified = max([window_start, *(modified for version, modified in versions.values())])
+
+    parts = [request.get_full_path(), request.accepted_media_type, str(user_id), window_start.isoformat()]
+    for model in metric_models:
+        metric = model._meta.model_name
+        parts.append(f'{metric}:{versions.get(metric, (0, None))[0]}')
+    etag = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return etag, last_modified
+
+
+class ConditionalGetMixin:
+    """
+    Adds conditional GET to a view whose GET responses depend only on one
+    user's readings of `get_conditional_models()`.
+    """
+    # Actions whose responses are not built from one user's readings (e.g. hrv_batch)
+    conditional_exempt_actions = ()
+
+    def get_conditional_models(self):
+        return [self.queryset.model]
+
+    def get_conditional_user_id(self):
+        """Id of the user whose readings the response shows, or None to skip conditional GET."""
+        return self.request.user.id
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_validators = None
+        self.metric_versions = None
+        if request.method not in ('GET', 'HEAD') or not get_config()['ENABLED']:
+            return
+        if getattr(self, 'action', None) in self.conditional_exempt_actions:
+            return
+
+        user_id = self.get_conditional_user_id()
+        if user_id is None:
+            return
+
+        metric_models = self.get_conditional_models()
+        # Kept for the result cache of analytics actions (see result_cache.py)
+        self.metric_versions = MetricVersion.objects.for_user(user_id, metric_models)
+        self.conditional_validators = get_validators(request, metric_models, user_id, self.metric_versions)
+        etag, last_modified = self.conditional_validators
+        response = get_conditional_response(
+            request._request, etag=quote_etag(etag), last_modified=int(last_modified.timestamp())
+        )
+        if response is not None:
+            raise NotModified(response.status_code)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=exc.status_code)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, 'conditional_validators', None)
+        if validators is not None and response.status_code in (200, 304):
+            etag, last_modified = validators
+            response['ETag'] = quote_etag(etag)
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+            response['Cache-Control'] = 'private, no-cache'
+        return response
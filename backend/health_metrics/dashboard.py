@@ -0,0 +1,125 @@
+"""
+Composite dashboard of every metric of one user.
+
+Each metric is answered by a single query: its bucketed series over the
+window, with the latest reading (which may be older than the window) joined
+in as uncorrelated subqueries that PostgreSQL evaluates once. Window
+aggregates are derived from the buckets. Only a metric without readings in
+the window needs a second query, for its latest reading.
+"""
+from datetime import timedelta
+from django.db.models import F, Subquery
+from django.utils import timezone
+from .aggregation import bucketed_series
+from .models import BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
+
+# Window -> (length, bucket of intraday metrics). Buckets keep charts under ~170 points.
+WINDOWS = {
+    '1h': (timedelta(hours=1), '1m'),
+    '6h': (timedelta(hours=6), '5m'),
+    '12h': (timedelta(hours=12), '15m'),
+    '24h': (timedelta(hours=24), '15m'),
+    '7d': (timedelta(days=7), '1h'),
+    '30d': (timedelta(days=30), '6h'),
+}
+
+# Metric -> (model, aggregated fields, bucket override, extra fields of the latest reading).
+# Steps and sleep are daily readings.
+METRICS = {
+    'heartrate': (HeartRate, ['value'], None, ['activity_level']),
+    'bloodpressure': (BloodPressure, ['systolic', 'diastolic', 'pulse'], None, []),
+    'spo2': (SpO2, ['value'], None, []),
+    'dailysteps': (DailySteps, ['count', 'distance'], '1d', ['goal']),
+    'sleepduration': (SleepDuration, ['duration', 'quality'], '1d', []),
+}
+
+SERIES_AGGREGATES = ['avg', 'min', 'max', 'count']
+
+
+def _latest_expressions(model, fields):
+    expressions = model.value_expressions()
+    return {field: expressions.get(field, F(field)) for field in ['timestamp', *fields]}
+
+
+def _latest_subqueries(model, user, fields):
+    latest = model.objects.filter(user=user).order_by('-timestamp', '-id')
+    return {
+        f'latest_{field}': Subquery(latest.annotate(latest_value=expression).values('latest_value')[:1])
+        for field, expression in _latest_expressions(model, fields).items()
+    }
+
+
+def _summarize(rows, fields):
+    summary = {}
+    for field in fields:
+        count = sum(row[f'{field}_count'] for row in rows)
+        total = sum(row[f'{field}_avg'] * row[f'{field}_count'] for row in rows if row[f'{field}_count'])
+        minimums = [row[f'{field}_min'] for row in rows if row[f'{field}_min'] is not None]
+        maximums = [row[f'{field}_max'] for row in rows if row[f'{field}_max'] is not None]
+        summary[field] = {
+            'count': count,
+            'avg': total / count if count else None,
+            'min': min(minimums) if minimums else None,
+            'max': max(maximums) if maximums else None,
+        }
+    return summary
+
+
+def metric_dashboard(model, user, fields, start, bucket, latest_fields=()):
+    """
+    Latest reading, window summary and bucketed series of one metric.
+
+    `latest_fields` are reported for the latest reading only.
+
+    Returns:
+        Dictionary with 'latest' ({timestamp, <field>...} or None), 'summary'
+        (field -> count/avg/min/max) and 'series' (bucket rows)
+    """
+    latest = _latest_subqueries(model, user, [*fields, *latest_fields])
+    rows = list(
+        bucketed_series(
+            model.objects.filter(user=user, timestamp__gte=start), bucket, SERIES_AGGREGATES, fields
+        ).annotate(**latest)
+    )
+    latest_row = {key: rows[0][key] for key in latest} if rows else _fetch_latest(model, user, [*fields, *latest_fields])
+
+    series = [{key: value for key, value in row.items() if key not in latest} for row in rows]
+    if latest_row is None or latest_row['latest_timestamp'] is None:
+        latest_reading = None
+    else:
+        latest_reading = {key[len('latest_'):]: value for key, value in latest_row.items()}
+
+    return {
+        'latest': latest_reading,
+        'summary': _summarize(series, fields),
+        'series': series,
+    }
+
+
+def _fetch_latest(model, user, fields):
+    """Latest reading of a metric without readings in the window, in the shape of the subqueries."""
+    return model.objects.filter(user=user).order_by('-timestamp', '-id').values(
+        **{f'latest_{field}': expression for field, expression in _latest_expressions(model, fields).items()}
+    ).first()
+
+
+def build_dashboard(user, window='24h', now=None):
+    """
+    Dashboard of every metric of a user over one of WINDOWS.
+
+    Returns:
+        Dictionary of metric name -> metric_dashboard() result, plus the
+        window start and the bucket of each metric
+    """
+    now = now or timezone.now()
+    length, bucket = WINDOWS[window]
+    start = now - length
+    metrics = {}
+    for name, (model, fields, metric_bucket, latest_fields) in METRICS.items():
+        # Daily metrics always cover at least the last day.
+        metric_start = min(start, now - timedelta(days=1)) if metric_bucket else start
+        metrics[name] = {
+            'bucket': metric_bucket or bucket,
+            **metric_dashboard(model, user, fields, metric_start, metric_bucket or bucket, latest_fields)
+        }
+    return {'start': start, 'metrics': metrics}
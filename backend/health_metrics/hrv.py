@@ -0,0 +1,138 @@
+"""
+Heart rate variability over windows of heart rate readings.
+
+RMSSD (root mean square of successive differences), SDNN (sample standard
+deviation) and pNN50 (percentage of successive differences larger than 50)
+are computed over the same series of readings the original loop used. Single
+windows go through a NumPy path over a compact array of values; many users
+or many windows are computed in one SQL query using LAG().
+"""
+from datetime import timedelta
+import numpy as np
+from django.db import connection
+from .aggregation import DateBin
+from .models import HeartRate
+
+PNN50_THRESHOLD = 50
+
+
+def summarize(rmssd, sdnn, pnn50, count):
+    return {
+        'rmssd': round(rmssd, 2),
+        'sdnn': round(sdnn, 2),
+        'pnn50': round(pnn50, 2),
+        'count': count
+    }
+
+
+def compute_hrv(values):
+    """
+    HRV of a chronologically ordered sequence of readings.
+
+    Args:
+        values: Heart rate values (any iterable or array)
+
+    Returns:
+        Dictionary with rmssd, sdnn, pnn50 and count, or None with fewer than two readings
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.size < 2:
+        return None
+
+    diffs = np.diff(values)
+    return summarize(
+        float(np.sqrt(np.mean(diffs * diffs))),
+        float(values.std(ddof=1)),
+        float(np.mean(np.abs(diffs) > PNN50_THRESHOLD) * 100),
+        int(values.size)
+    )
+
+
+# avg() over float8 keeps RMSSD bit-for-bit equal to the Python/NumPy paths,
+# since squared differences of integer readings are summed exactly.
+HRV_AGGREGATES = """
+    count(*),
+    sqrt(avg((diff * diff)::float8)),
+    stddev_samp(value::float8),
+    100.0 * avg((abs(diff) > {threshold})::int::float8)
+""".format(threshold=PNN50_THRESHOLD)
+
+
+def _rows_to_results(rows):
+    return {
+        key: summarize(rmssd, sdnn, pnn50, count)
+        for key, count, rmssd, sdnn, pnn50 in rows
+        if count >= 2
+    }
+
+
+def hrv_for_users(user_ids, time_window=24):
+    """
+    HRV of many users in one query, each over the window ending at their latest reading.
+
+    Args:
+        user_ids: Ids of the users to include
+        time_window: Window length in hours
+
+    Returns:
+        Dictionary of user id -> compute_hrv()-style result; users with fewer
+        than two readings in their window are left out
+    """
+    table = connection.ops.quote_name(HeartRate._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH latest AS (
+                SELECT users.id AS user_id,
+                       (SELECT max("timestamp") FROM {table} WHERE "user_id" = users.id) AS until
+                FROM unnest(%s::bigint[]) AS users(id)
+            ), readings AS (
+                SELECT hr."user_id", hr."value",
+                       hr."value" - LAG(hr."value") OVER (
+                           PARTITION BY hr."user_id" ORDER BY hr."timestamp", hr."id"
+                       ) AS diff
+                FROM {table} hr
+                JOIN latest ON latest.user_id = hr."user_id"
+                WHERE hr."timestamp" >= latest.until - %s AND hr."timestamp" <= latest.until
+            )
+            SELECT "user_id", {HRV_AGGREGATES}
+            FROM readings
+            GROUP BY "user_id"
+            """,
+            [list(user_ids), timedelta(hours=time_window)]
+        )
+        return _rows_to_results(cursor.fetchall())
+
+
+def hrv_by_window(queryset, time_window=1):
+    """
+    HRV per consecutive fixed-width window of one user's readings, in one query.
+
+    Windows are date_bin() buckets of `time_window` hours; successive
+    differences never cross a window boundary.
+
+    Returns:
+        Dictionary of window start -> compute_hrv()-style result, oldest first
+    """
+    bucketed = queryset.annotate(
+        window_start=DateBin(timedelta(hours=time_window), 'timestamp')
+    ).values('user_id', 'window_start', 'timestamp', 'id', 'value').order_by()
+    inner_sql, params = bucketed.query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT window_start, {HRV_AGGREGATES}
+            FROM (
+                SELECT window_start, "value",
+                       "value" - LAG("value") OVER (
+                           PARTITION BY user_id, window_start ORDER BY "timestamp", id
+                       ) AS diff
+                FROM ({inner_sql}) bucketed
+            ) readings
+            GROUP BY window_start
+            ORDER BY window_start
+            """,
+            params
+        )
+        return _rows_to_results(cursor.fetchall())
@@ -0,0 +1,101 @@
+"""
+Streaming ingestion helpers for historical device backfills.
+
+Request bodies are parsed line by line with generators and validated readings
+are flushed to the database in fixed-size batches, so memory use stays the
+same no matter how large the upload is.
+"""
+import csv
+import json
+from django.core.exceptions import ValidationError
+from rest_framework import serializers
+
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/jsonl')
+CSV_CONTENT_TYPES = ('text/csv',)
+
+
+def iter_lines(stream, encoding='utf-8'):
+    """Decode a binary stream (e.g. the request) one line at a time."""
+    for line in stream:
+        yield line.decode(encoding)
+
+
+def iter_ndjson(lines):
+    """Yield (line_number, row, error) for every non-blank NDJSON line."""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, f"Invalid JSON: {exc}"
+            continue
+
+        if not isinstance(row, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+
+        yield line_number, row, None
+
+
+def iter_csv(lines):
+    """Yield (line_number, row, error) for every CSV record after the header."""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        if None in row:
+            yield reader.line_num, None, "Row has more columns than the header"
+            continue
+
+        # Empty cells mean "not provided", so optional fields fall back to their defaults.
+        yield reader.line_num, {key: value for key, value in row.items() if value != ''}, None
+
+
+def ingest_rows(rows, serializer, user, batch_size=1000, max_error_samples=100):
+    """
+    Validate parsed rows and insert them for `user` in fixed-size batches.
+
+    Each row goes through the serializer (type conversion) and the model's
+    clean() method (range checks), the same rules used by the API and admin.
+
+    Yields a progress dict after every flushed batch and a final summary with
+    the number of rejected rows and a bounded sample of their errors.
+    """
+    model = serializer.Meta.model
+    batch = []
+    errors = []
+    processed = inserted = rejected = 0
+
+    for line_number, row, error in rows:
+        processed += 1
+
+        if error is None:
+            try:
+                instance = model(user=user, **serializer.run_validation(row))
+                instance.clean()
+            except serializers.ValidationError as exc:
+                error = exc.detail
+            except ValidationError as exc:
+                error = exc.messages
+            else:
+                batch.append(instance)
+
+        if error is not None:
+            rejected += 1
+            if len(errors) < max_error_samples:
+                errors.append({'line': line_number, 'errors': error})
+
+        if len(batch) >= batch_size:
+            inserted += len(model.objects.bulk_insert(batch, batch_size=batch_size))
+            batch = []
+            yield {'processed': processed, 'inserted': inserted, 'rejected': rejected}
+
+    if batch:
+        inserted += len(model.objects.bulk_insert(batch, batch_size=batch_size))
+
+    yield {
+        'status': 'complete',
+        'processed': processed,
+        'inserted': inserted,
+        'rejected': rejected,
+        'errors': errors
+    }
@@ -0,0 +1,234 @@
+"""
+Fast read-only path for metric list endpoints.
+
+Serializing a page through ModelSerializer instantiates a model per row and
+walks every field through get_attribute(). A ListPlan is compiled once per
+serializer class instead: rows are fetched with values_list() into
+namedtuples that carry the model's own properties (so derived fields such as
+bp_category or sleep_midpoint run the same code), and each column goes
+through the same DRF field to_representation() only where it changes the
+value. The JSON is identical to the serializer's.
+
+The same rows can also be assembled column by column into a pyarrow Table
+for the Arrow and Parquet renderers, with model columns keeping their SQL
+types (int16 readings, timezone-aware timestamps).
+
+A plan can be narrowed to a subset of the serializer's fields (sparse
+fieldsets, ?fields=timestamp,value): only their columns are selected, plus
+id and timestamp for pagination. Derived fields may read any column of the
+model, so requesting one selects the serializer's full set of columns.
+"""
+import inspect
+from collections import namedtuple
+from datetime import datetime
+from operator import attrgetter, methodcaller
+from django.db import models
+from django.db.models.query import ValuesListIterable
+from django.utils import timezone
+import pyarrow as pa
+from rest_framework import serializers
+from rest_framework import ISO_8601
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation() returns the native value of a column unchanged.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+# Arrow types of model columns by Django internal type; DateTimeFields are
+# typed per request (see arrow_type) and derived fields are inferred.
+ARROW_TYPES = {
+    'AutoField': pa.int32(),
+    'BigAutoField': pa.int64(),
+    'BigIntegerField': pa.int64(),
+    'BooleanField': pa.bool_(),
+    'CharField': pa.string(),
+    'FloatField': pa.float64(),
+    'IntegerField': pa.int32(),
+    'PositiveBigIntegerField': pa.int64(),
+    'PositiveIntegerField': pa.int32(),
+    'PositiveSmallIntegerField': pa.int16(),
+    'SmallIntegerField': pa.int16(),
+    'TextField': pa.string(),
+}
+
+_plans = {}
+
+
+class RowIterable(ValuesListIterable):
+    """Yields values_list() rows as instances of `row_class`."""
+    row_class = None
+
+    def __iter__(self):
+        make = self.row_class._make
+        for row in super().__iter__():
+            yield make(row)
+
+
+class ListPlan:
+    """Precompiled representation of one serializer's fields for values_list() rows."""
+
+    def __init__(self, serializer_class, annotations=(), fields=None):
+        serializer = serializer_class()
+        model = serializer_class.Meta.model
+        concrete = {field.name: field for field in model._meta.concrete_fields}
+        readable = [
+            field for field in serializer._readable_fields
+            if fields is None or field.field_name in fields
+        ]
+        if any(field.source not in concrete and not isinstance(field, serializers.SerializerMethodField)
+               for field in readable):
+            # Columns of every serializer field, for whatever the derived fields read
+            base_columns = [
+                concrete[field.source].attname for field in serializer._readable_fields if field.source in concrete
+            ]
+        else:
+            base_columns = []
+
+        self.columns = []
+        self.fields = []
+        # Model field behind each of self.fields, None for derived and method fields
+        self.model_fields = []
+        derived = {}
+        for field in readable:
+            name = field.field_name
+            if isinstance(field, serializers.SerializerMethodField):
+                # Called with the whole row; DRF never treats the instance as None.
+                self.fields.append((name, getattr(serializer, field.method_name), None))
+                self.model_fields.append(None)
+            elif field.source in concrete:
+                column = concrete[field.source].attname
+                self.columns.append(column)
+                self.fields.append((name, attrgetter(column), field))
+                self.model_fields.append(concrete[field.source])
+            else:
+                attribute = inspect.getattr_static(model, field.source)
+                derived[field.source] = attribute
+                # Plain methods (e.g. is_sufficient) are called without arguments, as DRF does.
+                getter = methodcaller(field.source) if inspect.isfunction(attribute) else attrgetter(field.source)
+                self.fields.append((name, getter, None))
+                self.model_fields.append(None)
+
+        self.columns.extend(column for column in base_columns if column not in self.columns)
+        # Annotations named after serializer fields (e.g. full_name) are read from the row.
+        self.columns.extend(
+            name for name in annotations if name in serializer.fields and (fields is None or name in fields)
+        )
+        for name in ('id', 'timestamp'):
+            if name not in self.columns:
+                self.columns.append(name)
+
+        # Properties the derived fields may depend on, e.g. sleep_midpoint uses duration.
+        for klass in reversed(model.__mro__):
+            if klass is models.Model or not issubclass(klass, models.Model):
+                continue
+            for attribute, value in vars(klass).items():
+                if isinstance(value, property) and attribute not in self.columns:
+                    derived.setdefault(attribute, value)
+
+        base = namedtuple(f'{model.__name__}Row', self.columns)
+        self.row_class = type(base.__name__, (base,), {
+            '__slots__': (),
+            'pk': property(attrgetter('id')),
+            **derived
+        })
+        self.iterable_class = type(f'{model.__name__}RowIterable', (RowIterable,), {'row_class': self.row_class})
+
+    def rows(self, queryset):
+        """The queryset as row objects; it can still be paginated, filtered and ordered."""
+        queryset = queryset.values_list(*self.columns)
+        queryset._iterable_class = self.iterable_class
+        return queryset
+
+    def represent(self, rows):
+        """Same output as Serializer.to_representation() per row."""
+        fields = [(name, get, converter(field)) for name, get, field in self.fields]
+        results = []
+        for row in rows:
+            data = {}
+            for name, get, convert in fields:
+                value = get(row)
+                if value is None or convert is None:
+                    data[name] = value
+                else:
+                    data[name] = convert(value)
+            results.append(data)
+        return results
+
+    def table(self, rows):
+        """The rows as a pyarrow Table with one column per serializer field, in the same order."""
+        rows = list(rows)
+        time_zone = timezone.get_current_timezone_name()
+        arrays = [
+            pa.array([get(row) for row in rows], type=arrow_type(model_field, time_zone))
+            for (name, get, field), model_field in zip(self.fields, self.model_fields)
+        ]
+        return pa.Table.from_arrays(arrays, names=[name for name, get, field in self.fields])
+
+
+def converter(field):
+    """
+    The to_representation() of a column's field, or None where it returns the
+    column value unchanged. Resolved per call since the current timezone is
+    per request.
+    """
+    if field is None or isinstance(field, PASSTHROUGH_FIELDS):
+        return None
+    if isinstance(field, serializers.DateTimeField):
+        return datetime_converter(field)
+    return field.to_representation
+
+
+def datetime_converter(field):
+    """DateTimeField.to_representation() with its output format and timezone looked up once."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if not isinstance(value, datetime) or value.utcoffset() is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return convert
+
+
+def arrow_type(model_field, time_zone):
+    """
+    Arrow type of a model column, or None to let pyarrow infer it. Timestamps
+    carry the current timezone so clients see the same wall time as in JSON.
+    """
+    if model_field is None:
+        return None
+    if model_field.is_relation:
+        model_field = model_field.target_field
+    internal_type = model_field.get_internal_type()
+    if internal_type == 'DateTimeField':
+        return pa.timestamp('us', tz=time_zone)
+    return ARROW_TYPES.get(internal_type)
+
+
+def list_plan(serializer_class, queryset, fields=None):
+    """
+    The ListPlan of a serializer for a queryset, compiled once per combination
+    of annotations and requested fields (None for all of them).
+
+    SerializerMethodFields are called with the row, so whatever they read
+    from related objects must be annotated (see BaseHealthMetricsViewSet.get_queryset).
+    """
+    annotations = tuple(sorted(queryset.query.annotations))
+    if fields is not None:
+        fields = frozenset(fields)
+    key = (serializer_class, annotations, fields)
+    if key not in _plans:
+        _plans[key] = ListPlan(serializer_class, annotations, fields)
+    return _plans[key]
@@ -0,0 +1,146 @@
+"""
+Live stream of newly inserted readings.
+
+Every readings_created batch is published, once its transaction commits, to
+one Redis pub/sub channel per metric and user. The live_readings view
+subscribes to the channels of one user (or of a clinician's patient set) and
+forwards the messages as Server-Sent Events, so a dashboard receives new
+readings as they arrive instead of re-fetching its whole window.
+
+Publishing never fails ingestion: while Redis is unreachable, messages are
+dropped and publishing is retried after RETRY_SECONDS. Configured through
+settings.HEALTH_METRIC_LIVE.
+"""
+import json
+import logging
+import time
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'REDIS_URL': 'redis://localhost:6379/0',
+    'KEEPALIVE_SECONDS': 15,
+    'RETRY_SECONDS': 30,
+}
+
+CHANNEL_PREFIX = 'health_metrics:live'
+
+# Columns left out of pushed readings, the client only needs the measurement.
+EXCLUDED_FIELDS = ('created_at', 'updated_at')
+
+_client = None
+_unavailable_until = 0.0
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'HEALTH_METRIC_LIVE', {})}
+
+
+def channel_name(metric, user_id):
+    return f'{CHANNEL_PREFIX}:{metric}:{user_id}'
+
+
+def reading_payload(instance):
+    """A reading as pushed to live clients: its columns, with `user` holding the user id."""
+    payload = {}
+    for field in instance._meta.concrete_fields:
+        if field.name in EXCLUDED_FIELDS:
+            continue
+        payload[field.name] = getattr(instance, field.attname)
+    return payload
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            get_config()['REDIS_URL'], socket_connect_timeout=0.5, socket_timeout=0.5
+        )
+    return _client
+
+
+def publish_readings(model, instances):
+    """
+    Publish new readings to their users' channels after the current transaction commits.
+
+    Returns:
+        Number of messages scheduled, 0 while live streaming is disabled or Redis is down
+    """
+    config = get_config()
+    if not config['ENABLED'] or time.monotonic() < _unavailable_until:
+        return 0
+
+    metric = model._meta.model_name
+    by_user = {}
+    for instance in instances:
+        by_user.setdefault(instance.user_id, []).append(reading_payload(instance))
+    messages = [
+        (channel_name(metric, user_id), json.dumps({'metric': metric, 'readings': readings}, cls=DjangoJSONEncoder))
+        for user_id, readings in by_user.items()
+    ]
+
+    def send():
+        global _unavailable_until
+        try:
+            pipeline = get_client().pipeline(transaction=False)
+            for channel, message in messages:
+                pipeline.publish(channel, message)
+            pipeline.execute()
+        except redis.RedisError as exc:
+            _unavailable_until = time.monotonic() + config['RETRY_SECONDS']
+            logger.warning("Live readings not published, Redis is unavailable: %s", exc)
+
+    transaction.on_commit(send)
+    return len(messages)
+
+
+async def subscribe(metrics, user_ids):
+    """
+    Open a pub/sub subscription to the channels of these metrics and users.
+
+    Raises:
+        redis.RedisError when Redis is unreachable
+    """
+    client = redis.asyncio.Redis.from_url(get_config()['REDIS_URL'], socket_connect_timeout=0.5)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(*[channel_name(metric, user_id) for metric in metrics for user_id in user_ids])
+    except BaseException:
+        await pubsub.aclose()
+        await client.aclose()
+        raise
+    return client, pubsub
+
+
+def sse_event(event, data):
+    return f'event: {event}\ndata: {data}\n\n'
+
+
+async def stream_events(client, pubsub, keepalive=None):
+    """
+    Server-Sent Events for the messages of a subscription.
+
+    Each event is named after the metric and carries {'metric', 'readings'}.
+    A comment line is sent after `keepalive` seconds without readings so
+    proxies keep the connection open.
+    """
+    keepalive = keepalive or get_config()['KEEPALIVE_SECONDS']
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=keepalive)
+            if message is None:
+                yield ': keepalive\n\n'
+                continue
+            channel = message['channel'].decode()
+            metric = channel[len(CHANNEL_PREFIX) + 1:].split(':', 1)[0]
+            yield sse_event(metric, message['data'].decode())
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
@@ -0,0 +1,59 @@
+import time
+from datetime import timedelta
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from health_metrics.anomaly import AnomalyDetector
+from health_metrics.models import Alert, HeartRate
+from users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the throughput of the streaming anomaly detectors on simulated heart rate readings, '
+        'including locking, loading and writing their state and alert writes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readings', type=int, default=200000, help='Total readings to process')
+        parser.add_argument('--users', type=int, default=100, help='Users the readings are spread over')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Readings per batch, like one bulk_insert chunk')
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(42)
+        size, batch_size = options['readings'], options['batch_size']
+        per_user = -(-size // options['users'])
+
+        # Users and alerts are created inside a transaction that is rolled back at the end.
+        with transaction.atomic():
+            users = [
+                UserProfile.objects.create_user(email=f'benchmark-anomaly-{i}@example.com', password=None)
+                for i in range(options['users'])
+            ]
+            start = timezone.now() - timedelta(minutes=per_user)
+            values = np.clip(rng.normal(72, 6, size) + (rng.random(size) < 0.001) * 60, 30, 220).astype(int)
+            readings = [
+                HeartRate(
+                    user_id=users[i % len(users)].id,
+                    value=int(value),
+                    activity_level='resting',
+                    timestamp=start + timedelta(minutes=i // len(users)),
+                    source='simulated'
+                )
+                for i, value in enumerate(values)
+            ]
+
+            detector = AnomalyDetector()
+            started = time.perf_counter()
+            for offset in range(0, size, batch_size):
+                detector.process(HeartRate, readings[offset:offset + batch_size])
+            detect_seconds = time.perf_counter() - started
+            alerts = Alert.objects.filter(user__in=users).count()
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'{size} readings, {len(users)} users, batches of {batch_size}')
+        self.stdout.write(f'detection: {detect_seconds:.2f}s ({size / detect_seconds:,.0f} readings/sec)')
+        self.stdout.write(f'alerts written: {alerts}')
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
@@ -0,0 +1,75 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from health_metrics.downsampling import lttb
+
+
+def loop_lttb(x, y, max_points):
+    """LTTB as originally described: bucket averages and triangle areas in Python loops."""
+    size = len(x)
+    if size <= max_points:
+        return list(range(size))
+    every = (size - 2) / (max_points - 2)
+    kept, previous = [0], 0
+    for i in range(max_points - 2):
+        next_start, next_end = int((i + 1) * every) + 1, min(int((i + 2) * every) + 1, size)
+        next_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        next_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        best_area, best = -1, None
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((x[previous] - next_x) * (y[j] - y[previous]) - (x[previous] - x[j]) * (next_y - y[previous]))
+            if area > best_area:
+                best_area, best = area, j
+        kept.append(best)
+        previous = best
+    kept.append(size - 1)
+    return kept
+
+
+def best_of(repeat, run):
+    """Best wall time of `repeat` runs in milliseconds, and the last result."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the NumPy LTTB downsampler with a pure Python loop on simulated heart rate series '
+        '(one reading every few seconds)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000], help='Points per series')
+        parser.add_argument('--max-points', type=int, nargs='+', default=[500, 2000], help='Points to keep')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions per path (best is reported)')
+        parser.add_argument('--skip-loop', action='store_true', help='Only time the NumPy path')
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(42)
+        repeat = options['repeat']
+
+        self.stdout.write(f"{'points':>10} {'kept':>6} {'loop ms':>9} {'numpy ms':>9} {'speedup':>8}")
+        for size in options['sizes']:
+            x = np.cumsum(rng.uniform(2, 8, size))
+            y = 72 + 12 * np.sin(x / 3600) + rng.normal(0, 4, size)
+            x_list, y_list = x.tolist(), y.tolist()
+
+            for max_points in options['max_points']:
+                numpy_ms, kept = best_of(repeat, lambda: lttb(x, y, max_points))
+                if options['skip_loop']:
+                    self.stdout.write(f"{size:>10} {len(kept):>6} {'-':>9} {numpy_ms:>9.1f} {'-':>8}")
+                    continue
+
+                loop_ms, loop_kept = best_of(1, lambda: loop_lttb(x_list, y_list, max_points))
+                if kept.tolist() != loop_kept:
+                    self.stdout.write(self.style.WARNING(f'{size} points, {max_points} kept: selections differ'))
+                self.stdout.write(
+                    f"{size:>10} {len(kept):>6} {loop_ms:>9.1f} {numpy_ms:>9.1f} {loop_ms / numpy_ms:>7.1f}x"
+                )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
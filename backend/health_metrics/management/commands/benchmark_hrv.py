@@ -0,0 +1,130 @@
+import math
+import time
+from datetime import timedelta
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from health_metrics.hrv import compute_hrv, hrv_for_users
+from health_metrics.models import HeartRate
+from users.models import UserProfile
+
+
+def loop_rmssd(reading, time_window=24):
+    """The original calculate_hrv: values pulled into a list and squared in a Python loop."""
+    since = reading.timestamp - timedelta(hours=time_window)
+    measurements = HeartRate.objects.filter(
+        user=reading.user,
+        timestamp__gte=since,
+        timestamp__lte=reading.timestamp
+    ).order_by('timestamp').values_list('value', flat=True)
+
+    return loop_rmssd_values(list(measurements))
+
+
+def loop_rmssd_values(measurements):
+    if len(measurements) < 2:
+        return None
+
+    successive_diffs = []
+    for i in range(1, len(measurements)):
+        diff = measurements[i] - measurements[i-1]
+        successive_diffs.append(diff ** 2)
+
+    return round(math.sqrt(sum(successive_diffs) / len(successive_diffs)), 2)
+
+
+def best_of(repeat, run):
+    """Best wall time of `repeat` runs in milliseconds, and the last result."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the original HRV loop with the NumPy and SQL (LAG) paths over a 24 hour window, '
+        'for a single patient and for a clinician patient list'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Readings per run')
+        parser.add_argument('--patients', type=int, default=100, help='Patients in the patient list run')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions per path (best is reported)')
+
+    def create_readings(self, user, size, end, rng):
+        step = timedelta(hours=24) / size
+        HeartRate.objects.bulk_create([
+            HeartRate(
+                user=user,
+                value=int(value),
+                activity_level='resting',
+                timestamp=end - step * i,
+                source='simulated'
+            )
+            for i, value in enumerate(rng.integers(50, 120, size))
+        ], batch_size=5000)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(42)
+        repeat = options['repeat']
+
+        self.stdout.write('Single patient, query + compute (ms), and compute only (ms):')
+        self.stdout.write(
+            f"{'readings':>10} {'loop':>8} {'numpy':>8} {'sql':>8} {'loop cpu':>9} {'numpy cpu':>10}"
+        )
+        for size in options['sizes']:
+            # Data is inserted inside a transaction that is rolled back at the end.
+            with transaction.atomic():
+                user = UserProfile.objects.create_user(email='benchmark-hrv@example.com', password=None)
+                self.create_readings(user, size, timezone.now(), rng)
+                latest = HeartRate.objects.filter(user=user).latest('timestamp')
+                values = list(HeartRate.objects.filter(user=user).order_by('timestamp').values_list('value', flat=True))
+                array = np.array(values, dtype=np.int16)
+
+                timings, results = {}, {}
+                for name, run in (
+                    ('loop', lambda: loop_rmssd(latest)),
+                    ('numpy', lambda: latest.calculate_hrv()),
+                    ('sql', lambda: hrv_for_users([user.id])[user.id]['rmssd']),
+                    ('loop cpu', lambda: loop_rmssd_values(values)),
+                    ('numpy cpu', lambda: compute_hrv(array)['rmssd']),
+                ):
+                    timings[name], results[name] = best_of(repeat, run)
+
+                transaction.set_rollback(True)
+
+            if len(set(results.values())) != 1:
+                self.stdout.write(self.style.WARNING(f'RMSSD mismatch for {size} readings: {results}'))
+            self.stdout.write(
+                f"{size:>10} {timings['loop']:>8.1f} {timings['numpy']:>8.1f} {timings['sql']:>8.1f} "
+                f"{timings['loop cpu']:>9.2f} {timings['numpy cpu']:>10.2f}"
+            )
+
+        patients = options['patients']
+        with transaction.atomic():
+            users = [
+                UserProfile.objects.create_user(email=f'benchmark-hrv-{i}@example.com', password=None)
+                for i in range(patients)
+            ]
+            end = timezone.now()
+            for user in users:
+                self.create_readings(user, 1440, end, rng)
+            latest = [HeartRate.objects.filter(user=user).latest('timestamp') for user in users]
+            user_ids = [user.id for user in users]
+
+            loop_ms, _ = best_of(repeat, lambda: [loop_rmssd(reading) for reading in latest])
+            numpy_ms, _ = best_of(repeat, lambda: [reading.calculate_hrv() for reading in latest])
+            sql_ms, _ = best_of(repeat, lambda: hrv_for_users(user_ids))
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'\nPatient list, {patients} patients x 1440 readings (ms):')
+        self.stdout.write(f'{"loop":>8} {"numpy":>8} {"sql batch":>10}')
+        self.stdout.write(f'{loop_ms:>8.1f} {numpy_ms:>8.1f} {sql_ms:>10.1f}')
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
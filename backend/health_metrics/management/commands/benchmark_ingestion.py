@@ -0,0 +1,62 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from health_metrics.views import HeartRateViewSet
+from users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec of single-row heart rate creation against the bulk endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1440, help='Readings to insert per run (default: a day of minute data)')
+        parser.add_argument('--chunk', type=int, default=1440, help='Readings per bulk request')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        chunk = options['chunk']
+        now = timezone.now()
+        readings = [
+            {
+                "value": 60 + (i % 40),
+                "activity_level": "resting",
+                "timestamp": (now - timedelta(minutes=i)).isoformat(),
+                "source": "device"
+            }
+            for i in range(rows)
+        ]
+
+        factory = APIRequestFactory()
+        create_view = HeartRateViewSet.as_view({'post': 'create'})
+        bulk_view = HeartRateViewSet.as_view({'post': 'bulk'})
+
+        # Everything runs inside a transaction that is rolled back at the end,
+        # so the benchmark leaves no data behind.
+        with transaction.atomic():
+            user = UserProfile.objects.create_user(email='benchmark-ingestion@example.com', password=None)
+
+            started = time.perf_counter()
+            for reading in readings:
+                request = factory.post('/api/heart-rate/', reading, format='json')
+                force_authenticate(request, user=user)
+                create_view(request)
+            single_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for start in range(0, rows, chunk):
+                request = factory.post('/api/heart-rate/bulk/', readings[start:start + chunk], format='json')
+                force_authenticate(request, user=user)
+                bulk_view(request)
+            bulk_elapsed = time.perf_counter() - started
+
+            transaction.set_rollback(True)
+
+        single_rate = rows / single_elapsed
+        bulk_rate = rows / bulk_elapsed
+
+        self.stdout.write(f"Single-row path: {rows} rows in {single_elapsed:.2f}s ({single_rate:,.0f} rows/sec)")
+        self.stdout.write(f"Bulk path:       {rows} rows in {bulk_elapsed:.2f}s ({bulk_rate:,.0f} rows/sec)")
+        self.stdout.write(self.style.SUCCESS(f"Bulk ingestion is {bulk_rate / single_rate:.1f}x faster"))
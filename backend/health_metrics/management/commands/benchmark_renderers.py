@@ -0,0 +1,94 @@
+import io
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from health_metrics.models import HeartRate
+from health_metrics.parsers import ORJSONParser
+from health_metrics.renderers import ORJSONRenderer
+from health_metrics.serializers import HeartRateSerializer
+from users.models import UserProfile
+
+ACTIVITY_LEVELS = ['resting', 'active', 'sleeping']
+
+
+def heart_rate_page(page_size, offset):
+    """Serialized data of a page of heart rate readings, as the list endpoint returns it."""
+    user = UserProfile(id=1, email='benchmark-renderers@example.com', first_name='Bench', last_name='Mark')
+    end = timezone.now()
+    readings = []
+    for i in range(offset, offset + page_size):
+        timestamp = end - timedelta(minutes=i, microseconds=i * 137)
+        readings.append(HeartRate(
+            id=i + 1, user=user, value=50 + (i * 7) % 130, activity_level=ACTIVITY_LEVELS[i % 3],
+            timestamp=timestamp, source='device', created_at=timestamp, updated_at=timestamp
+        ))
+    return {
+        'count': 10000,
+        'next': f'http://localhost:8000/api/heart-rate/?page={offset // page_size + 2}',
+        'previous': None,
+        'results': HeartRateSerializer(readings, many=True).data
+    }
+
+
+def best_of(repeat, run):
+    """Best wall time of `repeat` runs in seconds, and the last result."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's JSONRenderer/JSONParser with the orjson ones on HeartRateSerializer pages, "
+        'in encode/decode time per page and throughput'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100, help='Readings per page')
+        parser.add_argument('--pages', type=int, default=200, help='Pages encoded per timed run')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions per path (best is reported)')
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        count = options['pages']
+        repeat = options['repeat']
+
+        pages = [heart_rate_page(page_size, n * page_size) for n in range(count)]
+
+        self.stdout.write(f'{count} pages of {page_size} heart rate readings:')
+        self.stdout.write(f"{'path':>16} {'us/page':>10} {'rows/sec':>12} {'MB/sec':>8} {'speedup':>8}")
+
+        stdlib_seconds, bodies = best_of(repeat, lambda: [JSONRenderer().render(page) for page in pages])
+        fast_seconds, actual = best_of(repeat, lambda: [ORJSONRenderer().render(page) for page in pages])
+        if actual != bodies:
+            self.stdout.write(self.style.WARNING('orjson output differs from the stdlib renderer'))
+        self.report('render stdlib', stdlib_seconds, count, page_size, bodies)
+        self.report('render orjson', fast_seconds, count, page_size, actual, stdlib_seconds)
+
+        stdlib_seconds, expected = best_of(
+            repeat, lambda: [JSONParser().parse(io.BytesIO(body)) for body in bodies]
+        )
+        fast_seconds, actual = best_of(
+            repeat, lambda: [ORJSONParser().parse(io.BytesIO(body)) for body in bodies]
+        )
+        if actual != expected:
+            self.stdout.write(self.style.WARNING('orjson parsed data differs from the stdlib parser'))
+        self.report('parse stdlib', stdlib_seconds, count, page_size, bodies)
+        self.report('parse orjson', fast_seconds, count, page_size, bodies, stdlib_seconds)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
+
+    def report(self, label, seconds, count, page_size, bodies, baseline=None):
+        megabytes = sum(len(body) for body in bodies) / 1e6
+        speedup = f'{baseline / seconds:>7.1f}x' if baseline else ''
+        self.stdout.write(
+            f'{label:>16} {seconds / count * 1e6:>10,.0f} {count * page_size / seconds:>12,.0f} '
+            f'{megabytes / seconds:>8,.1f} {speedup:>8}'
+        )
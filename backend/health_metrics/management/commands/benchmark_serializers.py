@@ -0,0 +1,106 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Trim
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from health_metrics.listing import list_plan
+from health_metrics.models import BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
+from health_metrics.serializers import (
+    BloodPressureSerializer,
+    DailyStepsSerializer,
+    HeartRateSerializer,
+    SleepDurationSerializer,
+    SpO2Serializer
+)
+from users.models import UserProfile
+
+METRICS = [
+    (HeartRate, HeartRateSerializer),
+    (BloodPressure, BloodPressureSerializer),
+    (SpO2, SpO2Serializer),
+    (DailySteps, DailyStepsSerializer),
+    (SleepDuration, SleepDurationSerializer),
+]
+
+
+def build(model, user, i, timestamp):
+    if model is HeartRate:
+        return HeartRate(user=user, value=50 + i % 120, activity_level='resting', timestamp=timestamp, source='simulated')
+    if model is BloodPressure:
+        return BloodPressure(
+            user=user, systolic=100 + i % 70, diastolic=60 + i % 40, pulse=70, timestamp=timestamp, source='simulated'
+        )
+    if model is SpO2:
+        return SpO2(user=user, value=85 + i % 15, timestamp=timestamp, source='simulated')
+    if model is DailySteps:
+        return DailySteps(user=user, count=i % 16000, distance=4.2, timestamp=timestamp, source='simulated')
+    return SleepDuration(
+        user=user, start_time=timestamp - timedelta(hours=7), end_time=timestamp, quality=7,
+        timestamp=timestamp, source='simulated'
+    )
+
+
+def best_of(repeat, run):
+    """Best wall time of `repeat` runs in seconds, and the last result."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the serializer with the fast row path of list endpoints (listing.py), '
+        'query + JSON rendering in rows/sec per metric'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Readings per metric')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions per path (best is reported)')
+
+    def handle(self, *args, **options):
+        size = options['rows']
+        repeat = options['repeat']
+        renderer = JSONRenderer()
+
+        self.stdout.write(f'{size} rows per metric (rows/sec):')
+        self.stdout.write(f"{'metric':>15} {'serializer':>11} {'fast':>11} {'speedup':>8}")
+        # Data is inserted inside a transaction that is rolled back at the end.
+        with transaction.atomic():
+            user = UserProfile.objects.create_user(
+                email='benchmark-serializers@example.com', password=None, first_name='Bench', last_name='Mark'
+            )
+            end = timezone.now()
+            for model, serializer_class in METRICS:
+                model.objects.bulk_create(
+                    [build(model, user, i, end - timedelta(minutes=i)) for i in range(size)], batch_size=5000
+                )
+                queryset = model.objects.filter(user=user).annotate(
+                    full_name=Trim(Concat('user__first_name', Value(' '), 'user__last_name'))
+                ).order_by('-timestamp')
+                plan = list_plan(serializer_class, queryset)
+
+                serializer_seconds, expected = best_of(
+                    repeat, lambda: renderer.render(serializer_class(queryset.all(), many=True).data)
+                )
+                fast_seconds, actual = best_of(
+                    repeat, lambda: renderer.render(plan.represent(plan.rows(queryset.all())))
+                )
+
+                name = model._meta.model_name
+                if actual != expected:
+                    self.stdout.write(self.style.WARNING(f'{name}: fast path output differs from the serializer'))
+                self.stdout.write(
+                    f'{name:>15} {size / serializer_seconds:>11,.0f} {size / fast_seconds:>11,.0f} '
+                    f'{serializer_seconds / fast_seconds:>7.1f}x'
+                )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
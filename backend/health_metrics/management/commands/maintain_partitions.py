@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from health_metrics.partitions import maintain_partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly partitions of HeartRate/SpO2 and detach expired ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, help='Months of partitions to keep ready (default: settings)')
+        parser.add_argument('--retention-months', type=int, help='Detach months older than this (default: settings)')
+        parser.add_argument('--drop', action='store_true', default=None, help='Drop partitions after detaching them')
+
+    def handle(self, *args, **options):
+        summary = maintain_partitions(
+            months_ahead=options['months_ahead'],
+            retention_months=options['retention_months'],
+            drop=options['drop']
+        )
+        for name in summary['created']:
+            self.stdout.write(f'Created {name}')
+        for name in summary['detached']:
+            self.stdout.write(f'Detached {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(summary['created'])} partitions created, {len(summary['detached'])} detached"
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from health_metrics.models import METRIC_MODELS, BaselineStats
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild per-user running baselines from finalized rollups and raw readings, '
+        'or with --check compare them with a full recompute without writing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--metric', action='append', choices=[model._meta.model_name for model in METRIC_MODELS],
+            help='Metric to rebuild, may be repeated (default: all)'
+        )
+        parser.add_argument('--user', type=int, action='append', help='User id to rebuild, may be repeated (default: all)')
+        parser.add_argument('--check', action='store_true', help='Only report baselines that differ from a full recompute')
+        parser.add_argument('--tolerance', type=float, default=1e-6, help='Relative tolerance of --check')
+
+    def handle(self, *args, **options):
+        problems = []
+        for model in METRIC_MODELS:
+            if options['metric'] and model._meta.model_name not in options['metric']:
+                continue
+            if options['check']:
+                found = BaselineStats.objects.verify(model, users=options['user'], tolerance=options['tolerance'])
+                for problem in found:
+                    self.stdout.write(self.style.WARNING(problem))
+                problems.extend(found)
+            else:
+                written = BaselineStats.objects.rebuild(model, users=options['user'])
+                self.stdout.write(self.style.SUCCESS(f'{model._meta.model_name}: {written} baselines'))
+
+        if problems:
+            raise CommandError(f'{len(problems)} baselines differ from a full recompute, run rebuild_baselines to fix them')
+        if options['check']:
+            self.stdout.write(self.style.SUCCESS('Baselines match a full recompute'))
@@ -0,0 +1,33 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from health_metrics.models import METRIC_MODELS, MetricRollup
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild hourly/daily metric rollups from raw readings. '
+        'Inserts into a metric table wait until its rebuild has committed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--metric', action='append', choices=[model._meta.model_name for model in METRIC_MODELS],
+            help='Metric to rebuild, may be repeated (default: all)'
+        )
+        parser.add_argument('--user', type=int, action='append', help='User id to rebuild, may be repeated (default: all)')
+        parser.add_argument('--since', help='Only rebuild buckets from this date onwards (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = timezone.make_aware(datetime.strptime(options['since'], '%Y-%m-%d'))
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
+
+        for model in METRIC_MODELS:
+            if options['metric'] and model._meta.model_name not in options['metric']:
+                continue
+            written = MetricRollup.objects.rebuild(model, users=options['user'], since=since)
+            self.stdout.write(self.style.SUCCESS(f'{model._meta.model_name}: {written} rollup rows'))
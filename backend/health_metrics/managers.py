@@ -1,7 +1,10 @@
-from django.db import models
+from django.apps import apps
+from django.db import connections, models, transaction
 from django.utils import timezone
-from django.db.models import Avg, StdDev
+from django.db.models import Avg, Count, F, Max, Min, Q, Sum, Variance
+from django.db.models.functions import TruncDate, TruncDay, TruncHour
 from datetime import timedelta
+import math
 
 
 class HealthMetricsManager(models.Manager):
@@ -17,6 +20,23 @@ class HealthMetricsManager(models.Manager):
         """Get metrics within date range."""
         return self.filter(timestamp__range=(start_date, end_date))
     
+    def bulk_insert(self, instances, batch_size=500):
+        """
+        Insert unsaved instances with bulk_create in fixed-size chunks.
+
+        bulk_create() does not send post_save, so readings_created is sent for
+        each chunk inside the same transaction as the insert.
+        """
+        from .signals import readings_created
+
+        created = []
+        for start in range(0, len(instances), batch_size):
+            with transaction.atomic(using=self.db):
+                chunk = self.bulk_create(instances[start:start + batch_size])
+                readings_created.send(sender=self.model, instances=chunk)
+            created.extend(chunk)
+        return created
+
     def latest_for_user(self, user, count=1):
         """Get latest user metrics."""
         return self.for_user(user).order_by('-timestamp')[:count]
@@ -24,14 +44,775 @@ class HealthMetricsManager(models.Manager):
     def daily_average(self, user, days=30):
         """Get daily averages over a period."""
         since = timezone.now() - timedelta(days=days)
-        return self.for_user(user).filter(timestamp__gte=since).extra(
-            {'day': "date(timestamp)"}
-        ).values('day').annotate(avg_value=Avg('value'))
+        return self.for_user(user).filter(timestamp__gte=since).annotate(
+            day=TruncDate('timestamp')
+        ).values('day').annotate(avg_value=Avg('value')).order_by('day')
     
-    def get_outliers(self, user, std_devs=2):
-        """Get measurements outside normal distribution."""
-        metrics = self.for_user(user)
-        avg = metrics.aaggregate(avg=Avg('value'))['avg']
-        stddev = metrics.aaggregate(stddev=StdDev('value'))['stddev']
-        return metrics.filter(value__gt=avg + std_devs * stddev | \
-                               metrics.filter(value__lt=avg - std_devs * stddev))
\ No newline at end of file
+    def get_outliers(self, user, std_devs=2, field='value'):
+        """Get measurements outside normal distribution, using the user's running baseline."""
+        baseline = apps.get_model('health_metrics', 'BaselineStats').objects.for_metric(self.model, user, field)
+        if baseline is None or baseline.stddev is None:
+            return self.none()
+
+        low = baseline.mean - std_devs * baseline.stddev
+        high = baseline.mean + std_devs * baseline.stddev
+        return self.for_user(user).filter(Q(**{f'{field}__lt': low}) | Q(**{f'{field}__gt': high}))
+
+
+def _floor_hour(moment):
+    return timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(moment):
+    hour = _floor_hour(moment)
+    return hour if hour == moment else hour + timedelta(hours=1)
+
+
+def _merge_totals(totals, count, total, minimum, maximum):
+    if not count:
+        return
+    totals['count'] += count
+    totals['sum'] += total
+    totals['min'] = minimum if totals['min'] is None else min(totals['min'], minimum)
+    totals['max'] = maximum if totals['max'] is None else max(totals['max'], maximum)
+
+
+class MetricRollupManager(models.Manager):
+    """
+    Model manager for hourly/daily metric rollups.
+
+    Hour and day buckets follow the local timezone, like TruncHour/TruncDay.
+    """
+    PERIODS = {'hour': TruncHour, 'day': TruncDay}
+    UPSERT_BATCH_SIZE = 500
+
+    def for_metric(self, model, user, fields, period, activity_level=None):
+        """Rollups of some value fields of a metric model for a user."""
+        return self.filter(
+            user=user,
+            metric=model._meta.model_name,
+            field__in=fields,
+            period=period,
+            activity_level=activity_level or ''
+        )
+
+    def apply_readings(self, model, instances):
+        """Add newly inserted readings to their hourly and daily buckets."""
+        self._upsert(model._meta.model_name, self._reading_totals(model, instances))
+
+    def _reading_totals(self, model, instances):
+        """(user, field, period, bucket start, split) -> [count, sum, sum of squares, min, max] of readings."""
+        buckets = {}
+        for instance in instances:
+            hour = _floor_hour(instance.timestamp)
+            starts = {'hour': hour, 'day': hour.replace(hour=0)}
+            splits = ['']
+            if model.rollup_split_field:
+                splits.append(getattr(instance, model.rollup_split_field))
+
+            for field in model.value_fields:
+                value = getattr(instance, field)
+                if value is None:
+                    continue
+                for period, bucket_start in starts.items():
+                    for split in splits:
+                        key = (instance.user_id, field, period, bucket_start, split)
+                        totals = buckets.get(key)
+                        if totals is None:
+                            buckets[key] = [1, value, value * value, value, value]
+                        else:
+                            totals[0] += 1
+                            totals[1] += value
+                            totals[2] += value * value
+                            totals[3] = min(totals[3], value)
+                            totals[4] = max(totals[4], value)
+        return buckets
+
+    def _upsert(self, metric, buckets):
+        """
+        Increment bucket totals with INSERT ... ON CONFLICT DO UPDATE.
+
+        Rows are written in key order so concurrent writers lock buckets in
+        the same order and cannot deadlock each other.
+        """
+        if not buckets:
+            return
+
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        key_columns = ', '.join(quote(column) for column in (
+            'user_id', 'metric', 'field', 'period', 'bucket_start', 'activity_level'
+        ))
+        count, total, squares, minimum, maximum = (
+            quote(column) for column in ('count', 'sum', 'sum_squares', 'min', 'max')
+        )
+        statement = (
+            f"INSERT INTO {table} AS rollup ({key_columns}, {count}, {total}, {squares}, {minimum}, {maximum}) "
+            "VALUES {values} "
+            f"ON CONFLICT ({key_columns}) DO UPDATE SET "
+            f"{count} = rollup.{count} + EXCLUDED.{count}, "
+            f"{total} = rollup.{total} + EXCLUDED.{total}, "
+            f"{squares} = rollup.{squares} + EXCLUDED.{squares}, "
+            f"{minimum} = LEAST(rollup.{minimum}, EXCLUDED.{minimum}), "
+            f"{maximum} = GREATEST(rollup.{maximum}, EXCLUDED.{maximum})"
+        )
+
+        rows = sorted(buckets.items())
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), self.UPSERT_BATCH_SIZE):
+                batch = rows[start:start + self.UPSERT_BATCH_SIZE]
+                params = []
+                for (user_id, field, period, bucket_start, split), totals in batch:
+                    params.extend([user_id, metric, field, period, bucket_start, split, *totals])
+                values = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(batch))
+                cursor.execute(statement.format(values=values), params)
+
+    def rebuild(self, model, users=None, since=None, until=None):
+        """
+        Recompute the rollups of a metric model from its raw readings.
+
+        Buckets before the metric's RollupWatermark are never rebuilt, since
+        their raw readings may already have been deleted by retention.
+
+        Args:
+            model: Metric model class
+            users: Optional users (or ids) to restrict the rebuild to
+            since: Optional datetime; rollups from the start of that day onwards are rebuilt
+            until: Optional datetime; rollups before the start of that day are rebuilt
+
+        Returns:
+            Number of rollup rows written
+        """
+        watermark = self.finalized_until(model)
+        if watermark is not None and (since is None or since < watermark):
+            since = watermark
+
+        readings = model.objects.all()
+        rollups = self.filter(metric=model._meta.model_name)
+        if users is not None:
+            readings = readings.filter(user__in=users)
+            rollups = rollups.filter(user__in=users)
+        if since is not None:
+            since = _floor_hour(since).replace(hour=0)
+            readings = readings.filter(timestamp__gte=since)
+            rollups = rollups.filter(bucket_start__gte=since)
+        if until is not None:
+            until = _floor_hour(until).replace(hour=0)
+            readings = readings.filter(timestamp__lt=until)
+            rollups = rollups.filter(bucket_start__lt=until)
+
+        splits = [None]
+        if model.rollup_split_field:
+            splits.append(model.rollup_split_field)
+
+        written = 0
+        with transaction.atomic(using=self.db):
+            # Block inserts into the metric table until the rebuild commits so
+            # that incremental updates cannot be lost or counted twice.
+            with connections[self.db].cursor() as cursor:
+                cursor.execute(f"LOCK TABLE {connections[self.db].ops.quote_name(model._meta.db_table)} IN SHARE MODE")
+            rollups.delete()
+
+            batch = []
+            for period, trunc in self.PERIODS.items():
+                for field, expression in model.value_expressions().items():
+                    for split in splits:
+                        group_by = ['user_id', 'bucket'] + ([split] if split else [])
+                        rows = readings.annotate(
+                            bucket=trunc('timestamp'),
+                            reading_value=expression
+                        ).filter(reading_value__isnull=False).values(*group_by).annotate(
+                            count=Count('reading_value'),
+                            total=Sum('reading_value'),
+                            total_squares=Sum(F('reading_value') * F('reading_value')),
+                            minimum=Min('reading_value'),
+                            maximum=Max('reading_value')
+                        ).order_by()
+
+                        for row in rows.iterator(chunk_size=2000):
+                            batch.append(self.model(
+                                user_id=row['user_id'],
+                                metric=model._meta.model_name,
+                                field=field,
+                                period=period,
+                                bucket_start=row['bucket'],
+                                activity_level=row[split] if split else '',
+                                count=row['count'],
+                                sum=row['total'],
+                                sum_squares=row['total_squares'],
+                                min=row['minimum'],
+                                max=row['maximum']
+                            ))
+                            if len(batch) >= 1000:
+                                written += len(self.bulk_create(batch))
+                                batch = []
+            written += len(self.bulk_create(batch))
+        return written
+
+    def finalized_until(self, model):
+        """The metric's RollupWatermark, or None if no rollups are final yet."""
+        return apps.get_model('health_metrics', 'RollupWatermark').objects.filter(
+            metric=model._meta.model_name
+        ).values_list('finalized_until', flat=True).first()
+
+    def refresh_buckets(self, model, user_id, removed=(), added=()):
+        """
+        Update one user's hourly and daily buckets after readings were edited or deleted.
+
+        `removed` are the readings as they were before (edited or deleted),
+        `added` as they are now. Buckets after the RollupWatermark are
+        recomputed from raw readings. Finalized ones (see rebuild()) can't be,
+        their raw readings may be gone: the removed readings are subtracted
+        from them and the added ones added. Their min and max are kept, so
+        they can only widen.
+        """
+        watermark = self.finalized_until(model)
+        metric = model._meta.model_name
+        days = {
+            _floor_hour(instance.timestamp).replace(hour=0)
+            for instance in [*removed, *added] if instance.timestamp
+        }
+        finalized = {day for day in days if watermark is not None and day < watermark}
+
+        for day in days - finalized:
+            readings = model.objects.filter(
+                user_id=user_id,
+                timestamp__gte=day,
+                timestamp__lt=day + timedelta(days=1)
+            )
+            self.filter(
+                user_id=user_id,
+                metric=metric,
+                bucket_start__gte=day,
+                bucket_start__lt=day + timedelta(days=1)
+            ).delete()
+            self.apply_readings(model, list(readings))
+
+        if finalized:
+            def in_finalized_day(instance):
+                return instance.timestamp and _floor_hour(instance.timestamp).replace(hour=0) in finalized
+
+            subtracted = self._reading_totals(model, filter(in_finalized_day, removed))
+            for (bucket_user, field, period, bucket_start, split), totals in sorted(subtracted.items()):
+                self.filter(
+                    user_id=bucket_user, metric=metric, field=field, period=period,
+                    bucket_start=bucket_start, activity_level=split
+                ).update(
+                    count=F('count') - totals[0],
+                    sum=F('sum') - totals[1],
+                    sum_squares=F('sum_squares') - totals[2]
+                )
+            self._upsert(metric, self._reading_totals(model, filter(in_finalized_day, added)))
+            self.filter(user_id=user_id, metric=metric, bucket_start__lt=watermark, count=0).delete()
+
+    def window_stats(self, model, user, fields, start, end=None, activity_level=None, **lookups):
+        """
+        count, sum, min and max per value field for readings in [start, end).
+
+        Whole hours are read from hourly rollups; only the partial hours at
+        either edge of the window are aggregated from raw readings. Extra
+        `lookups` on the timestamp (e.g. hour__lt=12) apply to both.
+
+        Returns:
+            Dictionary of field -> {'count', 'sum', 'min', 'max'}
+        """
+        level = activity_level or ''
+        return self.window_stats_by_activity(
+            model, user, fields, start, end, activity_levels=[level], **lookups
+        )[level]
+
+    def window_stats_by_activity(self, model, user, fields, start, end=None, activity_levels=('',), **lookups):
+        """
+        window_stats() for several activity levels ('' for all readings) in two queries.
+
+        Returns:
+            Dictionary of activity level -> field -> {'count', 'sum', 'min', 'max'}
+        """
+        first_hour = _ceil_hour(start)
+        last_hour = _floor_hour(end) if end is not None else None
+
+        rollups = self.filter(
+            user=user,
+            metric=model._meta.model_name,
+            field__in=fields,
+            period='hour',
+            activity_level__in=activity_levels,
+            bucket_start__gte=first_hour,
+            **{f'bucket_start__{lookup}': value for lookup, value in lookups.items()}
+        )
+        readings = model.objects.filter(
+            user=user,
+            timestamp__gte=start,
+            **{f'timestamp__{lookup}': value for lookup, value in lookups.items()}
+        )
+        edges = Q(timestamp__lt=first_hour)
+        if end is not None:
+            rollups = rollups.filter(bucket_start__lt=last_hour)
+            readings = readings.filter(timestamp__lt=end)
+            edges |= Q(timestamp__gte=last_hour)
+
+        expressions = model.value_expressions()
+        aggregates = {
+            f'{field}_{name}': aggregate(expressions[field])
+            for field in fields
+            for name, aggregate in (('count', Count), ('sum', Sum), ('min', Min), ('max', Max))
+        }
+        split_field = model.rollup_split_field
+        if split_field and any(activity_levels):
+            raw_rows = readings.filter(edges).values(split_field).annotate(**aggregates).order_by()
+        else:
+            split_field = None
+            raw_rows = [readings.filter(edges).aggregate(**aggregates)]
+
+        stats = {
+            level: {field: {'count': 0, 'sum': 0, 'min': None, 'max': None} for field in fields}
+            for level in activity_levels
+        }
+        for row in raw_rows:
+            # Rows of every activity also count towards the '' (all readings) totals.
+            levels = [''] if split_field is None else ['', row[split_field]]
+            for level in levels:
+                if level not in stats:
+                    continue
+                for field in fields:
+                    _merge_totals(
+                        stats[level][field], row[f'{field}_count'], row[f'{field}_sum'],
+                        row[f'{field}_min'], row[f'{field}_max']
+                    )
+
+        for row in rollups.values('activity_level', 'field').annotate(
+            count_total=Sum('count'), sum_total=Sum('sum'), min_value=Min('min'), max_value=Max('max')
+        ).order_by():
+            _merge_totals(
+                stats[row['activity_level']][row['field']],
+                row['count_total'], row['sum_total'], row['min_value'], row['max_value']
+            )
+        return stats
+
+    def daily_stats(self, model, user, fields, activity_level=None, **lookups):
+        """
+        count, sum, min and max per value field from daily rollups.
+
+        `lookups` filter the day buckets (e.g. bucket_start__date__range=...).
+        """
+        stats = {field: {'count': 0, 'sum': 0, 'min': None, 'max': None} for field in fields}
+        for row in self.for_metric(model, user, fields, 'day', activity_level).filter(**lookups).values(
+            'field'
+        ).annotate(
+            count_total=Sum('count'), sum_total=Sum('sum'), min_value=Min('min'), max_value=Max('max')
+        ).order_by():
+            stats[row['field']].update(
+                count=row['count_total'], sum=row['sum_total'], min=row['min_value'], max=row['max_value']
+            )
+        return stats
+
+    @staticmethod
+    def average(stats):
+        """Mean of one field of window_stats()/daily_stats(), or None without readings."""
+        return stats['sum'] / stats['count'] if stats['count'] else None
+
+
+def _merge_stats(stats, other, alpha):
+    """
+    Chan et al.'s parallel merge of two [count, mean, m2, ewma_sum, ewma_weight, min, max] lists.
+
+    `other` holds the newer readings, so the older EWMA is decayed by its count.
+    """
+    if stats is None:
+        return list(other)
+    count, mean, m2, ewma_sum, ewma_weight, minimum, maximum = stats
+    other_count, other_mean, other_m2, other_ewma_sum, other_ewma_weight, other_min, other_max = other
+    total = count + other_count
+    delta = other_mean - mean
+    decay = (1 - alpha) ** other_count
+    return [
+        total,
+        mean + delta * other_count / total,
+        m2 + other_m2 + delta * delta * count * other_count / total,
+        ewma_sum * decay + other_ewma_sum,
+        ewma_weight * decay + other_ewma_weight,
+        min(minimum, other_min),
+        max(maximum, other_max)
+    ]
+
+
+class BaselineStatsManager(models.Manager):
+    """
+    Model manager for per-user running baselines.
+
+    Every insert batch is summarized in Python and merged into the stored
+    accumulators in SQL, so a baseline is always one row read away.
+    """
+    UPSERT_BATCH_SIZE = 500
+
+    @property
+    def ewma_horizon(self):
+        """Readings older than this many steps weigh less than 1e-18 in the EWMA."""
+        return math.ceil(math.log(1e-18) / math.log(1 - self.model.EWMA_ALPHA))
+
+    def for_metric(self, model, user, field, activity_level=None):
+        """Baseline of one value field of a metric, or None without readings."""
+        return self.filter(
+            user=user,
+            metric=model._meta.model_name,
+            field=field,
+            activity_level=activity_level or ''
+        ).first()
+
+    def apply_readings(self, model, instances):
+        """Merge newly inserted readings into their users' baselines."""
+        alpha = self.model.EWMA_ALPHA
+        groups = {}
+        for instance in sorted(instances, key=lambda instance: instance.timestamp):
+            splits = ['']
+            if model.rollup_split_field:
+                splits.append(getattr(instance, model.rollup_split_field))
+            for field in model.value_fields:
+                value = getattr(instance, field)
+                if value is None:
+                    continue
+                for split in splits:
+                    groups.setdefault((instance.user_id, field, split), []).append(float(value))
+
+        batches = {}
+        for key, values in groups.items():
+            count = len(values)
+            mean = sum(values) / count
+            ewma_sum = ewma_weight = 0.0
+            for value in values:
+                ewma_sum = ewma_sum * (1 - alpha) + alpha * value
+                ewma_weight = ewma_weight * (1 - alpha) + alpha
+            batches[key] = [
+                count, mean, sum((value - mean) ** 2 for value in values),
+                ewma_sum, ewma_weight, min(values), max(values)
+            ]
+        self._upsert(model._meta.model_name, batches)
+
+    def replace_readings(self, model, user_id, removed=(), added=()):
+        """
+        Update one user's baselines after readings were edited or deleted.
+
+        `removed` are the readings as they were before, `added` as they are
+        now. Only the affected (field, activity level) baselines are touched:
+        count, mean and m2 take the readings out and in exactly, and the EWMA
+        is recomputed from the latest ewma_horizon readings, so the cost is
+        bounded by ewma_horizon rather than the user's history. min and max
+        are kept, so they can only widen, as in finalized rollups.
+        """
+        metric = model._meta.model_name
+        changes = {}
+        for index, instances in enumerate((removed, added)):
+            for instance in instances:
+                splits = ['']
+                if model.rollup_split_field:
+                    splits.append(getattr(instance, model.rollup_split_field))
+                for field in model.value_fields:
+                    value = getattr(instance, field)
+                    if value is None:
+                        continue
+                    for split in splits:
+                        changes.setdefault((field, split), ([], []))[index].append(float(value))
+        if not changes:
+            return
+
+        MetricRollup = apps.get_model('health_metrics', 'MetricRollup')
+        watermark = MetricRollup.objects.finalized_until(model)
+        expressions = model.value_expressions()
+        with transaction.atomic(using=self.db):
+            baselines = {
+                (baseline.field, baseline.activity_level): baseline
+                for baseline in self.select_for_update().filter(
+                    user_id=user_id, metric=metric, field__in={field for field, _ in changes}
+                ).order_by('field', 'activity_level')
+            }
+            for (field, level), (taken, given) in sorted(changes.items()):
+                baseline = baselines.get((field, level))
+                count, mean, m2 = (baseline.count, baseline.mean, baseline.m2) if baseline else (0, 0.0, 0.0)
+                minimum, maximum = (baseline.min, baseline.max) if baseline else (None, None)
+                for value in taken:
+                    if count <= 1:
+                        count, mean, m2, minimum, maximum = 0, 0.0, 0.0, None, None
+                        continue
+                    previous_mean = mean
+                    count -= 1
+                    mean = (previous_mean * (count + 1) - value) / count
+                    m2 = max(m2 - (value - previous_mean) * (value - mean), 0.0)
+                for value in given:
+                    count += 1
+                    delta = value - mean
+                    mean += delta / count
+                    m2 += delta * (value - mean)
+                    minimum = value if minimum is None else min(minimum, value)
+                    maximum = value if maximum is None else max(maximum, value)
+
+                if not count:
+                    if baseline:
+                        baseline.delete()
+                    continue
+
+                # Same readings as compute(): after the watermark, latest first
+                readings = model.objects.filter(user_id=user_id).annotate(
+                    reading_value=expressions[field]
+                ).filter(reading_value__isnull=False)
+                if level:
+                    readings = readings.filter(**{model.rollup_split_field: level})
+                if watermark is not None:
+                    readings = readings.filter(timestamp__gte=watermark)
+                ewma_sum = ewma_weight = 0.0
+                decay = 1.0
+                for value in readings.order_by('-timestamp', '-id').values_list(
+                    'reading_value', flat=True
+                )[:self.ewma_horizon]:
+                    ewma_sum += self.model.EWMA_ALPHA * float(value) * decay
+                    ewma_weight += self.model.EWMA_ALPHA * decay
+                    decay *= 1 - self.model.EWMA_ALPHA
+
+                summary = [count, mean, m2, ewma_sum, ewma_weight, minimum, maximum]
+                if baseline is None:
+                    # A concurrent insert may have created the row since; merge into it
+                    self._upsert(metric, {(user_id, field, level): summary})
+                    continue
+                (baseline.count, baseline.mean, baseline.m2, baseline.ewma_sum, baseline.ewma_weight,
+                 baseline.min, baseline.max) = summary
+                baseline.save()
+
+    def _upsert(self, metric, batches):
+        """Merge batch summaries into stored baselines with INSERT ... ON CONFLICT DO UPDATE."""
+        if not batches:
+            return
+
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        key_columns = ', '.join(quote(column) for column in ('user_id', 'metric', 'field', 'activity_level'))
+        count, mean, m2, ewma_sum, ewma_weight, minimum, maximum, updated_at = (
+            quote(column) for column in (
+                'count', 'mean', 'm2', 'ewma_sum', 'ewma_weight', 'min', 'max', 'updated_at'
+            )
+        )
+        decay = f"power({1 - self.model.EWMA_ALPHA!r}, LEAST(EXCLUDED.{count}, {self.ewma_horizon}))"
+        statement = (
+            f"INSERT INTO {table} AS stats ({key_columns}, {count}, {mean}, {m2}, {ewma_sum}, "
+            f"{ewma_weight}, {minimum}, {maximum}, {updated_at}) "
+            "VALUES {values} "
+            f"ON CONFLICT ({key_columns}) DO UPDATE SET "
+            f"{count} = stats.{count} + EXCLUDED.{count}, "
+            f"{mean} = stats.{mean} + (EXCLUDED.{mean} - stats.{mean}) * EXCLUDED.{count} "
+            f"/ (stats.{count} + EXCLUDED.{count}), "
+            f"{m2} = stats.{m2} + EXCLUDED.{m2} + (EXCLUDED.{mean} - stats.{mean}) * (EXCLUDED.{mean} - stats.{mean}) "
+            f"* stats.{count} * EXCLUDED.{count} / (stats.{count} + EXCLUDED.{count}), "
+            f"{ewma_sum} = stats.{ewma_sum} * {decay} + EXCLUDED.{ewma_sum}, "
+            f"{ewma_weight} = stats.{ewma_weight} * {decay} + EXCLUDED.{ewma_weight}, "
+            f"{minimum} = LEAST(stats.{minimum}, EXCLUDED.{minimum}), "
+            f"{maximum} = GREATEST(stats.{maximum}, EXCLUDED.{maximum}), "
+            f"{updated_at} = EXCLUDED.{updated_at}"
+        )
+
+        now = timezone.now()
+        rows = sorted(batches.items())
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), self.UPSERT_BATCH_SIZE):
+                batch = rows[start:start + self.UPSERT_BATCH_SIZE]
+                params = []
+                for (user_id, field, split), totals in batch:
+                    params.extend([user_id, metric, field, split, *totals, now])
+                values = ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(batch))
+                cursor.execute(statement.format(values=values), params)
+
+    def compute(self, model, users=None):
+        """
+        Recompute baselines of a metric from scratch.
+
+        History before the metric's RollupWatermark comes from the finalized
+        daily rollups (its raw readings may be gone); everything after it
+        from raw readings. The EWMA only looks at the latest ewma_horizon
+        raw readings, older ones would not change it.
+
+        Returns:
+            Dictionary of (user id, field, activity level) -> [count, mean, m2,
+            ewma_sum, ewma_weight, min, max]
+        """
+        MetricRollup = apps.get_model('health_metrics', 'MetricRollup')
+        watermark = MetricRollup.objects.finalized_until(model)
+        alpha = self.model.EWMA_ALPHA
+
+        readings = model.objects.all()
+        rollups = MetricRollup.objects.filter(metric=model._meta.model_name, period='day')
+        if users is not None:
+            readings = readings.filter(user__in=users)
+            rollups = rollups.filter(user__in=users)
+        if watermark is not None:
+            readings = readings.filter(timestamp__gte=watermark)
+            rollups = rollups.filter(bucket_start__lt=watermark)
+        else:
+            rollups = rollups.none()
+
+        splits = [None]
+        if model.rollup_split_field:
+            splits.append(model.rollup_split_field)
+
+        stats = {}
+        for row in rollups.values('user_id', 'field', 'activity_level').annotate(
+            count_total=Sum('count'), sum_total=Sum('sum'), squares_total=Sum('sum_squares'),
+            min_value=Min('min'), max_value=Max('max')
+        ).order_by():
+            count = row['count_total']
+            mean = row['sum_total'] / count
+            m2 = max(row['squares_total'] - row['sum_total'] * mean, 0.0)
+            stats[(row['user_id'], row['field'], row['activity_level'])] = [
+                count, mean, m2, 0.0, 0.0, row['min_value'], row['max_value']
+            ]
+
+        connection = connections[self.db]
+        for field, expression in model.value_expressions().items():
+            for split in splits:
+                group_by = ['user_id'] + ([split] if split else [])
+                values = readings.annotate(reading_value=expression).filter(reading_value__isnull=False)
+
+                totals = {}
+                for row in values.values(*group_by).annotate(
+                    count=Count('reading_value'),
+                    mean=Avg('reading_value'),
+                    variance=Variance('reading_value'),
+                    minimum=Min('reading_value'),
+                    maximum=Max('reading_value')
+                ).order_by():
+                    totals[(row['user_id'], row[split] if split else '')] = [
+                        row['count'], float(row['mean']), float(row['variance']) * row['count'],
+                        0.0, 0.0, float(row['minimum']), float(row['maximum'])
+                    ]
+
+                inner_sql, params = values.values(*group_by, 'reading_value', 'timestamp', 'id').order_by().query.sql_with_params()
+                columns = ', '.join(connection.ops.quote_name(column) for column in group_by)
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"""
+                        SELECT {columns},
+                               {alpha!r} * sum(reading_value * power({1 - alpha!r}, rank - 1)),
+                               {alpha!r} * sum(power({1 - alpha!r}, rank - 1))
+                        FROM (
+                            SELECT *, row_number() OVER (
+                                PARTITION BY {columns} ORDER BY "timestamp" DESC, "id" DESC
+                            ) AS rank
+                            FROM ({inner_sql}) readings
+                        ) ranked
+                        WHERE rank <= {self.ewma_horizon}
+                        GROUP BY {columns}
+                        """,
+                        params
+                    )
+                    for row in cursor.fetchall():
+                        key = (row[0], row[1] if split else '')
+                        totals[key][3:5] = [float(row[-2]), float(row[-1])]
+
+                for (user_id, level), summary in totals.items():
+                    key = (user_id, field, level)
+                    stats[key] = _merge_stats(stats.get(key), summary, alpha)
+        return stats
+
+    def rebuild(self, model, users=None):
+        """
+        Replace the stored baselines of a metric with a full recompute.
+
+        A rebuild of every user blocks inserts into the metric table until it
+        commits, like MetricRollupManager.rebuild().
+
+        Returns:
+            Number of baselines written
+        """
+        metric = model._meta.model_name
+        with transaction.atomic(using=self.db):
+            if users is None:
+                with connections[self.db].cursor() as cursor:
+                    cursor.execute(
+                        f"LOCK TABLE {connections[self.db].ops.quote_name(model._meta.db_table)} IN SHARE MODE"
+                    )
+            stats = self.compute(model, users)
+            existing = self.filter(metric=metric)
+            if users is not None:
+                existing = existing.filter(user__in=users)
+            existing.delete()
+            return len(self.bulk_create([
+                self.model(
+                    user_id=user_id, metric=metric, field=field, activity_level=level,
+                    count=count, mean=mean, m2=m2, ewma_sum=ewma_sum, ewma_weight=ewma_weight,
+                    min=minimum, max=maximum
+                )
+                for (user_id, field, level), (count, mean, m2, ewma_sum, ewma_weight, minimum, maximum) in stats.items()
+            ], batch_size=1000))
+
+    def verify(self, model, users=None, tolerance=1e-6):
+        """
+        Compare stored baselines with a full recompute.
+
+        Readings backfilled out of timestamp order legitimately shift the
+        stored EWMA; a rebuild brings it back in line.
+
+        Returns:
+            List of human readable differences, empty when consistent
+        """
+        expected = self.compute(model, users)
+        stored = self.filter(metric=model._meta.model_name)
+        if users is not None:
+            stored = stored.filter(user__in=users)
+
+        names = ('count', 'mean', 'm2', 'ewma_sum', 'ewma_weight', 'min', 'max')
+        problems = []
+        seen = set()
+        for baseline in stored:
+            key = (baseline.user_id, baseline.field, baseline.activity_level)
+            seen.add(key)
+            if key not in expected:
+                problems.append(f"{model._meta.model_name} {key}: stored but has no readings")
+                continue
+            for name, value in zip(names, expected[key]):
+                actual = getattr(baseline, name)
+                if not math.isclose(actual, value, rel_tol=tolerance, abs_tol=tolerance):
+                    problems.append(f"{model._meta.model_name} {key}: {name} is {actual}, expected {value}")
+        for key in expected.keys() - seen:
+            problems.append(f"{model._meta.model_name} {key}: missing")
+        return problems
+
+
+class MetricVersionManager(models.Manager):
+    """Model manager for the per-user, per-metric write counters."""
+
+    def bump(self, model, user_ids):
+        """
+        Increment the version of a metric for these users, creating missing rows.
+
+        Rows are written in user order so concurrent writers cannot deadlock.
+        """
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return
+
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        user_id, metric, version, last_modified = (
+            quote(column) for column in ('user_id', 'metric', 'version', 'last_modified')
+        )
+        values = ', '.join(['(%s, %s, 1, %s)'] * len(user_ids))
+        statement = (
+            f"INSERT INTO {table} AS versions ({user_id}, {metric}, {version}, {last_modified}) "
+            f"VALUES {values} "
+            f"ON CONFLICT ({user_id}, {metric}) DO UPDATE SET "
+            f"{version} = versions.{version} + 1, "
+            f"{last_modified} = EXCLUDED.{last_modified}"
+        )
+
+        now = timezone.now()
+        params = []
+        for user in user_ids:
+            params.extend([user, model._meta.model_name, now])
+        with connection.cursor() as cursor:
+            cursor.execute(statement, params)
+
+    def for_user(self, user_id, metric_models):
+        """Metric name -> (version, last_modified) of a user's readings, for metrics that were ever written."""
+        rows = self.filter(
+            user_id=user_id, metric__in=[model._meta.model_name for model in metric_models]
+        ).values_list('metric', 'version', 'last_modified')
+        return {metric: (version, last_modified) for metric, version, last_modified in rows}
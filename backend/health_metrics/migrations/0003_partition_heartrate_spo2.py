@@ -0,0 +1,98 @@
+# Converts the high-frequency metric tables to monthly range partitions on
+# "timestamp". Primary keys become (id, timestamp) since a partitioned table's
+# unique constraints must include the partition key; ids still come from a
+# sequence so they stay unique. Future partitions are created by
+# health_metrics.partitions (manage.py maintain_partitions / Celery beat).
+
+from django.db import migrations
+
+
+# table -> (user_id index, (user_id, timestamp) index, user foreign key)
+PARTITIONED_TABLES = {
+    'health_metrics_heartrate': (
+        'health_metrics_heartrate_user_id_0651e1e7',
+        'health_metr_user_id_9eef61_idx',
+        'health_metrics_heart_user_id_0651e1e7_fk_users_use',
+    ),
+    'health_metrics_spo2': (
+        'health_metrics_spo2_user_id_03838e95',
+        'health_metr_user_id_f7aab7_idx',
+        'health_metrics_spo2_user_id_03838e95_fk_users_userprofile_id',
+    ),
+}
+
+MONTHS_AHEAD = 3
+
+
+def create_keys_sql(table, user_index, user_timestamp_index, foreign_key, primary_key):
+    return f"""
+        ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ({primary_key});
+        CREATE INDEX "{user_index}" ON "{table}" ("user_id");
+        CREATE INDEX "{user_timestamp_index}" ON "{table}" ("user_id", "timestamp");
+        ALTER TABLE "{table}" ADD CONSTRAINT "{foreign_key}" FOREIGN KEY ("user_id")
+            REFERENCES "users_userprofile" ("id") DEFERRABLE INITIALLY DEFERRED;
+    """
+
+
+def partition_sql(table, user_index, user_timestamp_index, foreign_key):
+    return f"""
+        ALTER TABLE "{table}" RENAME TO "{table}_unpartitioned";
+        CREATE TABLE "{table}" (LIKE "{table}_unpartitioned" INCLUDING CONSTRAINTS)
+            PARTITION BY RANGE ("timestamp");
+
+        -- One partition per UTC month, from the oldest reading (or last month)
+        -- up to {MONTHS_AHEAD} months ahead, plus a default partition for anything else.
+        DO $$
+        DECLARE
+            month timestamp;
+            last_month timestamp := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months';
+        BEGIN
+            SELECT LEAST(
+                date_trunc('month', min("timestamp") AT TIME ZONE 'UTC'),
+                date_trunc('month', now() AT TIME ZONE 'UTC') - interval '1 month'
+            ) INTO month FROM "{table}_unpartitioned";
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_p' || to_char(month, 'YYYY_MM'), '{table}',
+                    month::text || '+00', (month + interval '1 month')::text || '+00'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$;
+        CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT;
+
+        INSERT INTO "{table}" SELECT * FROM "{table}_unpartitioned";
+        DROP TABLE "{table}_unpartitioned";
+
+        CREATE SEQUENCE "{table}_id_seq" OWNED BY "{table}"."id";
+        SELECT setval('"{table}_id_seq"', COALESCE((SELECT max("id") FROM "{table}"), 0) + 1, false);
+        ALTER TABLE "{table}" ALTER COLUMN "id" SET DEFAULT nextval('"{table}_id_seq"');
+    """ + create_keys_sql(table, user_index, user_timestamp_index, foreign_key, '"id", "timestamp"')
+
+
+def unpartition_sql(table, user_index, user_timestamp_index, foreign_key):
+    return f"""
+        ALTER TABLE "{table}" RENAME TO "{table}_partitioned";
+        CREATE TABLE "{table}" (LIKE "{table}_partitioned" INCLUDING CONSTRAINTS);
+        INSERT INTO "{table}" SELECT * FROM "{table}_partitioned";
+        DROP TABLE "{table}_partitioned" CASCADE;
+
+        ALTER TABLE "{table}" ALTER COLUMN "id" ADD GENERATED BY DEFAULT AS IDENTITY;
+        SELECT setval(pg_get_serial_sequence('"{table}"', 'id'), COALESCE((SELECT max("id") FROM "{table}"), 0) + 1, false);
+    """ + create_keys_sql(table, user_index, user_timestamp_index, foreign_key, '"id"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health_metrics', '0002_metricrollup'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=partition_sql(table, *names),
+            reverse_sql=unpartition_sql(table, *names),
+        )
+        for table, names in PARTITIONED_TABLES.items()
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2025-04-22 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health_metrics', '0003_partition_heartrate_spo2'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=20, unique=True)),
+                ('finalized_until', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2025-04-23 16:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health_metrics', '0005_baselinestats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Alert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=20)),
+                ('field', models.CharField(max_length=20)),
+                ('detector', models.CharField(choices=[('zscore', 'Z-score'), ('cusum', 'CUSUM change point'), ('rate', 'Rate of change')], max_length=10)),
+                ('severity', models.CharField(choices=[('warning', 'Warning'), ('critical', 'Critical')], max_length=10)),
+                ('value', models.FloatField()),
+                ('score', models.FloatField()),
+                ('message', models.CharField(max_length=255)),
+                ('timestamp', models.DateTimeField()),
+                ('acknowledged', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['user', '-timestamp'], name='alert_user_timestamp_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DetectorState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=20)),
+                ('field', models.CharField(max_length=20)),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('mean', models.FloatField(default=0)),
+                ('variance', models.FloatField(default=0)),
+                ('cusum_high', models.FloatField(default=0)),
+                ('cusum_low', models.FloatField(default=0)),
+                ('last_value', models.FloatField(null=True)),
+                ('last_timestamp', models.DateTimeField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'metric', 'field'), name='unique_detector_state')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Build the rollups of readings stored before rollups were maintained on insert.
+
+    The daily steps weekly average, blood pressure time-of-day averages and
+    the heart rate comparison to a baseline window read rollups, so they are
+    empty until this has run. Metrics without readings (e.g. a new database)
+    are skipped.
+    """
+    # Deliberately the live models rather than apps.get_model(): the bucket
+    # aggregation (local-time truncation, activity splits, watermark) lives in
+    # MetricRollupManager.rebuild(), which historical models don't carry, and
+    # a copy here would drift from the incremental updates. If a later change
+    # to those models breaks this, turn it into a no-op and leave the backfill
+    # to `manage.py rebuild_rollups`.
+    from health_metrics.models import METRIC_MODELS, MetricRollup
+
+    for model in METRIC_MODELS:
+        if model.objects.exists():
+            MetricRollup.objects.rebuild(model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health_metrics', '0007_metricversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
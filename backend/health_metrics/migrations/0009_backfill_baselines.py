@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def backfill_baselines(apps, schema_editor):
+    """
+    Build the running baselines of readings stored before baselines were maintained on insert.
+
+    The heart rate resting average, outlier checks and the anomaly detectors'
+    starting state read baselines, so they are empty until this has run.
+    Runs after the rollup backfill, since history before the RollupWatermark
+    comes from the finalized daily rollups. Metrics without readings are
+    skipped.
+    """
+    # The live models, as in 0008_backfill_rollups: the computation lives in
+    # BaselineStatsManager.rebuild(). If a later change to those models breaks
+    # this, turn it into a no-op and leave the backfill to
+    # `manage.py rebuild_baselines`.
+    from health_metrics.models import METRIC_MODELS, BaselineStats
+
+    for model in METRIC_MODELS:
+        if model.objects.exists():
+            BaselineStats.objects.rebuild(model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('health_metrics', '0008_backfill_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_baselines, migrations.RunPython.noop),
+    ]
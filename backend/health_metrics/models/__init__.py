@@ -3,6 +3,13 @@ from .blood_pressure import BloodPressure
 from .spo2 import SpO2
 from .daily_steps import DailySteps
 from .sleep_duration import SleepDuration
+from .rollup import MetricRollup, RollupWatermark
+from .baseline import BaselineStats
+from .alert import Alert, DetectorState
+from .version import MetricVersion
 
 
-__all__  = ['HeartRate', 'BloodPressure', 'SpO2', 'DailySteps', 'SleepDuration']
\ No newline at end of file
+METRIC_MODELS = (HeartRate, BloodPressure, SpO2, DailySteps, SleepDuration)
+
+
+__all__  = ['HeartRate', 'BloodPressure', 'SpO2', 'DailySteps', 'SleepDuration', 'MetricRollup', 'RollupWatermark', 'BaselineStats', 'Alert', 'DetectorState', 'MetricVersion', 'METRIC_MODELS']
\ No newline at end of file
@@ -0,0 +1,72 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class Alert(models.Model):
+    """
+    An anomalous reading flagged by one of the streaming detectors in anomaly.py.
+
+    Readings of partitioned metrics have a composite primary key, so an alert
+    points at its reading through metric, field and timestamp.
+    """
+    DETECTOR_CHOICES = [
+        ('zscore', 'Z-score'),
+        ('cusum', 'CUSUM change point'),
+        ('rate', 'Rate of change')
+    ]
+
+    SEVERITY_CHOICES = [
+        ('warning', 'Warning'),
+        ('critical', 'Critical')
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='alerts')
+    metric = models.CharField(max_length=20)
+    field = models.CharField(max_length=20)
+    detector = models.CharField(max_length=10, choices=DETECTOR_CHOICES)
+    severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES)
+    value = models.FloatField()
+    score = models.FloatField()
+    message = models.CharField(max_length=255)
+    timestamp = models.DateTimeField()
+    acknowledged = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['user', '-timestamp'], name='alert_user_timestamp_idx')
+        ]
+
+    def __str__(self):
+        return f"{self.severity} {self.detector} alert on {self.metric}.{self.field} of user {self.user_id}"
+
+
+class DetectorState(models.Model):
+    """
+    Streaming anomaly detector state of one user's value field.
+
+    mean/variance are exponentially weighted (the rolling baseline), the
+    cusum_* columns are the one-sided CUSUM sums in standard deviations.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    metric = models.CharField(max_length=20)
+    field = models.CharField(max_length=20)
+    count = models.PositiveBigIntegerField(default=0)
+    mean = models.FloatField(default=0)
+    variance = models.FloatField(default=0)
+    cusum_high = models.FloatField(default=0)
+    cusum_low = models.FloatField(default=0)
+    last_value = models.FloatField(null=True)
+    last_timestamp = models.DateTimeField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'metric', 'field'], name='unique_detector_state')
+        ]
+
+    def __str__(self):
+        return f"{self.metric}.{self.field} detector state of user {self.user_id}"
@@ -1,5 +1,5 @@
 from ..managers import HealthMetricsManager
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.exceptions import ValidationError
@@ -27,6 +27,12 @@ class HealthMetric(models.Model):
 
     objects = HealthMetricsManager()
 
+    # Numeric fields that can be aggregated (series, rollups, baselines).
+    value_fields = ()
+
+    # Categorical field whose values get their own rollup rows.
+    rollup_split_field = None
+
     # Meta Options
     class Meta:
         abstract = True
@@ -35,6 +41,12 @@ class HealthMetric(models.Model):
             models.Index(fields=['user', 'timestamp'])
         ]
     
+    def save(self, *args, **kwargs):
+        # post_save receivers (rollups, baselines, MetricVersion, see signals.py)
+        # commit or roll back together with the reading, also under autocommit.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     # Abstract methods  
     def clean(self):
         if not self.timestamp:
@@ -44,6 +56,11 @@ class HealthMetric(models.Model):
         raise NotImplementedError("Subclasses must implement this method.")
     
     # Concrete methods
+    @classmethod
+    def value_expressions(cls):
+        """Map each of value_fields to the SQL expression used to aggregate it."""
+        return {field: models.F(field) for field in cls.value_fields}
+
     def get_trend(self, days=7):
         since = timezone.now() - timedelta(days=days)
         return self.__class__.objects.for_user(self.user).filter(
@@ -0,0 +1,58 @@
+from ..managers import BaselineStatsManager
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class BaselineStats(models.Model):
+    """
+    Running statistics of a value field per user, metric and activity level.
+
+    count/mean/m2 are Welford's accumulators (m2 is the sum of squared
+    deviations from the mean), so variance never needs a pass over readings.
+    The EWMA is kept as a decayed weighted sum and weight, which makes it
+    bias-free for the first readings and mergeable across insert batches.
+    An empty activity_level holds every reading, like MetricRollup.
+    """
+    EWMA_ALPHA = 0.05
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    metric = models.CharField(max_length=20)
+    field = models.CharField(max_length=20)
+    activity_level = models.CharField(max_length=20, blank=True, default='')
+    count = models.PositiveBigIntegerField(default=0)
+    mean = models.FloatField(default=0)
+    m2 = models.FloatField(default=0)
+    ewma_sum = models.FloatField(default=0)
+    ewma_weight = models.FloatField(default=0)
+    min = models.FloatField(null=True)
+    max = models.FloatField(null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BaselineStatsManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'metric', 'field', 'activity_level'],
+                name='unique_baseline_stats'
+            )
+        ]
+
+    @property
+    def variance(self):
+        """Sample variance, None with fewer than two readings."""
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    @property
+    def stddev(self):
+        variance = self.variance
+        return variance ** 0.5 if variance is not None else None
+
+    @property
+    def ewma(self):
+        return self.ewma_sum / self.ewma_weight if self.ewma_weight else None
+
+    def __str__(self):
+        return f"{self.metric}.{self.field} baseline of user {self.user_id} (n={self.count}, mean={self.mean:.1f})"
@@ -1,6 +1,7 @@
 from .base import HealthMetric
+from .rollup import MetricRollup
 from django.db import models
-from django.db.models import Avg, Q
+from django.db.models import Q
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
@@ -14,6 +15,7 @@ class BloodPressure(HealthMetric):
     diastolic = models.PositiveSmallIntegerField()
     pulse = models.PositiveSmallIntegerField(null=True, blank=True)
 
+    value_fields = ('systolic', 'diastolic', 'pulse')
 
     def clean(self):
         if self.systolic <= self.diastolic:
@@ -51,22 +53,18 @@ class BloodPressure(HealthMetric):
     
     def get_average_by_time_of_day(self, days=30):
         """Analyze patterns in morning and evening readings."""
-        recent_data = self.__class__.objects.filter(
-            user=self.user,
-            timestamp__gte=timezone.now() - timezone.timedelta(days=days)
-        )
+        since = timezone.now() - timezone.timedelta(days=days)
 
-        morning = recent_data.filter(timestamp__hour__lt=12).aggregate(
-            avg_systolic=Avg('systolic'),
-            avg_diastolic=Avg('diastolic')
-        )
-
-        evening = recent_data.filter(timestamp__hour__gte=12).aggregate(
-            avg_systolic=Avg('systolic'),
-            avg_diastolic=Avg('diastolic')
-        )
+        def averages(**hour_lookup):
+            stats = MetricRollup.objects.window_stats(
+                self.__class__, self.user, ['systolic', 'diastolic'], start=since, **hour_lookup
+            )
+            return {
+                'avg_systolic': MetricRollup.objects.average(stats['systolic']),
+                'avg_diastolic': MetricRollup.objects.average(stats['diastolic'])
+            }
 
-        return {'morning': morning, 'evening': evening}
+        return {'morning': averages(hour__lt=12), 'evening': averages(hour__gte=12)}
     
 
     def is_consistently_elevated(self, days=7):
@@ -1,8 +1,8 @@
 from .base import HealthMetric
+from .rollup import MetricRollup
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from django.db.models import Avg
 
 
 class DailySteps(HealthMetric):
@@ -23,6 +23,8 @@ class DailySteps(HealthMetric):
     )
     distance = models.FloatField(null=True, blank=True, help_text="Distance in kilometers")
 
+    value_fields = ('count', 'distance')
+
     def clean(self):
         if self.count > 100000:
             raise ValidationError("Step count exceeds reasonable daily limit (100,000)")
@@ -55,10 +57,11 @@ class DailySteps(HealthMetric):
         end_date = self.timestamp.date()
         start_date = end_date - timezone.timedelta(days=6)
 
-        return self.__class__.objects.filter(
-            user=self.user,
-            timestamp__date__range=(start_date, end_date)
-        ).aggregate(avg_steps=Avg('count'))['avg_steps'] or 0
+        stats = MetricRollup.objects.daily_stats(
+            self.__class__, self.user, ['count'],
+            bucket_start__date__range=(start_date, end_date)
+        )
+        return MetricRollup.objects.average(stats['count']) or 0
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.count} steps on {self.timestamp.strftime('%Y-%m-%d')}"
\ No newline at end of file
@@ -1,9 +1,10 @@
 from .base import HealthMetric
+from .baseline import BaselineStats
+from .rollup import MetricRollup
 from django.db import models
 from django.core.exceptions import ValidationError
-from django.db.models import Avg
 from datetime import timedelta
-import math
+import numpy as np
 
 class HeartRate(HealthMetric):
     """
@@ -20,6 +21,9 @@ class HeartRate(HealthMetric):
     value = models.PositiveSmallIntegerField()
     activity_level = models.CharField(max_length=20, choices=ACTIVITY_CHOICES)
 
+    value_fields = ('value',)
+    rollup_split_field = 'activity_level'
+
     def clean(self):
         super().clean()
         if not (30 <= self.value <= 220):
@@ -50,7 +54,8 @@ class HeartRate(HealthMetric):
         return self.value < 60
     
     def get_resting_average(self):
-        return HeartRate.objects.filter(user=self.user, activity_level='resting').aggregate(avg=Avg('value'))['avg']
+        baseline = BaselineStats.objects.for_metric(HeartRate, self.user, 'value', 'resting')
+        return baseline.mean if baseline else None
     
     def calculate_hrv(self, time_window=24):
         """
@@ -63,60 +68,69 @@ class HeartRate(HealthMetric):
         Returns:
             HRV value or None if insufficient data
         """
-        # Get recent heart rate measurements in chronological order
+        summary = self.get_hrv_summary(time_window)
+        return summary['rmssd'] if summary else None
+
+    def get_hrv_summary(self, time_window=24):
+        """
+        RMSSD, SDNN and pNN50 over the readings in the window ending at this one.
+
+        Args:
+            time_window: Hours to look back for measurements, default 24 hours
+
+        Returns:
+            Dictionary with rmssd, sdnn, pnn50 and count, or None if insufficient data
+        """
+        from ..hrv import compute_hrv
+
+        # Get recent heart rate measurements in chronological order, as a compact array.
         since = self.timestamp - timedelta(hours=time_window)
         measurements = HeartRate.objects.filter(
             user=self.user,
             timestamp__gte=since,
             timestamp__lte=self.timestamp
-        ).order_by('timestamp').values_list('value', flat=True)
+        ).order_by('timestamp', 'id').values_list('value', flat=True)
 
-        # Need at least two measurements to calculate variability.
-        if len(measurements) < 2:
-            return None
-        
-        # Calculate successive differences
-        successive_diffs = []
-        for i in range(1, len(measurements)):
-            diff = measurements[i] - measurements[i-1]
-            successive_diffs.append(diff ** 2)
-
-        if not successive_diffs:
-            return None
-        
-        mean_squared_diff =  sum(successive_diffs) / len(successive_diffs)
-        hrv = math.sqrt(mean_squared_diff)
-        
-        return round(hrv, 2)
+        return compute_hrv(np.fromiter(measurements.iterator(), dtype=np.int16))
     
     def compare_to_baseline(self, baseline_days=30, baseline_activity=None):
         """
         Compare current heart rate to user's baseline
 
         Args:
-        baseline_days: Number of days to use for baseline calculation
+        baseline_days: Number of days to use for baseline calculation, None for the user's running baseline
         baseline_activity: If provided, only compare to this activity level
 
         Returns:
         Dictionary with difference from baseline and percent change
         """
-        # Calculate baseline from historical data.
-        query = HeartRate.objects.filter(
-            user=self.user,
-            timestamp__lt=self.timestamp,
-            timestamp__gte=self.timestamp - timedelta(days=baseline_days)
-        )
+        #If comparing against all activities, prefer to compare against same activity
+        activity_levels = [baseline_activity] if baseline_activity else [self.activity_level, '']
 
-        # Filter by activity if specified.
-        if baseline_activity:
-            query = query.filter(activity_level=baseline_activity)
+        if baseline_days is None:
+            baselines = {
+                baseline.activity_level: baseline.mean
+                for baseline in BaselineStats.objects.filter(
+                    user=self.user, metric='heartrate', field='value', activity_level__in=activity_levels
+                )
+            }
         else:
-            #If comparing against all activities, prefer to compare against same activity
-            same_activity = query.filter(activity_level=self.activity_level)
-            if same_activity.exists():
-                query = same_activity
+            # Calculate baseline from hourly rollups plus the partial hours at the window edges,
+            # for every candidate activity level at once.
+            stats = MetricRollup.objects.window_stats_by_activity(
+                HeartRate, self.user, ['value'],
+                start=self.timestamp - timedelta(days=baseline_days),
+                end=self.timestamp,
+                activity_levels=activity_levels
+            )
+            baselines = {
+                level: MetricRollup.objects.average(level_stats['value'])
+                for level, level_stats in stats.items()
+            }
 
-        baseline = query.aggregate(avg=Avg('value'))['avg']
+        baseline = next(
+            (baselines[level] for level in activity_levels if baselines.get(level) is not None), None
+        )
 
         if baseline is None:
             return None
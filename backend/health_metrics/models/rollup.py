@@ -0,0 +1,63 @@
+from ..managers import MetricRollupManager
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class MetricRollup(models.Model):
+    """
+    Pre-aggregated readings per user, metric, value field and hour or day.
+
+    Kept up to date incrementally whenever readings are inserted (see
+    signals.py) and rebuilt from raw readings with `manage.py rebuild_rollups`.
+    An empty activity_level holds every reading of the bucket; metrics with a
+    rollup_split_field (heart rate) get one extra row per activity level.
+    """
+    PERIOD_CHOICES = [
+        ('hour', 'Hour'),
+        ('day', 'Day')
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    metric = models.CharField(max_length=20)
+    field = models.CharField(max_length=20)
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    bucket_start = models.DateTimeField()
+    activity_level = models.CharField(max_length=20, blank=True, default='')
+    count = models.PositiveIntegerField(default=0)
+    sum = models.FloatField(default=0)
+    sum_squares = models.FloatField(default=0)
+    min = models.FloatField(null=True)
+    max = models.FloatField(null=True)
+
+    objects = MetricRollupManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'metric', 'field', 'period', 'bucket_start', 'activity_level'],
+                name='unique_metric_rollup_bucket'
+            )
+        ]
+
+    @property
+    def average(self):
+        return self.sum / self.count if self.count else None
+
+    def __str__(self):
+        return f"{self.metric}.{self.field} {self.period} @ {self.bucket_start:%Y-%m-%d %H:%M} (n={self.count})"
+
+
+class RollupWatermark(models.Model):
+    """
+    Rollups of a metric before finalized_until are final.
+
+    The retention policy deletes raw readings older than that, so those
+    buckets can no longer be rebuilt from raw readings.
+    """
+    metric = models.CharField(max_length=20, unique=True)
+    finalized_until = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.metric} finalized until {self.finalized_until:%Y-%m-%d %H:%M}"
@@ -1,5 +1,6 @@
 from .base import HealthMetric
 from django.db import models
+from django.db.models import Avg, ExpressionWrapper, F, Func
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 import datetime
@@ -21,6 +22,19 @@ class SleepDuration(HealthMetric):
         help_text="Number of times sleep was interrupted."
     )
 
+    value_fields = ('duration', 'quality', 'interruptions')
+
+    @classmethod
+    def value_expressions(cls):
+        """Duration is a property, so it is computed in SQL as hours between start and end."""
+        expressions = super().value_expressions()
+        expressions['duration'] = Func(
+            ExpressionWrapper(F('end_time') - F('start_time'), output_field=models.DurationField()),
+            template='EXTRACT(EPOCH FROM %(expressions)s) / 3600.0',
+            output_field=models.FloatField()
+        )
+        return expressions
+
     def clean(self):
         if self.end_time <= self.start_time:
             raise ValidationError("Stop time must be after start time.")
@@ -87,24 +101,18 @@ class SleepDuration(HealthMetric):
         end_date = timezone.now()
         start_date = end_date - timezone.timedelta(days=days)
 
-        sleep_sessions = SleepDuration.objects.filter(
+        # Sessions are selected by start/end time rather than by timestamp
+        # bucket, so the average is computed in SQL instead of from rollups.
+        average = SleepDuration.objects.filter(
             user=self.user,
             start_time__gte=start_date,
             end_time__lte=end_date
-        )
-        
-        if not sleep_sessions.exists():
-            return None
-        
-        # Calculate average duration directly
-        # Since duration is a property, we need to calculate it for each session
-        total_duration = sum(session.duration for session in sleep_sessions)
-        count = sleep_sessions.count()
+        ).aggregate(avg=Avg(SleepDuration.value_expressions()['duration']))['avg']
 
-        if count == 0:
+        if average is None:
             return None
-        
-        return round(total_duration / count, 2)
+
+        return round(average, 2)
 
     def __str__(self):
         duration_str = f"{self.duration:.1f} hours" 
@@ -20,6 +20,8 @@ class SpO2(HealthMetric):
         default='OTHER'
     )
 
+    value_fields = ('value',)
+
     def clean(self):
         if not (70 <= self.value <= 100):
             raise ValidationError("SpO2 value must be between 70% and 100%")
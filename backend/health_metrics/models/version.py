@@ -0,0 +1,31 @@
+from ..managers import MetricVersionManager
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class MetricVersion(models.Model):
+    """
+    Write counter of one user's readings of one metric.
+
+    Bumped in the same transaction as every insert, update and delete of
+    readings (see HealthMetric.save(), bulk_insert(), BaseHealthMetricsViewSet
+    and retention.py), so
+    it changes whenever anything built from those readings may change. The
+    conditional GET validators of metric endpoints are derived from it.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    metric = models.CharField(max_length=20)
+    version = models.PositiveBigIntegerField(default=0)
+    last_modified = models.DateTimeField()
+
+    objects = MetricVersionManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'metric'], name='unique_metric_version')
+        ]
+
+    def __str__(self):
+        return f"{self.metric} of user {self.user_id} at version {self.version}"
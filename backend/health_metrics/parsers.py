@@ -0,0 +1,30 @@
+"""
+Parsers of the REST API.
+
+ORJSONParser is the default JSON parser (see REST_FRAMEWORK in settings).
+"""
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser decoding with orjson.
+
+    Like DRF's strict mode, NaN and Infinity are rejected. Bodies that are not
+    UTF-8 are decoded to str first, as orjson only reads UTF-8 bytes.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            data = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (orjson.JSONDecodeError, UnicodeDecodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,195 @@
+"""
+Maintenance of the monthly range partitions of the high-frequency metric tables.
+
+Migration 0003 turns HeartRate and SpO2 into tables partitioned by UTC month
+on "timestamp", named <table>_pYYYY_MM, plus a <table>_default partition
+that catches readings no monthly partition covers. The helpers here keep
+partitions created ahead of time and detach months older than the retention
+window, once their rollups are final, configured through
+settings.HEALTH_METRIC_PARTITIONS.
+"""
+import re
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import HeartRate, MetricVersion, SpO2
+from .retention import finalize_rollups
+
+PARTITIONED_MODELS = (HeartRate, SpO2)
+
+DEFAULTS = {
+    'MONTHS_AHEAD': 3,
+    'RETENTION_MONTHS': None,
+    'DROP_DETACHED': False,
+}
+
+PARTITION_SUFFIX = re.compile(r'_p(\d{4})_(\d{2})$')
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'HEALTH_METRIC_PARTITIONS', {})}
+
+
+def month_start(moment):
+    """Start of the UTC month containing `moment`."""
+    moment = moment.astimezone(dt_timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def list_partitions(model):
+    """Month -> name of the monthly partitions attached to the model's table."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            """,
+            [model._meta.db_table]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        match = PARTITION_SUFFIX.search(name)
+        if match:
+            partitions[datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)] = name
+    return dict(sorted(partitions.items()))
+
+
+def create_partition(model, month):
+    """
+    Create the partition for the UTC month starting at `month`.
+
+    PostgreSQL refuses to add a partition while the default partition holds
+    rows in its range, so those rows are moved into the new partition with
+    the default partition detached for the duration of the transaction.
+    """
+    table = model._meta.db_table
+    default = f"{table}_default"
+    name = partition_name(table, month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE "timestamp" >= %s AND "timestamp" < %s)',
+            [start, end]
+        )
+        has_default_rows = cursor.fetchone()[0]
+
+        if has_default_rows:
+            # Check the deferred user foreign key right away, ALTER TABLE is
+            # not allowed while trigger events are pending.
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"')
+
+        cursor.execute(
+            f'CREATE TABLE "{name}" PARTITION OF "{table}" FOR VALUES FROM (\'{start}\') TO (\'{end}\')'
+        )
+
+        if has_default_rows:
+            cursor.execute(
+                f'INSERT INTO "{table}" SELECT * FROM "{default}" WHERE "timestamp" >= %s AND "timestamp" < %s',
+                [start, end]
+            )
+            cursor.execute(
+                f'DELETE FROM "{default}" WHERE "timestamp" >= %s AND "timestamp" < %s',
+                [start, end]
+            )
+            cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT')
+    return name
+
+
+def ensure_partitions(model, months_ahead=None, since=None):
+    """
+    Create missing monthly partitions.
+
+    Covers every month from `since` (default: the current month) up to
+    `months_ahead` months from now, plus any month that has readings sitting
+    in the default partition.
+
+    Returns:
+        Names of the partitions created
+    """
+    if months_ahead is None:
+        months_ahead = get_config()['MONTHS_AHEAD']
+
+    current = month_start(timezone.now())
+    month = month_start(since) if since else current
+    wanted = set()
+    while month <= add_months(current, months_ahead):
+        wanted.add(month)
+        month = add_months(month, 1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""SELECT DISTINCT date_trunc('month', "timestamp" AT TIME ZONE 'UTC')
+            FROM "{model._meta.db_table}_default\""""
+        )
+        wanted.update(row[0].replace(tzinfo=dt_timezone.utc) for row in cursor.fetchall())
+
+    existing = list_partitions(model)
+    return [create_partition(model, month) for month in sorted(wanted) if month not in existing]
+
+
+def detach_expired_partitions(model, retention_months=None, drop=None):
+    """
+    Detach monthly partitions whose whole month is older than the retention window.
+
+    The metric's rollups up to the end of the newest expired month are
+    finalized first (see retention.finalize_rollups), in the same
+    transaction, so later rebuilds keep them. The MetricVersion of every
+    user with readings in a detached month is bumped.
+
+    Detached partitions are left as standalone tables (for archiving) unless
+    `drop` is set.
+
+    Returns:
+        Names of the partitions detached
+    """
+    config = get_config()
+    if retention_months is None:
+        retention_months = config['RETENTION_MONTHS']
+    if drop is None:
+        drop = config['DROP_DETACHED']
+    if retention_months is None:
+        return []
+
+    cutoff = add_months(month_start(timezone.now()), -retention_months)
+    expired = {month: name for month, name in list_partitions(model).items() if add_months(month, 1) <= cutoff}
+    if not expired:
+        return []
+
+    table = model._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        finalize_rollups(model, add_months(max(expired), 1))
+        user_ids = set()
+        for name in expired.values():
+            cursor.execute(f'SELECT DISTINCT "user_id" FROM "{name}"')
+            user_ids.update(row[0] for row in cursor.fetchall())
+            cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+            if drop:
+                cursor.execute(f'DROP TABLE "{name}"')
+        if user_ids:
+            MetricVersion.objects.bump(model, user_ids)
+    return list(expired.values())
+
+
+def maintain_partitions(months_ahead=None, retention_months=None, drop=None):
+    """Create upcoming partitions and detach expired ones for every partitioned model."""
+    summary = {'created': [], 'detached': []}
+    for model in PARTITIONED_MODELS:
+        summary['created'].extend(ensure_partitions(model, months_ahead=months_ahead))
+        summary['detached'].extend(detach_expired_partitions(model, retention_months=retention_months, drop=drop))
+    return summary
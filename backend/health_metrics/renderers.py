@@ -0,0 +1,74 @@
+"""
+Renderers of the REST API.
+
+ORJSONRenderer is the default JSON renderer (see REST_FRAMEWORK in settings).
+
+The columnar renderers serve bulk reads of metric endpoints. List actions
+hand them a pyarrow Table built by the ListPlan (see listing.py), so
+readings go from database rows to typed Arrow columns without a dict per
+row. Other payloads (details, analytics actions, errors) are converted with
+Table.from_pylist().
+"""
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson.
+
+    datetimes, dates, times and UUIDs are encoded natively (UTC as 'Z', like
+    DRF). Anything else orjson can't encode, e.g. Decimal, timedelta or lazy
+    translations, goes through DRF's JSONEncoder.default so the output is
+    the same as the stdlib renderer's. Indented output, as requested by the
+    browsable API, is left to the stdlib renderer.
+    """
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=self.encoder.default, option=self.options)
+
+
+class ColumnarRenderer(BaseRenderer):
+    """Base class of renderers whose body is a pyarrow Table in some binary format."""
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not isinstance(data, pa.Table):
+            data = pa.Table.from_pylist(data if isinstance(data, list) else [data])
+        sink = pa.BufferOutputStream()
+        self.write(data, sink)
+        return sink.getvalue().to_pybytes()
+
+    def write(self, table, sink):
+        raise NotImplementedError('ColumnarRenderer subclasses must implement write()')
+
+
+class ArrowStreamRenderer(ColumnarRenderer):
+    """Arrow IPC stream, readable with pyarrow.ipc.open_stream()."""
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+
+    def write(self, table, sink):
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+class ParquetRenderer(ColumnarRenderer):
+    """Parquet file, readable with pyarrow.parquet.read_table() or pandas.read_parquet()."""
+    media_type = 'application/vnd.apache.parquet'
+    format = 'parquet'
+
+    def write(self, table, sink):
+        pq.write_table(table, sink)
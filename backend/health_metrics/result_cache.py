@@ -0,0 +1,144 @@
+"""
+Result cache for analytics actions of metric viewsets.
+
+The data of a successful response is cached under a key made of the metric,
+the user, the user's MetricVersion of that metric, the action and its query
+parameters. The version is bumped in the same transaction as any write of
+the user's readings, so saving a reading invalidates every cached result of
+that user and metric at commit time; the orphaned entries are evicted when
+their TIMEOUT_SECONDS run out. The timeout also bounds how long results
+relative to now ("last 7 days") are reused.
+
+Hits and misses are counted per metric and action in the cache itself, so
+the counts cover every worker (see get_stats()). The cache never fails a
+request: while it is unreachable actions are computed as if it were empty,
+and it is retried after RETRY_SECONDS. Configured through
+settings.HEALTH_METRIC_RESULT_CACHE.
+"""
+import hashlib
+import logging
+import time
+from functools import wraps
+import redis
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+from .models import MetricVersion
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'TIMEOUT_SECONDS': 60,
+    'RETRY_SECONDS': 30,
+}
+
+KEY_PREFIX = 'health_metrics:results'
+
+# Query parameters that change the rendering of a result, not the result
+IGNORED_PARAMS = ('format',)
+
+_unavailable_until = 0.0
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'HEALTH_METRIC_RESULT_CACHE', {})}
+
+
+def get_cache():
+    return caches[get_config()['CACHE']]
+
+
+def counter_key(kind, name):
+    return f'{KEY_PREFIX}:{kind}:{name}'
+
+
+def result_key(metric, user_id, version, action, params):
+    """Cache key of an action's result for one version of a user's readings."""
+    query = '&'.join(
+        f'{name}={value}' for name, value in sorted(params.items()) if name not in IGNORED_PARAMS
+    )
+    digest = hashlib.md5(query.encode()).hexdigest()
+    return f'{KEY_PREFIX}:{metric}:{user_id}:{version}:{action}:{digest}'
+
+
+def _call(operation, *args):
+    """Run a cache operation, or return None while the cache is unreachable."""
+    global _unavailable_until
+    if time.monotonic() < _unavailable_until:
+        return None
+    try:
+        return operation(*args)
+    except redis.RedisError as exc:
+        _unavailable_until = time.monotonic() + get_config()['RETRY_SECONDS']
+        logger.warning("Result cache unavailable, computing analytics uncached: %s", exc)
+        return None
+
+
+def _count(kind, name):
+    cache = get_cache()
+    key = counter_key(kind, name)
+    cache.add(key, 0, timeout=None)
+    cache.incr(key)
+
+
+def get_stats(names):
+    """
+    Hit and miss counts of these 'metric.action' names.
+
+    Returns:
+        Dictionary of name -> {"hits", "misses", "hit_ratio"}, None while the cache is unreachable
+    """
+    keys = [counter_key(kind, name) for name in names for kind in ('hits', 'misses')]
+    counts = _call(get_cache().get_many, keys)
+    if counts is None:
+        return None
+
+    stats = {}
+    for name in names:
+        hits = counts.get(counter_key('hits', name), 0)
+        misses = counts.get(counter_key('misses', name), 0)
+        stats[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None
+        }
+    return stats
+
+
+def cached_result(view_method):
+    """
+    Cache the data of an analytics action of a metric viewset.
+
+    The user is the one get_conditional_user_id() returns; requests without a
+    valid user are not cached. Only 200 responses are stored.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        user_id = self.get_conditional_user_id()
+        if not get_config()['ENABLED'] or user_id is None:
+            return view_method(self, request, *args, **kwargs)
+
+        model = self.queryset.model
+        metric = model._meta.model_name
+        versions = getattr(self, 'metric_versions', None)
+        if versions is None:
+            versions = MetricVersion.objects.for_user(user_id, [model])
+        version = versions.get(metric, (0, None))[0]
+
+        name = f'{metric}.{self.action}'
+        key = result_key(metric, user_id, version, self.action, request.query_params.dict())
+        data = _call(get_cache().get, key)
+        if data is not None:
+            _call(_count, 'hits', name)
+            return Response(data)
+
+        _call(_count, 'misses', name)
+        response = view_method(self, request, *args, **kwargs)
+        if getattr(response, 'status_code', None) == 200:
+            _call(get_cache().set, key, response.data, get_config()['TIMEOUT_SECONDS'])
+        return response
+
+    wrapper.cached_result = True
+    return wrapper
@@ -0,0 +1,121 @@
+"""
+Retention policy for raw readings.
+
+Raw readings older than a per-metric, per-source number of days are deleted
+in bounded batches. Before anything is deleted, the metric's hourly/daily
+rollups up to the retention horizon are rebuilt once and marked final with a
+RollupWatermark, so the downsampled history outlives the raw rows.
+Configured through settings.HEALTH_METRIC_RETENTION.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import METRIC_MODELS, MetricRollup, MetricVersion, RollupWatermark
+
+DELETE_BATCH_SIZE = 5000
+
+
+def get_policies():
+    """metric name -> {source: days}; 'default' covers unlisted sources, None keeps readings."""
+    return getattr(settings, 'HEALTH_METRIC_RETENTION', {})
+
+
+def start_of_day(moment):
+    return timezone.localtime(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def source_cutoffs(model, now=None):
+    """Source -> datetime before which raw readings from that source are deleted."""
+    policy = get_policies().get(model._meta.model_name, {})
+    today = start_of_day(now or timezone.now())
+    cutoffs = {}
+    for source, _ in model.SOURCE_CHOICES:
+        days = policy.get(source, policy.get('default'))
+        if days is not None:
+            cutoffs[source] = today - timedelta(days=days)
+    return cutoffs
+
+
+def finalize_rollups(model, until):
+    """
+    Rebuild the rollups of a metric up to `until` and mark them final.
+
+    Only the days since the previous watermark are rebuilt; raw readings
+    before it may already be gone.
+
+    Returns:
+        Number of rollup rows written
+    """
+    metric = model._meta.model_name
+    finalized_until = MetricRollup.objects.finalized_until(model)
+    if finalized_until is not None and finalized_until >= until:
+        return 0
+
+    with transaction.atomic():
+        written = MetricRollup.objects.rebuild(model, until=until)
+        RollupWatermark.objects.update_or_create(metric=metric, defaults={'finalized_until': until})
+    return written
+
+
+def delete_expired(model, source, cutoff, batch_size=DELETE_BATCH_SIZE, max_batches=None):
+    """
+    Delete raw readings from `source` older than `cutoff`.
+
+    Only users with expired readings are visited. Each batch is a DELETE of
+    at most `batch_size` rows of one user in its own transaction, found
+    through the (user, timestamp) index, so locks and WAL bursts stay small;
+    `max_batches` counts the batches that deleted rows. Rollups are not
+    touched; the user's MetricVersion is bumped with every such batch.
+
+    Returns:
+        Number of readings deleted
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    statement = (
+        f'DELETE FROM {table} WHERE ("id", "timestamp") IN ('
+        f'SELECT "id", "timestamp" FROM {table} '
+        f'WHERE "user_id" = %s AND "timestamp" < %s AND "source" = %s LIMIT %s)'
+    )
+
+    user_ids = model.objects.filter(
+        timestamp__lt=cutoff, source=source
+    ).order_by('user_id').values_list('user_id', flat=True).distinct()
+
+    deleted = 0
+    batches = 0
+    for user_id in list(user_ids):
+        while max_batches is None or batches < max_batches:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(statement, [user_id, cutoff, source, batch_size])
+                count = cursor.rowcount
+                if count:
+                    MetricVersion.objects.bump(model, [user_id])
+            if not count:
+                break
+            batches += 1
+            deleted += count
+            if count < batch_size:
+                break
+    return deleted
+
+
+def apply_retention(batch_size=DELETE_BATCH_SIZE, max_batches=None):
+    """
+    Apply the retention policy of every metric.
+
+    Returns:
+        Dictionary of metric name -> readings deleted
+    """
+    summary = {}
+    for model in METRIC_MODELS:
+        cutoffs = source_cutoffs(model)
+        if not cutoffs:
+            continue
+
+        finalize_rollups(model, max(cutoffs.values()))
+        summary[model._meta.model_name] = sum(
+            delete_expired(model, source, cutoff, batch_size=batch_size, max_batches=max_batches)
+            for source, cutoff in cutoffs.items()
+        )
+    return summary
@@ -1,16 +1,73 @@
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from django.contrib.auth import get_user_model
-from .models import BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
+from django.core.exceptions import ValidationError
+from .models import Alert, BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
 
 
 User = get_user_model()
 
+class BulkHealthMetricsListSerializer(serializers.ListSerializer):
+    """
+    List serializer used for bulk ingestion.
+
+    Items are validated by the child serializer and the model's clean(), like
+    uploads. Invalid items are collected in `item_errors` (keyed by their
+    position in the payload) instead of failing the whole batch, and valid
+    items are written with chunked bulk_create.
+    """
+    batch_size = 500
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages['not_a_list'].format(input_type=type(data).__name__)
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [message]
+            }, code='not_a_list')
+
+        if not data:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [self.error_messages['empty']]
+            }, code='empty')
+
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages['max_length'].format(max_length=self.max_length)
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [message]
+            }, code='max_length')
+
+        self.item_errors = []
+        valid_items = []
+        model = self.child.Meta.model
+        for index, item in enumerate(data):
+            try:
+                attrs = self.run_child_validation(item)
+                # The model's range checks, as for uploads (see ingestion.ingest_rows)
+                model(**attrs).clean()
+            except serializers.ValidationError as exc:
+                self.item_errors.append({'index': index, 'errors': exc.detail})
+            except ValidationError as exc:
+                self.item_errors.append({'index': index, 'errors': {api_settings.NON_FIELD_ERRORS_KEY: exc.messages}})
+            else:
+                valid_items.append(attrs)
+
+        return valid_items
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        instances = [model(**attrs) for attrs in validated_data]
+        return model.objects.bulk_insert(instances, batch_size=self.batch_size)
+
+
 class HealthMetricsSerializer(serializers.ModelSerializer):
     """Base serializer for all health metrics"""
     
     full_name = serializers.SerializerMethodField()
 
     def get_full_name(self, obj):
+        # List and detail querysets annotate it in SQL (see BaseHealthMetricsViewSet.get_queryset)
+        if hasattr(obj, 'full_name'):
+            return obj.full_name
         return f"{obj.user.first_name} {obj.user.last_name}".strip()
     
     def perform_create(self, serializer):
@@ -19,6 +76,7 @@ class HealthMetricsSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ['id', 'user', 'full_name', 'timestamp', 'source', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at', 'full_name', 'user']
+        list_serializer_class = BulkHealthMetricsListSerializer
         abstract = True
 
 
@@ -102,4 +160,16 @@ class SpO2Serializer(HealthMetricsSerializer):
         ]
 
     def create(self, validated_data):
-        return SpO2.objects.create(**validated_data)
\ No newline at end of file
+        return SpO2.objects.create(**validated_data)
+
+
+class AlertSerializer(serializers.ModelSerializer):
+    """Serializer for alerts raised by the anomaly detectors"""
+
+    class Meta:
+        model = Alert
+        fields = [
+            'id', 'user', 'metric', 'field', 'detector', 'severity', 'value', 'score',
+            'message', 'timestamp', 'acknowledged', 'created_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import Signal, receiver
+from .anomaly import detector
+from .live import publish_readings
+from .models import METRIC_MODELS, BaselineStats, MetricRollup, MetricVersion
+
+# Sent with sender=<metric model> and instances=<list of saved readings>
+# after single saves and after every bulk_insert() chunk.
+readings_created = Signal()
+
+
+@receiver(post_save)
+def reading_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and sender in METRIC_MODELS:
+        readings_created.send(sender=sender, instances=[instance])
+
+
+@receiver(readings_created)
+def bump_versions(sender, instances, **kwargs):
+    MetricVersion.objects.bump(sender, {instance.user_id for instance in instances})
+
+
+@receiver(readings_created)
+def update_rollups(sender, instances, **kwargs):
+    MetricRollup.objects.apply_readings(sender, instances)
+
+
+@receiver(readings_created)
+def update_baselines(sender, instances, **kwargs):
+    BaselineStats.objects.apply_readings(sender, instances)
+
+
+@receiver(readings_created)
+def detect_anomalies(sender, instances, **kwargs):
+    # Readings of a rolled back ingest must not advance the detector state or raise alerts
+    transaction.on_commit(lambda: detector.process(sender, instances), robust=True)
+
+
+@receiver(readings_created)
+def publish_live_readings(sender, instances, **kwargs):
+    publish_readings(sender, instances)
@@ -0,0 +1,15 @@
+from celery import shared_task
+from .partitions import maintain_partitions
+from .retention import apply_retention
+
+
+@shared_task
+def maintain_metric_partitions():
+    """Create upcoming monthly partitions and detach expired ones"""
+    return maintain_partitions()
+
+
+@shared_task
+def apply_retention_policies():
+    """Delete raw readings past their retention window, keeping their rollups"""
+    return apply_retention()
@@ -1,12 +1,20 @@
 import pytest
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.utils import timezone
 from datetime import timedelta
 
 
 User = get_user_model()
 
+@pytest.fixture(autouse=True)
+def result_cache(settings):
+    # Tests get an empty in-process cache instead of the shared Redis one
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    yield
+    caches['default'].clear()
+
 @pytest.fixture
 def api_client():
     return APIClient()
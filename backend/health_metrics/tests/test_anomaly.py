@@ -0,0 +1,113 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from datetime import timedelta
+
+from ..anomaly import AnomalyDetector, get_config
+from ..models import Alert, BaselineStats, DetectorState, HeartRate
+
+
+def readings(user, values, start=None, step=timedelta(minutes=5)):
+    start = start or timezone.now() - step * len(values)
+    return [
+        HeartRate(user=user, value=value, activity_level='resting', timestamp=start + step * i, source='device')
+        for i, value in enumerate(values)
+    ]
+
+
+STEADY = [70, 72, 71, 73, 69, 70, 72, 74, 71, 70] * 4
+
+
+@pytest.mark.django_db
+class TestAnomalyDetection:
+
+    def test_zscore_flags_spike(self, user):
+        """Test that a reading far from the rolling baseline raises a z-score alert"""
+        alerts = AnomalyDetector().process(HeartRate, readings(user, STEADY + [140]))
+
+        assert [(alert.detector, alert.severity, alert.value) for alert in alerts] == [('zscore', 'critical', 140)]
+        assert Alert.objects.filter(user=user, detector='zscore').count() == 1
+
+    def test_cusum_flags_sustained_shift(self, user):
+        """Test that a small sustained shift raises a CUSUM alert without any z-score alert"""
+        alerts = AnomalyDetector().process(HeartRate, readings(user, STEADY + [76, 77, 76, 77, 76, 77, 76, 77]))
+
+        assert {alert.detector for alert in alerts} == {'cusum'}
+        assert alerts[0].score > 0
+
+    def test_rate_of_change(self, user, admin_user):
+        """Test that a fast change between close readings raises a rate alert from the first readings"""
+        alerts = AnomalyDetector().process(HeartRate, readings(user, [70, 120], step=timedelta(minutes=1)))
+        assert [(alert.detector, alert.score) for alert in alerts] == [('rate', 50)]
+
+        spread_out = AnomalyDetector().process(HeartRate, readings(admin_user, [70, 120], step=timedelta(hours=1)))
+        assert spread_out == []
+
+    def test_state_shared_between_detectors(self, user):
+        """Test that a detector in another worker picks up where the last batch stopped"""
+        history = readings(user, STEADY)
+        AnomalyDetector().process(HeartRate, history)
+
+        state = DetectorState.objects.get(user=user, metric='heartrate', field='value')
+        assert state.count == len(STEADY)
+        assert state.last_timestamp == history[-1].timestamp
+
+        other = AnomalyDetector()
+        alerts = other.process(HeartRate, readings(user, [140], start=history[-1].timestamp + timedelta(minutes=5)))
+        assert [alert.detector for alert in alerts] == ['zscore']
+
+        backfill = other.process(HeartRate, readings(user, [200], start=history[0].timestamp))
+        assert backfill == []
+
+    def test_new_series_seeded_from_baseline(self, user):
+        """Test that a user without detector state starts from their running baseline"""
+        HeartRate.objects.bulk_insert(readings(user, STEADY, start=timezone.now() - timedelta(days=2)))
+        DetectorState.objects.all().delete()
+        baseline = BaselineStats.objects.for_metric(HeartRate, user, 'value')
+
+        detector = AnomalyDetector()
+        detector.load('heartrate', ['value'], {user.id})
+
+        state = detector.states[(user.id, 'heartrate', 'value')]
+        assert (state.count, state.mean) == (baseline.count, baseline.mean)
+
+    def test_ingestion_raises_alerts(self, authenticated_client, user, django_capture_on_commit_callbacks):
+        """Test that readings posted through the API are checked and alerts are listed per user"""
+        payload = [
+            {'value': reading.value, 'activity_level': 'resting', 'timestamp': reading.timestamp.isoformat(), 'source': 'device'}
+            for reading in readings(user, STEADY + [150])
+        ]
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.post(reverse('heartrate-bulk'), payload, format='json')
+
+        response = authenticated_client.get(reverse('alert-list'), {'detector': 'zscore'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [alert['value'] for alert in response.data['results']] == [150]
+
+        alert_id = response.data['results'][0]['id']
+        acknowledged = authenticated_client.post(reverse('alert-acknowledge', args=[alert_id]))
+        assert acknowledged.data['acknowledged'] is True
+
+    def test_detection_waits_for_commit(self, user, django_capture_on_commit_callbacks):
+        """Test that ingested readings only reach the detectors once their transaction commits"""
+        ingested = readings(user, STEADY + [150])
+        with django_capture_on_commit_callbacks() as callbacks:
+            HeartRate.objects.bulk_insert(ingested)
+
+        assert not DetectorState.objects.exists()
+        assert not Alert.objects.exists()
+
+        for callback in callbacks:
+            callback()
+
+        state = DetectorState.objects.get(user=user, metric='heartrate', field='value')
+        assert state.last_timestamp == ingested[-1].timestamp
+
+    def test_unconfigured_metrics_are_skipped(self, user, settings):
+        """Test that metrics missing from the configuration are not checked"""
+        settings.HEALTH_METRIC_ANOMALY = {'FIELDS': {}}
+
+        assert get_config()['FIELDS'] == {}
+        assert AnomalyDetector().process(HeartRate, readings(user, STEADY + [200])) == []
@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from ..models import BaselineStats, BloodPressure, HeartRate, MetricRollup, RollupWatermark
+
+
+VALUES = [55 + (i * 31) % 47 for i in range(200)]
+
+
+@pytest.fixture
+def heart_rate_readings(user):
+    """Readings every 10 minutes, inserted in several batches like a device sync"""
+    now = timezone.now()
+    readings = [
+        HeartRate(
+            user=user,
+            value=value,
+            activity_level='resting' if i % 4 else 'active',
+            timestamp=now - timedelta(minutes=10 * (len(VALUES) - i)),
+            source='device'
+        )
+        for i, value in enumerate(VALUES)
+    ]
+    for start in range(0, len(readings), 64):
+        HeartRate.objects.bulk_insert(readings[start:start + 64])
+    return readings
+
+
+def numpy_ewma(values, alpha=BaselineStats.EWMA_ALPHA):
+    weights = (1 - alpha) ** np.arange(len(values))[::-1]
+    return float(np.sum(weights * values) / np.sum(weights))
+
+
+def baseline_rows():
+    return {
+        (row[0], row[1], row[2]): row[3:]
+        for row in BaselineStats.objects.values_list(
+            'metric', 'field', 'activity_level', 'count', 'mean', 'm2', 'ewma_sum', 'ewma_weight', 'min', 'max'
+        )
+    }
+
+
+@pytest.mark.django_db
+class TestBaselineStats:
+
+    def test_incremental_matches_numpy(self, user, heart_rate_readings):
+        """Test that batched inserts give the mean, variance, EWMA and range of the full series"""
+        values = np.array(VALUES, dtype=np.float64)
+        baseline = BaselineStats.objects.for_metric(HeartRate, user, 'value')
+
+        assert baseline.count == len(VALUES)
+        assert baseline.mean == pytest.approx(values.mean())
+        assert baseline.variance == pytest.approx(values.var(ddof=1))
+        assert baseline.ewma == pytest.approx(numpy_ewma(values))
+        assert (baseline.min, baseline.max) == (values.min(), values.max())
+
+        resting = values[[i % 4 != 0 for i in range(len(VALUES))]]
+        assert BaselineStats.objects.for_metric(HeartRate, user, 'value', 'resting').mean == pytest.approx(resting.mean())
+
+    def test_rebuild_matches_incremental(self, user, heart_rate_readings):
+        """Test that a rebuild from raw readings reproduces the incremental baselines"""
+        incremental = baseline_rows()
+
+        call_command('rebuild_baselines', metric=['heartrate'])
+
+        rebuilt = baseline_rows()
+        assert rebuilt.keys() == incremental.keys()
+        for key, values in incremental.items():
+            assert rebuilt[key] == pytest.approx(values)
+
+    def test_rebuild_uses_finalized_rollups(self, user, heart_rate_readings):
+        """Test that history whose raw readings were deleted still counts after a rebuild"""
+        expected = BaselineStats.objects.for_metric(HeartRate, user, 'value')
+        watermark = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        MetricRollup.objects.rebuild(HeartRate, until=watermark)
+        RollupWatermark.objects.create(metric='heartrate', finalized_until=watermark)
+        HeartRate.objects.filter(timestamp__lt=watermark).delete()
+
+        BaselineStats.objects.rebuild(HeartRate)
+
+        baseline = BaselineStats.objects.for_metric(HeartRate, user, 'value')
+        assert baseline.count == expected.count
+        assert baseline.mean == pytest.approx(expected.mean)
+        assert baseline.variance == pytest.approx(expected.variance)
+
+    def test_check_detects_drift(self, user, heart_rate_readings):
+        """Test that --check passes on consistent baselines and reports tampered ones"""
+        call_command('rebuild_baselines', check=True)
+
+        BaselineStats.objects.filter(activity_level='resting').update(mean=0)
+
+        with pytest.raises(CommandError):
+            call_command('rebuild_baselines', check=True)
+        assert BaselineStats.objects.verify(HeartRate) == [
+            f"heartrate ({user.id}, 'value', 'resting'): mean is 0.0, expected "
+            f"{BaselineStats.objects.compute(HeartRate)[(user.id, 'value', 'resting')][1]}"
+        ]
+
+    def test_reads_are_constant_time(self, user, heart_rate_readings, django_assert_num_queries):
+        """Test that resting average, outliers and the running baseline comparison need one stats query"""
+        latest = HeartRate.objects.select_related('user').latest('timestamp')
+
+        with django_assert_num_queries(1):
+            resting_average = latest.get_resting_average()
+        with django_assert_num_queries(1):
+            result = latest.compare_to_baseline(baseline_days=None)
+
+        assert resting_average == pytest.approx(BaselineStats.objects.get(activity_level='resting').mean)
+        assert result['baseline'] == round(BaselineStats.objects.get(activity_level=latest.activity_level).mean, 1)
+
+    def test_outliers_use_baseline(self, user):
+        """Test that outliers are readings beyond the requested deviations from the running mean"""
+        now = timezone.now()
+        BloodPressure.objects.bulk_insert([
+            BloodPressure(user=user, systolic=value, diastolic=80, timestamp=now - timedelta(hours=i), source='device')
+            for i, value in enumerate([118, 120, 122, 119, 121, 120, 180])
+        ])
+
+        outliers = BloodPressure.objects.get_outliers(user, std_devs=2, field='systolic')
+
+        assert list(outliers.values_list('systolic', flat=True)) == [180]
+        assert not HeartRate.objects.get_outliers(user).exists()
+
+    def test_update_and_delete_adjust_baseline(self, authenticated_client, user, heart_rate_data):
+        """Test that editing or deleting a reading through the API keeps the baseline exact"""
+        authenticated_client.post(reverse('heartrate-list'), {**heart_rate_data, 'value': 60}, format='json')
+        created = authenticated_client.post(reverse('heartrate-list'), {**heart_rate_data, 'value': 80}, format='json').data
+        detail_url = reverse('heartrate-detail', args=[created['id']])
+
+        authenticated_client.patch(detail_url, {'value': 100}, format='json')
+        assert BaselineStats.objects.for_metric(HeartRate, user, 'value').mean == 80
+
+        authenticated_client.delete(detail_url)
+        assert BaselineStats.objects.for_metric(HeartRate, user, 'value').mean == 60
+
+    def test_edits_match_full_recompute(self, authenticated_client, user, heart_rate_readings):
+        """Test that API edits and deletes adjust only the affected baselines and match a rebuild"""
+        edited, deleted = heart_rate_readings[5], heart_rate_readings[6]
+        active = BaselineStats.objects.for_metric(HeartRate, user, 'value', 'active').updated_at
+
+        authenticated_client.patch(reverse('heartrate-detail', args=[edited.id]), {'value': 70}, format='json')
+        authenticated_client.delete(reverse('heartrate-detail', args=[deleted.id]))
+
+        assert BaselineStats.objects.for_metric(HeartRate, user, 'value').count == len(VALUES) - 1
+        assert BaselineStats.objects.for_metric(HeartRate, user, 'value', 'active').updated_at == active
+        assert BaselineStats.objects.verify(HeartRate) == []
@@ -0,0 +1,73 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from datetime import timedelta
+
+from ..models import HeartRate, SpO2
+
+
+@pytest.mark.django_db
+class TestBulkIngestionAPI:
+
+    def test_bulk_create_heart_rate(self, authenticated_client, user):
+        """Test that a list of readings is written in one request"""
+        url = reverse('heartrate-bulk')
+        readings = [
+            {
+                "value": 60 + i,
+                "activity_level": "resting",
+                "timestamp": (timezone.now() - timedelta(minutes=i)).isoformat(),
+                "source": "device"
+            }
+            for i in range(30)
+        ]
+
+        response = authenticated_client.post(url, readings, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['created'] == 30
+        assert response.data['rejected'] == 0
+        assert HeartRate.objects.filter(user=user).count() == 30
+
+    def test_bulk_create_reports_item_errors(self, authenticated_client, user, spo2_data):
+        """Test that invalid items are reported without failing the batch"""
+        url = reverse('spo2-bulk')
+        invalid_reading = {**spo2_data, "measurement_method": "UNKNOWN"}
+        missing_value = {key: value for key, value in spo2_data.items() if key != 'value'}
+
+        response = authenticated_client.post(url, [spo2_data, invalid_reading, missing_value], format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['created'] == 1
+        assert response.data['rejected'] == 2
+        assert [error['index'] for error in response.data['errors']] == [1, 2]
+        assert 'measurement_method' in response.data['errors'][0]['errors']
+        assert SpO2.objects.filter(user=user).count() == 1
+
+    def test_bulk_create_applies_model_validation(self, authenticated_client, user, heart_rate_data):
+        """Test that items failing the model's range checks are rejected like upload rows"""
+        url = reverse('heartrate-bulk')
+        response = authenticated_client.post(url, [heart_rate_data, {**heart_rate_data, "value": 250}], format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['created'] == 1
+        assert response.data['errors'] == [
+            {'index': 1, 'errors': {'non_field_errors': ['Heart rate must be between 30 and 220 BPM']}}
+        ]
+        assert HeartRate.objects.filter(user=user).count() == 1
+
+    def test_bulk_create_all_invalid(self, authenticated_client, heart_rate_data):
+        """Test that a batch with no valid readings is rejected"""
+        url = reverse('heartrate-bulk')
+        response = authenticated_client.post(url, [{**heart_rate_data, "activity_level": "running"}], format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['created'] == 0
+
+    def test_bulk_create_requires_list(self, authenticated_client, heart_rate_data):
+        """Test that a single object payload is rejected"""
+        url = reverse('heartrate-bulk')
+        response = authenticated_client.post(url, heart_rate_data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
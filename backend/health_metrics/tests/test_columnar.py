@@ -0,0 +1,104 @@
+import io
+import pytest
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from ..models import BloodPressure, HeartRate, SleepDuration
+
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+
+@pytest.fixture
+def heart_rates(user):
+    now = timezone.now()
+    HeartRate.objects.bulk_insert([
+        HeartRate(user=user, value=60 + i, activity_level='resting', timestamp=now - timedelta(minutes=i), source='device')
+        for i in range(30)
+    ])
+
+
+def read_stream(response):
+    return pa.ipc.open_stream(response.content).read_all()
+
+
+@pytest.mark.django_db
+class TestColumnarResponses:
+
+    def test_arrow_stream_matches_json(self, authenticated_client, heart_rates):
+        """Test that the Arrow page holds the same rows and columns as the JSON page"""
+        url = reverse('heartrate-list')
+        expected = authenticated_client.get(url).data['results']
+
+        response = authenticated_client.get(url, HTTP_ACCEPT=ARROW_STREAM)
+        table = read_stream(response)
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == ARROW_STREAM
+        assert response['X-Total-Count'] == '30'
+        assert table.column_names == list(expected[0].keys())
+        assert table.column('id').to_pylist() == [row['id'] for row in expected]
+        assert table.column('value').to_pylist() == [row['value'] for row in expected]
+        assert table.column('heart_rate_zone').to_pylist() == [row['heart_rate_zone'] for row in expected]
+        assert table.column('full_name').to_pylist() == ['Test User'] * 30
+
+    def test_column_types(self, authenticated_client, heart_rates):
+        """Test that readings are int16 and timestamps are typed in the current timezone"""
+        response = authenticated_client.get(reverse('heartrate-list'), {'format': 'arrow'})
+        schema = read_stream(response).schema
+
+        assert schema.field('value').type == pa.int16()
+        assert schema.field('id').type == pa.int64()
+        assert schema.field('timestamp').type == pa.timestamp('us', tz=timezone.get_current_timezone_name())
+        assert schema.field('is_tachycardia').type == pa.bool_()
+
+    def test_nullable_and_derived_columns(self, authenticated_client, user):
+        """Test that null readings and derived fields of other metrics are carried over"""
+        now = timezone.now()
+        BloodPressure.objects.create(user=user, systolic=120, diastolic=80, timestamp=now, source='manual')
+        SleepDuration.objects.create(
+            user=user, start_time=now - timedelta(hours=8), end_time=now, timestamp=now, source='manual'
+        )
+
+        blood_pressure = read_stream(authenticated_client.get(reverse('bloodpressure-list'), {'format': 'arrow'}))
+        sleep = read_stream(authenticated_client.get(reverse('sleepduration-list'), {'format': 'arrow'}))
+
+        assert blood_pressure.column('pulse').to_pylist() == [None]
+        assert blood_pressure.schema.field('pulse').type == pa.int16()
+        assert sleep.column('duration').to_pylist() == [8.0]
+
+    def test_parquet(self, authenticated_client, heart_rates):
+        """Test that Parquet responses hold the same table as Arrow ones"""
+        url = reverse('heartrate-list')
+        arrow = read_stream(authenticated_client.get(url, {'format': 'arrow'}))
+
+        response = authenticated_client.get(url, HTTP_ACCEPT='application/vnd.apache.parquet')
+        table = pq.read_table(io.BytesIO(response.content))
+
+        assert response.status_code == 200
+        assert table.equals(arrow)
+
+    def test_cursor_link_header(self, authenticated_client, heart_rates):
+        """Test that keyset pages chain through the Link header"""
+        response = authenticated_client.get(
+            reverse('heartrate-list'), {'pagination': 'cursor', 'page_size': 20}, HTTP_ACCEPT=ARROW_STREAM
+        )
+        first = read_stream(response)
+        next_url = response['Link'].split(';')[0].strip('<>')
+
+        response = authenticated_client.get(next_url, HTTP_ACCEPT=ARROW_STREAM)
+        second = read_stream(response)
+
+        assert first.num_rows == 20
+        assert second.num_rows == 10
+        assert 'Link' not in response
+        assert set(first.column('id').to_pylist()).isdisjoint(second.column('id').to_pylist())
+
+    def test_error_payload(self, api_client):
+        """Test that errors are rendered as a one-row table"""
+        response = api_client.get(reverse('heartrate-list'), HTTP_ACCEPT=ARROW_STREAM)
+
+        assert response.status_code == 401
+        assert read_stream(response).column_names == ['detail']
@@ -0,0 +1,133 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import HeartRate, MetricVersion, SpO2
+from ..retention import delete_expired
+
+
+@pytest.fixture(autouse=True)
+def fixed_window(settings):
+    # Keep the time window from changing the validators in the middle of a test
+    settings.HEALTH_METRIC_CONDITIONAL_GET = {'WINDOW_SECONDS': 10 ** 9}
+
+
+def add_heart_rates(user, count=3, start=0):
+    now = timezone.now()
+    return HeartRate.objects.bulk_insert([
+        HeartRate(user=user, value=70 + i, activity_level='resting', timestamp=now - timedelta(minutes=i), source='device')
+        for i in range(start, start + count)
+    ])
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_not_modified(self, authenticated_client, user, django_assert_num_queries):
+        """Test that an unchanged collection answers 304 after the version query alone"""
+        add_heart_rates(user)
+        url = reverse('heartrate-list')
+        response = authenticated_client.get(url)
+        etag = response['ETag']
+
+        with django_assert_num_queries(1):
+            response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b''
+        assert response['ETag'] == etag
+
+    def test_new_reading_changes_etag(self, authenticated_client, user):
+        """Test that inserts, updates and deletes invalidate the validators"""
+        reading = add_heart_rates(user)[0]
+        url = reverse('heartrate-list')
+        etags = [authenticated_client.get(url)['ETag']]
+
+        add_heart_rates(user, count=1, start=10)
+        etags.append(authenticated_client.get(url)['ETag'])
+        authenticated_client.patch(reverse('heartrate-detail', args=[reading.id]), {'value': 90}, format='json')
+        etags.append(authenticated_client.get(url)['ETag'])
+        authenticated_client.delete(reverse('heartrate-detail', args=[reading.id]))
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etags[-1])
+
+        assert len(set(etags)) == 3
+        assert response.status_code == status.HTTP_200_OK
+        assert MetricVersion.objects.get(user=user, metric='heartrate').version == 4
+
+    def test_other_metrics_keep_etag(self, authenticated_client, user):
+        """Test that writes to another metric leave the collection's validators alone"""
+        add_heart_rates(user)
+        url = reverse('heartrate-list')
+        etag = authenticated_client.get(url)['ETag']
+
+        SpO2.objects.create(user=user, value=97, timestamp=timezone.now(), source='device')
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_query_and_format_change_etag(self, authenticated_client, user):
+        """Test that the ETag depends on the query string and the negotiated format"""
+        add_heart_rates(user)
+        url = reverse('heartrate-list')
+
+        etags = {
+            authenticated_client.get(url)['ETag'],
+            authenticated_client.get(url, {'ordering': 'timestamp'})['ETag'],
+            authenticated_client.get(url, {'format': 'arrow'})['ETag'],
+        }
+
+        assert len(etags) == 3
+
+    def test_analytics_action(self, authenticated_client, user):
+        """Test that analytics actions of a metric are conditional too"""
+        add_heart_rates(user)
+        url = reverse('heartrate-resting-average')
+        etag = authenticated_client.get(url)['ETag']
+
+        response = authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_if_modified_since(self, authenticated_client, user):
+        """Test that Last-Modified is honoured as a validator"""
+        add_heart_rates(user)
+        url = reverse('heartrate-list')
+        last_modified = authenticated_client.get(url)['Last-Modified']
+
+        response = authenticated_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_users_have_separate_validators(self, authenticated_client, user, admin_user):
+        """Test that one user's ETag doesn't validate another user's collection"""
+        add_heart_rates(user)
+        url = reverse('heartrate-list')
+        etag = authenticated_client.get(url)['ETag']
+
+        other_client = APIClient()
+        other_client.force_authenticate(user=admin_user)
+        response = other_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_dashboard(self, authenticated_client, user):
+        """Test that the dashboard changes with any metric of the user"""
+        url = reverse('dashboard')
+        etag = authenticated_client.get(url)['ETag']
+        assert authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        SpO2.objects.create(user=user, value=97, timestamp=timezone.now(), source='device')
+
+        assert authenticated_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    def test_retention_bumps_version(self, user):
+        """Test that readings deleted by the retention policy bump the version"""
+        add_heart_rates(user)
+        version = MetricVersion.objects.get(user=user, metric='heartrate').version
+
+        delete_expired(HeartRate, 'device', timezone.now() + timedelta(minutes=1))
+
+        assert MetricVersion.objects.get(user=user, metric='heartrate').version == version + 1
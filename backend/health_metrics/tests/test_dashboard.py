@@ -0,0 +1,108 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db.models import Avg, Max, Min
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from datetime import timedelta
+
+from ..models import BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
+
+User = get_user_model()
+
+
+@pytest.fixture
+def readings(user):
+    """A day of heart rate, blood pressure and SpO2 plus a week of steps and sleep"""
+    now = timezone.now()
+    HeartRate.objects.bulk_insert([
+        HeartRate(user=user, value=60 + i % 40, activity_level='resting', timestamp=now - timedelta(minutes=7 * i), source='device')
+        for i in range(200)
+    ])
+    BloodPressure.objects.bulk_insert([
+        BloodPressure(user=user, systolic=115 + i % 20, diastolic=75 + i % 10, timestamp=now - timedelta(hours=i), source='device')
+        for i in range(48)
+    ])
+    SpO2.objects.bulk_insert([
+        SpO2(user=user, value=94 + i % 6, measurement_method='WEARABLE', timestamp=now - timedelta(minutes=30 * i), source='device')
+        for i in range(48)
+    ])
+    DailySteps.objects.bulk_insert([
+        DailySteps(user=user, count=5000 + 500 * i, timestamp=now - timedelta(days=i), source='device')
+        for i in range(7)
+    ])
+    SleepDuration.objects.bulk_insert([
+        SleepDuration(
+            user=user, start_time=now - timedelta(days=i, hours=8), end_time=now - timedelta(days=i),
+            quality=7, timestamp=now - timedelta(days=i, hours=8), source='device'
+        )
+        for i in range(7)
+    ])
+    return now
+
+
+@pytest.mark.django_db
+class TestDashboard:
+
+    def test_one_query_per_metric(self, authenticated_client, readings, django_assert_num_queries):
+        """Test that the dashboard of every metric costs one query per metric table, plus the versions"""
+        with django_assert_num_queries(6):
+            response = authenticated_client.get(reverse('dashboard'), {'window': '24h'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.data['metrics']) == {'heartrate', 'bloodpressure', 'spo2', 'dailysteps', 'sleepduration'}
+
+    def test_matches_raw_readings(self, authenticated_client, user, readings):
+        """Test that latest values and window aggregates equal those of the raw readings"""
+        response = authenticated_client.get(reverse('dashboard'), {'window': '24h'})
+        heart_rate = response.data['metrics']['heartrate']
+
+        since = readings - timedelta(hours=24)
+        raw = HeartRate.objects.filter(user=user, timestamp__gte=since).aggregate(
+            avg=Avg('value'), min=Min('value'), max=Max('value')
+        )
+        assert heart_rate['bucket'] == '15m'
+        assert heart_rate['latest']['value'] == HeartRate.objects.filter(user=user).latest('timestamp').value
+        assert heart_rate['summary']['value']['count'] == HeartRate.objects.filter(user=user, timestamp__gte=since).count()
+        assert heart_rate['summary']['value']['avg'] == round(raw['avg'], 2)
+        assert (heart_rate['summary']['value']['min'], heart_rate['summary']['value']['max']) == (raw['min'], raw['max'])
+        assert sum(row['value_count'] for row in heart_rate['series']) == heart_rate['summary']['value']['count']
+
+        blood_pressure = response.data['metrics']['bloodpressure']
+        assert blood_pressure['latest']['systolic'] == 115
+        assert response.data['metrics']['dailysteps']['latest']['goal'] == 10000
+        assert blood_pressure['summary']['pulse']['count'] == 0
+        assert response.data['metrics']['sleepduration']['latest']['duration'] == 8.0
+
+    def test_latest_outside_window(self, authenticated_client, user):
+        """Test that a metric without readings in the window still reports its latest reading"""
+        SpO2.objects.create(user=user, value=97, timestamp=timezone.now() - timedelta(days=3), source='device')
+
+        response = authenticated_client.get(reverse('dashboard'), {'window': '1h'})
+
+        spo2 = response.data['metrics']['spo2']
+        assert spo2['latest']['value'] == 97
+        assert spo2['series'] == []
+        assert spo2['summary']['value']['count'] == 0
+        assert response.data['metrics']['heartrate']['latest'] is None
+
+    def test_patient_dashboards_for_clinicians(self, api_client, user, readings):
+        """Test that clinicians can open a patient's dashboard and patients cannot"""
+        other = User.objects.create_user(email="other@example.com", password="otherpassword123")
+        url = reverse('dashboard')
+
+        api_client.force_authenticate(user=other)
+        assert api_client.get(url, {'user_id': user.id}).status_code == status.HTTP_403_FORBIDDEN
+
+        nurse = User.objects.create_user(email="nurse@example.com", password="nursepassword123", role='NURSE')
+        api_client.force_authenticate(user=nurse)
+        response = api_client.get(url, {'user_id': user.id, 'window': '7d'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['user_id'] == user.id
+        assert response.data['metrics']['dailysteps']['summary']['count']['count'] == 7
+
+    def test_invalid_window(self, authenticated_client):
+        """Test that unknown windows are rejected"""
+        response = authenticated_client.get(reverse('dashboard'), {'window': '2w'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
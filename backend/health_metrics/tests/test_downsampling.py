@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from ..downsampling import lttb
+from ..models import BloodPressure, HeartRate
+
+
+def loop_lttb(x, y, max_points):
+    """LTTB as originally described, one point and one area at a time"""
+    size = len(x)
+    if size <= max_points:
+        return list(range(size))
+    every = (size - 2) / (max_points - 2)
+    kept, previous = [0], 0
+    for i in range(max_points - 2):
+        next_start, next_end = int((i + 1) * every) + 1, min(int((i + 2) * every) + 1, size)
+        next_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        next_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        best_area, best = -1, None
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((x[previous] - next_x) * (y[j] - y[previous]) - (x[previous] - x[j]) * (next_y - y[previous]))
+            if area > best_area:
+                best_area, best = area, j
+        kept.append(best)
+        previous = best
+    kept.append(size - 1)
+    return kept
+
+
+@pytest.fixture
+def heart_rates(user):
+    now = timezone.now()
+    values = [70 + (i * 7) % 11 for i in range(500)]
+    values[250] = 190
+    HeartRate.objects.bulk_insert([
+        HeartRate(user=user, value=value, activity_level='resting', timestamp=now - timedelta(minutes=500 - i),
+                  source='device')
+        for i, value in enumerate(values)
+    ])
+    return values
+
+
+class TestLTTB:
+
+    def test_matches_original_algorithm(self):
+        """Test that the vectorized buckets pick the same points as the loop"""
+        rng = np.random.default_rng(7)
+        x = np.cumsum(rng.uniform(1, 60, 10002))
+        y = np.sin(x / 5000) * 20 + rng.normal(70, 5, len(x))
+
+        assert lttb(x, y, 102).tolist() == loop_lttb(x.tolist(), y.tolist(), 102)
+
+    def test_keeps_ends_and_peaks(self):
+        """Test that the first, last and extreme points survive"""
+        x = np.arange(1000.0)
+        y = np.zeros(1000)
+        y[333], y[777] = 50, -50
+
+        kept = lttb(x, y, 10)
+
+        assert len(kept) == 10
+        assert kept[0] == 0 and kept[-1] == 999
+        assert {333, 777} <= set(kept.tolist())
+        assert np.all(np.diff(kept) > 0)
+
+    def test_short_series_unchanged(self):
+        """Test that series with fewer points than requested are returned whole"""
+        assert lttb([1, 2, 3], [4, 5, 6], 10).tolist() == [0, 1, 2]
+
+    def test_rejects_fewer_than_three_points(self):
+        """Test that LTTB needs room for both ends and one bucket"""
+        with pytest.raises(ValueError):
+            lttb(np.arange(10.0), np.arange(10.0), 2)
+
+
+@pytest.mark.django_db
+class TestDownsampledEndpoints:
+
+    def test_list(self, authenticated_client, heart_rates):
+        """Test that the list returns the kept readings unpaginated, in time order"""
+        response = authenticated_client.get(reverse('heartrate-list'), {'max_points': 50})
+
+        assert response.status_code == 200
+        assert len(response.data) == 50
+        assert [row['timestamp'] for row in response.data] == sorted(row['timestamp'] for row in response.data)
+        assert 190 in [row['value'] for row in response.data]
+        assert set(response.data[0]) >= {'id', 'timestamp', 'value', 'heart_rate_zone'}
+
+    def test_list_with_sparse_fields(self, authenticated_client, heart_rates):
+        """Test that max_points combines with ?fields="""
+        response = authenticated_client.get(reverse('heartrate-list'), {'max_points': 20, 'fields': 'timestamp,value'})
+
+        assert len(response.data) == 20
+        assert all(list(row) == ['timestamp', 'value'] for row in response.data)
+
+    def test_downsample_field(self, authenticated_client, user):
+        """Test that nullable fields skip readings without a value"""
+        now = timezone.now()
+        BloodPressure.objects.bulk_insert([
+            BloodPressure(user=user, systolic=120, diastolic=80, pulse=None if i % 2 else 70 + i % 9,
+                          timestamp=now - timedelta(hours=i), source='manual')
+            for i in range(100)
+        ])
+
+        response = authenticated_client.get(
+            reverse('bloodpressure-list'), {'max_points': 10, 'downsample_field': 'pulse'}
+        )
+
+        assert len(response.data) == 10
+        assert all(row['pulse'] is not None for row in response.data)
+
+    def test_series(self, authenticated_client, heart_rates):
+        """Test that series buckets are downsampled on the first aggregate"""
+        response = authenticated_client.get(
+            reverse('heartrate-series'), {'bucket': '1m', 'agg': 'max', 'max_points': 30}
+        )
+
+        assert response.status_code == 200
+        assert len(response.data['results']) == 30
+        assert 190 in [row['value_max'] for row in response.data['results']]
+
+    @pytest.mark.parametrize('params', [
+        {'max_points': 2},
+        {'max_points': 10001},
+        {'max_points': 'many'},
+        {'max_points': 10, 'downsample_field': 'heart_rate_zone'},
+    ])
+    def test_invalid_parameters(self, authenticated_client, params):
+        """Test that invalid downsampling parameters are rejected"""
+        response = authenticated_client.get(reverse('heartrate-list'), params)
+
+        assert response.status_code == 400
@@ -0,0 +1,95 @@
+import math
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from datetime import timedelta
+
+from ..hrv import compute_hrv, hrv_by_window, hrv_for_users
+from ..models import HeartRate
+
+User = get_user_model()
+
+
+def create_readings(user, values, end=None, step=timedelta(minutes=4)):
+    end = end or timezone.now()
+    return HeartRate.objects.bulk_insert([
+        HeartRate(user=user, value=value, activity_level='resting', timestamp=end - step * i, source='device')
+        for i, value in enumerate(reversed(values))
+    ])
+
+
+def loop_rmssd(values):
+    """The RMSSD loop calculate_hrv used before it was vectorized"""
+    diffs = [(values[i] - values[i - 1]) ** 2 for i in range(1, len(values))]
+    return round(math.sqrt(sum(diffs) / len(diffs)), 2)
+
+
+SERIES = [(61 + (i * 37) % 59) for i in range(300)]
+
+
+@pytest.mark.django_db
+class TestHRV:
+
+    def test_rmssd_matches_original_loop(self, user):
+        """Test that the NumPy path gives exactly the RMSSD of the original loop"""
+        latest = create_readings(user, SERIES)[0]
+
+        assert latest.calculate_hrv() == loop_rmssd(SERIES)
+
+    def test_sdnn_and_pnn50(self):
+        """Test SDNN and pNN50 on a small known series"""
+        result = compute_hrv([60, 120, 60])
+
+        assert result == {'rmssd': 60.0, 'sdnn': 34.64, 'pnn50': 100.0, 'count': 3}
+        assert compute_hrv([70]) is None
+
+    def test_sql_path_matches_numpy_for_many_users(self, user, admin_user):
+        """Test that the LAG() query returns the NumPy result for every user"""
+        create_readings(user, SERIES)
+        create_readings(admin_user, list(reversed(SERIES))[:50])
+
+        results = hrv_for_users([user.id, admin_user.id])
+
+        assert results[user.id] == compute_hrv(SERIES)
+        assert results[admin_user.id] == compute_hrv(list(reversed(SERIES))[:50])
+
+    def test_windows_do_not_share_differences(self, user):
+        """Test that per-window HRV only uses successive readings within each window"""
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+        create_readings(user, [60, 70, 150, 160], end=hour + timedelta(hours=1, minutes=30), step=timedelta(minutes=30))
+
+        windows = hrv_by_window(HeartRate.objects.filter(user=user), time_window=1)
+
+        assert [summary['rmssd'] for summary in windows.values()] == [10.0, 10.0]
+
+    def test_hrv_endpoint_reports_all_measures(self, authenticated_client, user):
+        """Test that the hrv action returns RMSSD, SDNN and pNN50"""
+        # End just before an hour boundary so no hourly window holds a single reading.
+        end = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(minutes=1)
+        create_readings(user, SERIES[:100], end=end)
+
+        response = authenticated_client.get(reverse('heartrate-hrv'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['hrv'] == loop_rmssd(SERIES[:100])
+        assert response.data['readings'] == 100
+        assert {'sdnn', 'pnn50'} <= set(response.data)
+
+        windows = authenticated_client.get(reverse('heartrate-hrv'), {'time_window': 1, 'days': 1})
+        assert sum(window['count'] for window in windows.data['windows']) == 100
+
+    def test_hrv_batch_for_clinicians(self, api_client, user):
+        """Test that clinicians get HRV of all patients in one call and patients are refused"""
+        create_readings(user, SERIES[:100])
+        doctor = User.objects.create_user(email="doctor@example.com", password="doctorpassword123", role='DOCTOR')
+        url = reverse('heartrate-hrv-batch')
+
+        api_client.force_authenticate(user=user)
+        assert api_client.get(url).status_code == status.HTTP_403_FORBIDDEN
+
+        api_client.force_authenticate(user=doctor)
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == [{'user_id': user.id, **compute_hrv(SERIES[:100])}]
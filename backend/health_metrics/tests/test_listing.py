@@ -0,0 +1,159 @@
+import pytest
+from django.db.models import Value
+from django.db.models.functions import Concat, Trim
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from rest_framework.renderers import JSONRenderer
+
+from ..listing import list_plan
+from ..models import BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
+from ..serializers import (
+    BloodPressureSerializer,
+    DailyStepsSerializer,
+    HeartRateSerializer,
+    SleepDurationSerializer,
+    SpO2Serializer
+)
+
+
+def build(model, user, i):
+    timestamp = timezone.now() - timedelta(minutes=7 * i, microseconds=i)
+    if model is HeartRate:
+        return HeartRate(
+            user=user, value=45 + (i * 13) % 150, activity_level=['resting', 'active', 'sleeping'][i % 3],
+            timestamp=timestamp, source='device'
+        )
+    if model is BloodPressure:
+        return BloodPressure(
+            user=user, systolic=100 + (i * 7) % 70, diastolic=60 + (i * 5) % 40,
+            pulse=None if i % 2 else 70 + i % 20, timestamp=timestamp, source='manual'
+        )
+    if model is SpO2:
+        return SpO2(user=user, value=75 + i % 25, timestamp=timestamp, source='device')
+    if model is DailySteps:
+        return DailySteps(
+            user=user, count=(i * 997) % 16000, goal=0 if i == 3 else 10000,
+            distance=None if i % 2 else round(i * 0.37, 2), timestamp=timestamp, source='device'
+        )
+    return SleepDuration(
+        user=user, start_time=timestamp - timedelta(hours=4 + i % 8, minutes=i), end_time=timestamp,
+        quality=1 + i % 10, timestamp=timestamp, source='device'
+    )
+
+
+CASES = [
+    ('heartrate-list', HeartRate, HeartRateSerializer),
+    ('bloodpressure-list', BloodPressure, BloodPressureSerializer),
+    ('spo2-list', SpO2, SpO2Serializer),
+    ('dailysteps-list', DailySteps, DailyStepsSerializer),
+    ('sleepduration-list', SleepDuration, SleepDurationSerializer),
+]
+
+
+@pytest.fixture
+def readings(user):
+    for _, model, _ in CASES:
+        model.objects.bulk_insert([build(model, user, i) for i in range(60)])
+
+
+def serialized(serializer_class, queryset):
+    return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+
+@pytest.mark.django_db
+class TestListPlan:
+
+    @pytest.mark.parametrize('url_name,model,serializer_class', CASES)
+    def test_matches_serializer(self, user, readings, url_name, model, serializer_class):
+        """Test that the fast path renders the same bytes as the serializer"""
+        queryset = model.objects.filter(user=user).annotate(
+            full_name=Trim(Concat('user__first_name', Value(' '), 'user__last_name'))
+        ).order_by('-timestamp')
+        plan = list_plan(serializer_class, queryset)
+
+        fast = JSONRenderer().render(plan.represent(plan.rows(queryset)))
+
+        assert fast == serialized(serializer_class, queryset)
+
+    @pytest.mark.parametrize('url_name,model,serializer_class', CASES)
+    def test_list_endpoint(self, authenticated_client, user, readings, url_name, model, serializer_class):
+        """Test that the list endpoint returns the serializer's output"""
+        response = authenticated_client.get(reverse(url_name), {'ordering': 'timestamp'})
+
+        queryset = model.objects.filter(user=user).select_related('user').order_by('timestamp')
+        assert response.status_code == 200
+        assert response.data['count'] == 60
+        assert JSONRenderer().render(response.data['results']) == serialized(serializer_class, queryset)
+
+    @pytest.mark.parametrize('url_name,model,serializer_class', CASES)
+    def test_cursor_pages(self, authenticated_client, user, readings, url_name, model, serializer_class):
+        """Test that keyset pages of rows chain and match the serializer"""
+        results = []
+        response = authenticated_client.get(reverse(url_name), {'pagination': 'cursor', 'page_size': 25})
+        while True:
+            results.extend(response.data['results'])
+            if response.data['next'] is None:
+                break
+            response = authenticated_client.get(response.data['next'])
+
+        queryset = model.objects.filter(user=user).select_related('user').order_by('-timestamp', '-id')
+        assert len(results) == 60
+        assert JSONRenderer().render(results) == serialized(serializer_class, queryset)
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+
+    def test_only_requested_fields(self, authenticated_client, readings):
+        """Test that ?fields= narrows the rows to the requested fields"""
+        response = authenticated_client.get(reverse('heartrate-list'), {'fields': 'timestamp,value'})
+        full = authenticated_client.get(reverse('heartrate-list')).data['results']
+
+        assert response.status_code == 200
+        assert response.data['count'] == 60
+        assert response.data['results'] == [
+            {'timestamp': row['timestamp'], 'value': row['value']} for row in full
+        ]
+
+    def test_narrows_projection(self, authenticated_client, readings, django_assert_num_queries):
+        """Test that columns and the user join of unrequested fields are not selected"""
+        with django_assert_num_queries(3) as context:
+            authenticated_client.get(reverse('bloodpressure-list'), {'fields': 'timestamp,systolic'})
+
+        sql = context.captured_queries[-1]['sql']
+        assert '"diastolic"' not in sql
+        assert '"source"' not in sql
+        assert 'first_name' not in sql
+
+    def test_derived_fields(self, authenticated_client, readings):
+        """Test that derived fields still see the columns they are computed from"""
+        response = authenticated_client.get(reverse('sleepduration-list'), {'fields': 'duration,sleep_midpoint'})
+        full = authenticated_client.get(reverse('sleepduration-list')).data['results']
+
+        assert response.data['results'] == [
+            {'duration': row['duration'], 'sleep_midpoint': row['sleep_midpoint']} for row in full
+        ]
+
+    def test_cursor_pages(self, authenticated_client, readings):
+        """Test that keyset pages chain without timestamp and id in the output"""
+        results = []
+        response = authenticated_client.get(
+            reverse('spo2-list'), {'fields': 'value', 'pagination': 'cursor', 'page_size': 25}
+        )
+        while True:
+            results.extend(response.data['results'])
+            if response.data['next'] is None:
+                break
+            response = authenticated_client.get(response.data['next'])
+
+        assert len(results) == 60
+        assert all(list(row) == ['value'] for row in results)
+
+    @pytest.mark.parametrize('fields', ['value,unknown', ''])
+    def test_invalid_fields(self, authenticated_client, fields):
+        """Test that unknown or empty field lists are rejected"""
+        response = authenticated_client.get(reverse('heartrate-list'), {'fields': fields})
+
+        assert response.status_code == 400
+        assert 'Fields must be chosen from' in response.data['error']
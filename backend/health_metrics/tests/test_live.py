@@ -0,0 +1,81 @@
+import json
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import live
+from ..models import HeartRate
+
+User = get_user_model()
+
+UNREACHABLE = {'REDIS_URL': 'redis://localhost:1/0', 'RETRY_SECONDS': 30}
+
+
+@pytest.fixture
+def redis_down(settings, monkeypatch):
+    settings.HEALTH_METRIC_LIVE = UNREACHABLE
+    monkeypatch.setattr(live, '_client', None)
+    monkeypatch.setattr(live, '_unavailable_until', 0.0)
+
+
+def bearer_client(api_client, email, password):
+    """The stream is a plain async view, so clients authenticate with a real JWT"""
+    token = api_client.post(reverse('token_obtain_pair'), {'email': email, 'password': password}, format='json').data['access']
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return api_client
+
+
+@pytest.mark.django_db
+class TestLiveReadings:
+
+    def test_reading_payload(self, user):
+        """Test that pushed readings carry the measurement and the user id but not bookkeeping columns"""
+        reading = HeartRate.objects.create(user=user, value=72, activity_level='resting', timestamp=timezone.now(), source='device')
+
+        payload = json.loads(json.dumps(live.reading_payload(reading), cls=live.DjangoJSONEncoder))
+
+        assert payload['user'] == user.id
+        assert payload['value'] == 72
+        assert payload['activity_level'] == 'resting'
+        assert 'created_at' not in payload
+
+    def test_ingestion_survives_redis_outage(self, user, redis_down, django_capture_on_commit_callbacks):
+        """Test that readings are saved when Redis is down and publishing backs off"""
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            HeartRate.objects.bulk_insert([
+                HeartRate(user=user, value=70, activity_level='resting', timestamp=timezone.now(), source='device')
+            ])
+
+        assert [callback.__qualname__ for callback in callbacks].count('publish_readings.<locals>.send') == 1
+        assert HeartRate.objects.filter(user=user).count() == 1
+        assert live.publish_readings(HeartRate, HeartRate.objects.all()) == 0
+
+    def test_stream_requires_authentication(self, api_client):
+        """Test that the stream refuses anonymous clients"""
+        response = api_client.get(reverse('live-readings'))
+
+        assert response.status_code == 401
+
+    def test_stream_validates_parameters(self, api_client, user):
+        """Test that unknown metrics and other users' streams are refused"""
+        client = bearer_client(api_client, 'test@example.com', 'testpassword123')
+
+        response = client.get(reverse('live-readings'), {'metrics': 'heartrate,glucose'})
+        assert response.status_code == 400
+
+        response = client.get(reverse('live-readings'), {'user_ids': str(user.id + 1)})
+        assert response.status_code == 403
+
+    def test_stream_unavailable_without_redis(self, api_client, user, redis_down):
+        """Test that clinicians get a 503 instead of a hanging stream when Redis is unreachable"""
+        User.objects.create_user(email="doctor@example.com", password="doctorpassword123", role='DOCTOR')
+        client = bearer_client(api_client, 'doctor@example.com', 'doctorpassword123')
+
+        response = client.get(reverse('live-readings'), {'user_ids': str(user.id), 'metrics': 'heartrate'})
+
+        assert response.status_code == 503
+
+    def test_sse_event_format(self):
+        """Test that events are framed as Server-Sent Events"""
+        assert live.sse_event('heartrate', '{"readings": []}') == 'event: heartrate\ndata: {"readings": []}\n\n'
@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from datetime import timedelta
+
+from ..models import HeartRate
+
+
+@pytest.fixture
+def heart_rate_history(user):
+    """150 readings, with pairs sharing a timestamp to exercise the id tie-break"""
+    now = timezone.now().replace(microsecond=0)
+    return HeartRate.objects.bulk_create([
+        HeartRate(
+            user=user,
+            value=60 + i % 40,
+            activity_level='resting',
+            timestamp=now - timedelta(minutes=i // 2),
+            source='device'
+        )
+        for i in range(150)
+    ])
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_cursor_pages_cover_all_rows_once(self, authenticated_client, heart_rate_history):
+        """Test that following next cursors returns every reading exactly once, newest first"""
+        url = f"{reverse('heartrate-list')}?pagination=cursor&page_size=40"
+        seen = []
+
+        while url:
+            response = authenticated_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert 'count' not in response.data
+            seen.extend(response.data['results'])
+            url = response.data['next']
+
+        assert len(seen) == 150
+        assert len({row['id'] for row in seen}) == 150
+        keys = [(row['timestamp'], row['id']) for row in seen]
+        assert keys == sorted(keys, reverse=True)
+
+    def test_cursor_page_runs_no_count_query(self, authenticated_client, heart_rate_history):
+        """Test that a cursor page is a single seek query without COUNT(*)"""
+        url = f"{reverse('heartrate-list')}?pagination=cursor"
+        first_page = authenticated_client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get(first_page.data['next'])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not any('COUNT(' in query['sql'] for query in queries.captured_queries)
+
+    def test_cursor_allows_larger_pages(self, authenticated_client, heart_rate_history):
+        """Test that machine clients can request pages above the standard 100 rows"""
+        url = reverse('heartrate-list')
+        response = authenticated_client.get(f"{url}?pagination=cursor&page_size=1000")
+
+        assert len(response.data['results']) == 150
+        assert response.data['next'] is None
+
+    def test_ascending_cursor(self, authenticated_client, heart_rate_history):
+        """Test that ordering=timestamp pages oldest first"""
+        url = reverse('heartrate-list')
+        response = authenticated_client.get(f"{url}?pagination=cursor&ordering=timestamp&page_size=10")
+        next_page = authenticated_client.get(response.data['next'])
+
+        timestamps = [row['timestamp'] for row in response.data['results'] + next_page.data['results']]
+        assert timestamps == sorted(timestamps)
+
+    def test_invalid_cursor(self, authenticated_client, heart_rate_history):
+        """Test that a malformed cursor is rejected"""
+        url = reverse('heartrate-list')
+        response = authenticated_client.get(f"{url}?pagination=cursor&cursor=garbage")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
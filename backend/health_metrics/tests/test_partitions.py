@@ -0,0 +1,90 @@
+import pytest
+from django.db import connection
+from django.utils import timezone
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from ..models import HeartRate, MetricRollup, MetricVersion, RollupWatermark, SpO2
+from ..partitions import (
+    add_months,
+    detach_expired_partitions,
+    ensure_partitions,
+    list_partitions,
+    month_start
+)
+
+
+def rows_in(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM ONLY "{table}"')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+class TestMetricPartitions:
+
+    def test_upcoming_partitions_exist(self):
+        """Test that the current month and the months ahead are partitioned"""
+        ensure_partitions(HeartRate, months_ahead=3)
+
+        current = month_start(timezone.now())
+        months = list_partitions(HeartRate)
+        assert all(add_months(current, offset) in months for offset in range(4))
+
+    def test_old_readings_move_out_of_default_partition(self, user):
+        """Test that creating a partition relocates matching rows from the default partition"""
+        old = datetime(2020, 1, 15, 8, tzinfo=dt_timezone.utc)
+        reading = SpO2.objects.create(user=user, value=97, timestamp=old, source='device')
+        assert rows_in('health_metrics_spo2_default') == 1
+
+        created = ensure_partitions(SpO2, months_ahead=0)
+
+        assert 'health_metrics_spo2_p2020_01' in created
+        assert rows_in('health_metrics_spo2_default') == 0
+        assert rows_in('health_metrics_spo2_p2020_01') == 1
+        assert SpO2.objects.get(pk=reading.pk).timestamp == old
+
+    def test_detach_expired_partitions(self, user):
+        """Test that months past the retention window are detached from the table"""
+        old = datetime(2020, 1, 15, 8, tzinfo=dt_timezone.utc)
+        HeartRate.objects.create(user=user, value=70, activity_level='resting', timestamp=old, source='device')
+        recent = HeartRate.objects.create(
+            user=user, value=70, activity_level='resting', timestamp=timezone.now(), source='device'
+        )
+        ensure_partitions(HeartRate, months_ahead=0)
+
+        detached = detach_expired_partitions(HeartRate, retention_months=12)
+
+        assert 'health_metrics_heartrate_p2020_01' in detached
+        assert list(HeartRate.objects.values_list('pk', flat=True)) == [recent.pk]
+
+    def test_detach_finalizes_rollups(self, user):
+        """Test that rollups of detached months survive a rebuild and the user's version is bumped"""
+        old = datetime(2020, 1, 15, 8, tzinfo=dt_timezone.utc)
+        HeartRate.objects.bulk_insert([
+            HeartRate(user=user, value=value, activity_level='resting', timestamp=old, source='device')
+            for value in (60, 80)
+        ])
+        ensure_partitions(HeartRate, months_ahead=0)
+        version = MetricVersion.objects.get(user=user, metric='heartrate').version
+
+        detach_expired_partitions(HeartRate, retention_months=12)
+        MetricRollup.objects.rebuild(HeartRate)
+
+        rollup = MetricRollup.objects.get(user=user, metric='heartrate', period='day', activity_level='')
+        assert (rollup.count, rollup.sum) == (2, 140)
+        assert RollupWatermark.objects.get(metric='heartrate').finalized_until == datetime(
+            2020, 2, 1, tzinfo=dt_timezone.utc
+        )
+        assert MetricVersion.objects.get(user=user, metric='heartrate').version == version + 1
+
+    def test_date_range_query_prunes_partitions(self, user):
+        """Test that a timestamp range only scans the partitions it overlaps"""
+        ensure_partitions(HeartRate, months_ahead=1, since=timezone.now() - timedelta(days=62))
+        start = month_start(timezone.now())
+        queryset = HeartRate.objects.filter(user=user, timestamp__gte=start, timestamp__lt=add_months(start, 1))
+
+        plan = queryset.explain()
+
+        assert f"health_metrics_heartrate_p{start:%Y_%m}" in plan
+        assert f"health_metrics_heartrate_p{add_months(start, -1):%Y_%m}" not in plan
+        assert 'health_metrics_heartrate_default' not in plan
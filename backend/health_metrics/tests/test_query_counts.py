@@ -0,0 +1,78 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from ..models import BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
+
+
+def build(model, user, i):
+    timestamp = timezone.now() - timedelta(minutes=10 * i)
+    if model is HeartRate:
+        return HeartRate(user=user, value=60 + i % 40, activity_level='resting', timestamp=timestamp, source='device')
+    if model is BloodPressure:
+        return BloodPressure(user=user, systolic=120, diastolic=80, timestamp=timestamp, source='device')
+    if model is SpO2:
+        return SpO2(user=user, value=97, timestamp=timestamp, source='device')
+    if model is DailySteps:
+        return DailySteps(user=user, count=8000 + i, timestamp=timestamp, source='device')
+    return SleepDuration(
+        user=user, start_time=timestamp - timedelta(hours=8), end_time=timestamp, quality=7,
+        timestamp=timestamp, source='device'
+    )
+
+
+# Page number pagination costs the page plus one COUNT(*), keyset pagination only the page.
+# Every GET also reads the user's MetricVersion for its conditional GET validators.
+ENDPOINTS = [
+    ('heartrate-list', HeartRate),
+    ('bloodpressure-list', BloodPressure),
+    ('spo2-list', SpO2),
+    ('dailysteps-list', DailySteps),
+    ('sleepduration-list', SleepDuration),
+]
+
+
+@pytest.fixture
+def pages(user):
+    for _, model in ENDPOINTS:
+        model.objects.bulk_insert([build(model, user, i) for i in range(150)])
+
+
+@pytest.mark.django_db
+class TestQueryCounts:
+
+    @pytest.mark.parametrize('url_name,model', ENDPOINTS)
+    def test_list_page(self, authenticated_client, pages, url_name, model, django_assert_num_queries):
+        """Test that a full page of readings costs the same queries as an empty one"""
+        with django_assert_num_queries(3):
+            response = authenticated_client.get(reverse(url_name))
+
+        assert len(response.data['results']) == 100
+        assert response.data['results'][0]['full_name'] == 'Test User'
+
+    @pytest.mark.parametrize('url_name,model', ENDPOINTS)
+    def test_cursor_page(self, authenticated_client, pages, url_name, model, django_assert_num_queries):
+        """Test that keyset pages cost a single query besides the version"""
+        with django_assert_num_queries(2):
+            response = authenticated_client.get(reverse(url_name), {'pagination': 'cursor', 'page_size': 150})
+
+        assert len(response.data['results']) == 150
+
+    @pytest.mark.parametrize('url_name,model', ENDPOINTS)
+    def test_staff_list_for_user(self, admin_client, user, pages, url_name, model, django_assert_num_queries):
+        """Test that staff listing another user's readings has the same guarantee"""
+        with django_assert_num_queries(3):
+            response = admin_client.get(reverse(url_name), {'user_id': user.id})
+
+        assert {row['full_name'] for row in response.data['results']} == {'Test User'}
+
+    def test_detail(self, authenticated_client, user, django_assert_num_queries):
+        """Test that a single reading is fetched with its user's name in one query besides the version"""
+        reading = HeartRate.objects.bulk_insert([build(HeartRate, user, 0)])[0]
+        url = reverse('heartrate-detail', args=[reading.id])
+
+        with django_assert_num_queries(2):
+            response = authenticated_client.get(url)
+
+        assert response.data['full_name'] == 'Test User'
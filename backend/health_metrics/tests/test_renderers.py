@@ -0,0 +1,64 @@
+import io
+import pytest
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from ..models import HeartRate
+from ..parsers import ORJSONParser
+from ..renderers import ORJSONRenderer
+from ..serializers import HeartRateSerializer
+
+
+class TestORJSONRenderer:
+
+    def test_matches_stdlib_renderer(self):
+        """Test that native and fallback types render like DRF's JSONRenderer"""
+        data = {
+            "utc": datetime(2025, 5, 1, 8, 30, 15, 250000, tzinfo=dt_timezone.utc),
+            "lagos": datetime(2025, 5, 1, 8, 30, tzinfo=dt_timezone(timedelta(hours=1))),
+            "date": datetime(2025, 5, 1).date(),
+            "decimal": Decimal('72.50'),
+            "duration": timedelta(hours=7, minutes=30),
+            "unicode": "Adébáyọ̀",
+            "nested": [{"value": 1.5, "flag": True, "empty": None}],
+        }
+
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indent_falls_back_to_stdlib(self):
+        """Test that indented output keeps the requested indent"""
+        rendered = ORJSONRenderer().render({"a": [1]}, 'application/json; indent=4')
+
+        assert rendered == JSONRenderer().render({"a": [1]}, 'application/json; indent=4')
+
+
+@pytest.mark.django_db
+def test_serializer_page(user):
+    """Test that a serialized heart rate page renders to the same bytes"""
+    now = timezone.now()
+    HeartRate.objects.bulk_insert([
+        HeartRate(user=user, value=50 + i, activity_level='active', timestamp=now - timedelta(seconds=i), source='device')
+        for i in range(100)
+    ])
+    data = HeartRateSerializer(HeartRate.objects.filter(user=user), many=True).data
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+class TestORJSONParser:
+
+    def test_parses_like_stdlib_parser(self):
+        """Test that bodies parse to the same data as DRF's JSONParser"""
+        body = '[{"value": 75, "activity_level": "resting", "name": "Adébáyọ̀"}]'.encode()
+
+        assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+    @pytest.mark.parametrize('body', [b'{"value": ', b'{"value": NaN}', b'\xff'])
+    def test_invalid_body(self, body):
+        """Test that malformed JSON, NaN and invalid UTF-8 are parse errors"""
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(body))
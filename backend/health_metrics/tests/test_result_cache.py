@@ -0,0 +1,100 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import HeartRate, SpO2
+from ..result_cache import get_stats
+
+
+def add_heart_rates(user, count=5, start=0):
+    now = timezone.now()
+    return HeartRate.objects.bulk_insert([
+        HeartRate(user=user, value=65 + 5 * i, activity_level='active', timestamp=now - timedelta(hours=i), source='device')
+        for i in range(start, start + count)
+    ])
+
+
+def hrv_stats():
+    return get_stats(['heartrate.hrv'])['heartrate.hrv']
+
+
+@pytest.mark.django_db
+class TestResultCache:
+
+    def test_hit_skips_computation(self, authenticated_client, user, django_assert_num_queries):
+        """Test that a repeated analytics request is answered from the cache"""
+        add_heart_rates(user)
+        url = reverse('heartrate-hrv')
+        first = authenticated_client.get(url, {'time_window': 5})
+
+        # The version read of the conditional GET validators only
+        with django_assert_num_queries(1):
+            second = authenticated_client.get(url, {'time_window': 5})
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data == first.data
+        assert hrv_stats() == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
+
+    def test_new_reading_invalidates(self, authenticated_client, user):
+        """Test that saving a reading of the user invalidates the cached result"""
+        add_heart_rates(user)
+        url = reverse('heartrate-hrv')
+        before = authenticated_client.get(url, {'time_window': 24}).data
+
+        add_heart_rates(user, count=1, start=-1)
+        after = authenticated_client.get(url, {'time_window': 24}).data
+
+        assert after['readings'] == before['readings'] + 1
+
+    def test_other_metric_keeps_result(self, authenticated_client, user):
+        """Test that writes to another metric leave cached results alone"""
+        add_heart_rates(user)
+        url = reverse('heartrate-hrv')
+        authenticated_client.get(url)
+
+        SpO2.objects.create(user=user, value=97, timestamp=timezone.now(), source='device')
+        authenticated_client.get(url)
+
+        assert hrv_stats()['hits'] == 1
+
+    def test_parameters_and_users_are_keyed(self, authenticated_client, user, admin_user):
+        """Test that other parameters and other users miss the cache"""
+        add_heart_rates(user)
+        add_heart_rates(admin_user)
+        url = reverse('heartrate-hrv')
+        other_client = APIClient()
+        other_client.force_authenticate(user=admin_user)
+
+        authenticated_client.get(url, {'time_window': 5})
+        authenticated_client.get(url, {'time_window': 6})
+        other_client.get(url, {'time_window': 5})
+
+        assert hrv_stats() == {'hits': 0, 'misses': 3, 'hit_ratio': 0.0}
+
+    def test_errors_are_not_cached(self, authenticated_client):
+        """Test that error responses are computed every time"""
+        url = reverse('heartrate-hrv')
+
+        responses = [authenticated_client.get(url), authenticated_client.get(url)]
+
+        assert [response.status_code for response in responses] == [status.HTTP_404_NOT_FOUND] * 2
+        assert hrv_stats() == {'hits': 0, 'misses': 2, 'hit_ratio': 0.0}
+
+    def test_stats_endpoint(self, admin_client):
+        """Test that staff can read the counters of every cached action"""
+        response = admin_client.get(reverse('result-cache-stats'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.data['actions']) == {
+            'bloodpressure.time_of_day_analysis', 'bloodpressure.elevation_check', 'dailysteps.weekly_average',
+            'heartrate.hrv', 'heartrate.baseline_comparison', 'sleepduration.weekly_average'
+        }
+
+    def test_stats_require_admin(self, authenticated_client):
+        """Test that only staff can read the counters"""
+        response = authenticated_client.get(reverse('result-cache-stats'))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
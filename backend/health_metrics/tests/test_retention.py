@@ -0,0 +1,121 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Sum
+from django.urls import reverse
+from django.utils import timezone
+from datetime import timedelta
+
+from ..models import HeartRate, MetricRollup, RollupWatermark
+from ..retention import apply_retention, start_of_day
+
+
+@pytest.fixture
+def retention_policy(settings):
+    settings.HEALTH_METRIC_RETENTION = {'heartrate': {'default': 30, 'manual': None}}
+
+
+@pytest.fixture
+def heart_rate_history(user):
+    """One reading per source every 6 hours over 40 days"""
+    now = timezone.now()
+    return HeartRate.objects.bulk_insert([
+        HeartRate(
+            user=user, value=70, activity_level='resting',
+            timestamp=now - timedelta(hours=6 * i), source=source
+        )
+        for i in range(160)
+        for source in ('device', 'manual')
+    ])
+
+
+def day_sum(user):
+    return MetricRollup.objects.filter(
+        user=user, metric='heartrate', field='value', period='day', activity_level=''
+    ).aggregate(total=Sum('sum'))['total']
+
+
+def day_count(user):
+    return sum(MetricRollup.objects.filter(
+        user=user, metric='heartrate', field='value', period='day', activity_level=''
+    ).values_list('count', flat=True))
+
+
+@pytest.mark.django_db
+class TestRetention:
+
+    def test_old_readings_deleted_per_source(self, user, retention_policy, heart_rate_history):
+        """Test that only sources with a retention window lose their old raw readings"""
+        cutoff = start_of_day(timezone.now()) - timedelta(days=30)
+
+        summary = apply_retention()
+
+        assert summary['heartrate'] > 0
+        assert not HeartRate.objects.filter(source='device', timestamp__lt=cutoff).exists()
+        assert HeartRate.objects.filter(source='device', timestamp__gte=cutoff).exists()
+        assert HeartRate.objects.filter(source='manual', timestamp__lt=cutoff).count() > 0
+
+    def test_rollups_survive_deletion(self, user, retention_policy, heart_rate_history):
+        """Test that hourly/daily aggregates keep the history of deleted readings"""
+        apply_retention()
+
+        assert day_count(user) == len(heart_rate_history)
+        assert RollupWatermark.objects.get(metric='heartrate').finalized_until == \
+            start_of_day(timezone.now()) - timedelta(days=30)
+
+    def test_readings_without_rollups_are_downsampled_first(self, user, retention_policy):
+        """Test that rows inserted without incremental rollups are aggregated before deletion"""
+        old = timezone.now() - timedelta(days=45)
+        HeartRate.objects.bulk_create([
+            HeartRate(user=user, value=60 + i, activity_level='resting', timestamp=old + timedelta(minutes=i), source='device')
+            for i in range(10)
+        ])
+
+        apply_retention()
+
+        assert not HeartRate.objects.exists()
+        assert day_count(user) == 10
+
+    def test_rebuild_never_goes_below_watermark(self, user, retention_policy, heart_rate_history):
+        """Test that rebuilding rollups after retention keeps the finalized history"""
+        apply_retention()
+
+        call_command('rebuild_rollups', metric=['heartrate'])
+
+        assert day_count(user) == len(heart_rate_history)
+
+    def test_deletes_in_bounded_batches(self, user, retention_policy, heart_rate_history):
+        """Test that a run never deletes more than max_batches * batch_size rows per source"""
+        summary = apply_retention(batch_size=5, max_batches=2)
+
+        assert summary['heartrate'] == 10
+
+    def test_batches_skip_users_without_expired_readings(self, admin_user, user, retention_policy, heart_rate_history):
+        """Test that users with nothing to delete don't use up max_batches"""
+        HeartRate.objects.create(
+            user=admin_user, value=70, activity_level='resting', timestamp=timezone.now(), source='device'
+        )
+        cutoff = start_of_day(timezone.now()) - timedelta(days=30)
+
+        apply_retention(max_batches=1)
+
+        assert not HeartRate.objects.filter(source='device', timestamp__lt=cutoff).exists()
+        assert HeartRate.objects.filter(user=admin_user).count() == 1
+
+    def test_edits_before_watermark_update_finalized_rollups(self, authenticated_client, user, retention_policy,
+                                                           heart_rate_history):
+        """Test that editing or deleting a kept reading older than the watermark adjusts its final buckets"""
+        apply_retention()
+        watermark = RollupWatermark.objects.get(metric='heartrate').finalized_until
+        reading = HeartRate.objects.filter(source='manual', timestamp__lt=watermark).first()
+        detail_url = reverse('heartrate-detail', args=[reading.id])
+        total = day_sum(user)
+
+        authenticated_client.patch(detail_url, {'value': 90}, format='json')
+
+        assert day_count(user) == len(heart_rate_history)
+        assert day_sum(user) == total + 20
+
+        authenticated_client.delete(detail_url)
+
+        assert day_count(user) == len(heart_rate_history) - 1
+        assert day_sum(user) == total - 70
@@ -0,0 +1,120 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Avg
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from datetime import timedelta
+
+from ..models import BloodPressure, DailySteps, HeartRate, MetricRollup
+
+
+@pytest.fixture
+def heart_rate_readings(user):
+    """Readings every 17 minutes over two days so windows rarely align with hours"""
+    now = timezone.now().replace(second=0, microsecond=0)
+    return HeartRate.objects.bulk_insert([
+        HeartRate(
+            user=user,
+            value=55 + i % 50,
+            activity_level='resting' if i % 3 else 'active',
+            timestamp=now - timedelta(minutes=17 * i),
+            source='device'
+        )
+        for i in range(170)
+    ])
+
+
+def rollup_rows(metric):
+    return set(MetricRollup.objects.filter(metric=metric).values_list(
+        'user_id', 'field', 'period', 'bucket_start', 'activity_level', 'count', 'sum', 'sum_squares', 'min', 'max'
+    ))
+
+
+@pytest.mark.django_db
+class TestMetricRollups:
+
+    def test_single_insert_updates_rollups(self, user):
+        """Test that saving a reading increments its hourly and daily buckets"""
+        timestamp = timezone.localtime().replace(minute=30, second=0, microsecond=0)
+        HeartRate.objects.create(user=user, value=60, activity_level='resting', timestamp=timestamp, source='device')
+        HeartRate.objects.create(user=user, value=80, activity_level='active', timestamp=timestamp, source='device')
+
+        hour = MetricRollup.objects.get(metric='heartrate', period='hour', activity_level='')
+        assert hour.bucket_start == timestamp.replace(minute=0)
+        assert (hour.count, hour.sum, hour.sum_squares, hour.min, hour.max) == (2, 140, 10000, 60, 80)
+        assert hour.average == 70
+
+        resting_day = MetricRollup.objects.get(metric='heartrate', period='day', activity_level='resting')
+        assert resting_day.bucket_start == timestamp.replace(hour=0, minute=0)
+        assert resting_day.count == 1
+
+    def test_rebuild_matches_incremental(self, user, heart_rate_readings):
+        """Test that rebuilding from raw readings reproduces the incremental rollups"""
+        incremental = rollup_rows('heartrate')
+
+        call_command('rebuild_rollups', metric=['heartrate'])
+
+        assert rollup_rows('heartrate') == incremental
+
+    def test_skips_missing_values(self, user):
+        """Test that optional value fields without a value are not aggregated"""
+        BloodPressure.objects.create(user=user, systolic=120, diastolic=80, timestamp=timezone.now(), source='manual')
+
+        assert MetricRollup.objects.filter(metric='bloodpressure', field='systolic').count() == 2
+        assert not MetricRollup.objects.filter(metric='bloodpressure', field='pulse').exists()
+
+    def test_baseline_matches_raw_average(self, user, heart_rate_readings):
+        """Test that the rollup baseline equals an average over raw readings"""
+        current = heart_rate_readings[0]
+        since = current.timestamp - timedelta(days=1)
+
+        result = current.compare_to_baseline(baseline_days=1, baseline_activity='resting')
+
+        expected = HeartRate.objects.filter(
+            user=user, activity_level='resting', timestamp__lt=current.timestamp, timestamp__gte=since
+        ).aggregate(avg=Avg('value'))['avg']
+        assert result['baseline'] == round(expected, 1)
+
+    def test_time_of_day_matches_raw_average(self, authenticated_client, user):
+        """Test that morning/evening averages from rollups equal raw averages"""
+        now = timezone.now()
+        BloodPressure.objects.bulk_insert([
+            BloodPressure(
+                user=user, systolic=110 + i % 30, diastolic=70 + i % 10,
+                timestamp=now - timedelta(minutes=47 * i), source='device'
+            )
+            for i in range(100)
+        ])
+
+        response = authenticated_client.get(reverse('bloodpressure-time-of-day-analysis'), {'days': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        raw = BloodPressure.objects.filter(
+            user=user, timestamp__gte=now - timedelta(days=2), timestamp__hour__lt=12
+        ).aggregate(avg=Avg('systolic'))['avg']
+        morning = BloodPressure.objects.filter(user=user).latest('timestamp').get_average_by_time_of_day(days=2)['morning']
+        assert morning['avg_systolic'] == pytest.approx(raw)
+
+    def test_weekly_steps_from_daily_rollups(self, user):
+        """Test that the weekly step average is answered from daily buckets"""
+        today = timezone.localtime().replace(hour=12, minute=0, second=0, microsecond=0)
+        steps = DailySteps.objects.bulk_insert([
+            DailySteps(user=user, count=1000 * (i + 1), timestamp=today - timedelta(days=i), source='device')
+            for i in range(10)
+        ])
+
+        assert steps[0].get_weekly_average() == 4000
+
+    def test_update_and_delete_refresh_buckets(self, authenticated_client, user, heart_rate_data):
+        """Test that editing or deleting a reading through the API keeps rollups exact"""
+        created = authenticated_client.post(reverse('heartrate-list'), heart_rate_data, format='json').data
+        detail_url = reverse('heartrate-detail', args=[created['id']])
+
+        moved = timezone.now() - timedelta(days=3)
+        authenticated_client.patch(detail_url, {'timestamp': moved.isoformat()}, format='json')
+        day = MetricRollup.objects.get(metric='heartrate', period='day', activity_level='')
+        assert timezone.localtime(day.bucket_start).date() == timezone.localtime(moved).date()
+
+        authenticated_client.delete(detail_url)
+        assert not MetricRollup.objects.filter(metric='heartrate').exists()
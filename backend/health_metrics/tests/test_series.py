@@ -0,0 +1,84 @@
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from datetime import timedelta
+
+from ..models import BloodPressure, HeartRate, SleepDuration
+
+
+@pytest.mark.django_db
+class TestSeriesAPI:
+
+    def test_heart_rate_hourly_series(self, authenticated_client, user):
+        """Test that readings are bucketed and aggregated per hour in SQL"""
+        hour = timezone.localtime().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+        HeartRate.objects.bulk_create([
+            HeartRate(
+                user=user,
+                value=value,
+                activity_level='resting',
+                timestamp=hour + timedelta(hours=offset, minutes=minute),
+                source='device'
+            )
+            for offset, values in enumerate([[60, 70, 80], [90, 100]])
+            for minute, value in enumerate(values)
+        ])
+
+        url = reverse('heartrate-series')
+        response = authenticated_client.get(f"{url}?bucket=1h&agg=avg,min,max,count,p50&last_days=1")
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert len(results) == 2
+        assert results[0]['value_count'] == 3
+        assert results[0]['value_avg'] == 70
+        assert results[0]['value_min'] == 60
+        assert results[0]['value_p50'] == 70
+        assert results[1]['value_max'] == 100
+
+    def test_five_minute_buckets(self, authenticated_client, user):
+        """Test fixed-width buckets shorter than an hour"""
+        start = timezone.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=1)
+        HeartRate.objects.bulk_create([
+            HeartRate(user=user, value=70, activity_level='resting', timestamp=start + timedelta(minutes=i), source='device')
+            for i in range(15)
+        ])
+
+        url = reverse('heartrate-series')
+        response = authenticated_client.get(f"{url}?bucket=5m&agg=count")
+
+        assert [row['value_count'] for row in response.data['results']] == [5, 5, 5]
+
+    def test_blood_pressure_field_selection(self, authenticated_client, user):
+        """Test that multi-value metrics can aggregate a subset of fields"""
+        BloodPressure.objects.create(user=user, systolic=120, diastolic=80, timestamp=timezone.now(), source='manual')
+
+        url = reverse('bloodpressure-series')
+        response = authenticated_client.get(f"{url}?bucket=1d&agg=max&fields=systolic,diastolic")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0]['systolic_max'] == 120
+        assert response.data['results'][0]['diastolic_max'] == 80
+        assert 'pulse_max' not in response.data['results'][0]
+
+    def test_sleep_duration_series(self, authenticated_client, user):
+        """Test that the computed sleep duration can be aggregated"""
+        end = timezone.now()
+        SleepDuration.objects.create(
+            user=user, start_time=end - timedelta(hours=7, minutes=30), end_time=end,
+            timestamp=end - timedelta(hours=7, minutes=30), source='device'
+        )
+
+        url = reverse('sleepduration-series')
+        response = authenticated_client.get(f"{url}?bucket=1d&agg=avg&fields=duration")
+
+        assert response.data['results'][0]['duration_avg'] == 7.5
+
+    def test_invalid_parameters(self, authenticated_client):
+        """Test that unknown buckets, aggregates and fields are rejected"""
+        url = reverse('heartrate-series')
+
+        assert authenticated_client.get(f"{url}?bucket=2h").status_code == status.HTTP_400_BAD_REQUEST
+        assert authenticated_client.get(f"{url}?agg=median").status_code == status.HTTP_400_BAD_REQUEST
+        assert authenticated_client.get(f"{url}?fields=systolic").status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,74 @@
+import json
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from datetime import timedelta
+
+from ..models import HeartRate, SpO2
+from ..views import SpO2ViewSet
+
+
+def read_progress(response):
+    """Collects the NDJSON progress lines of a streaming upload response"""
+    body = b''.join(response.streaming_content).decode()
+    return [json.loads(line) for line in body.splitlines()]
+
+
+@pytest.mark.django_db
+class TestStreamingUploadAPI:
+
+    def test_ndjson_upload(self, authenticated_client, user):
+        """Test that NDJSON rows are inserted and clean() failures are rejected"""
+        url = reverse('heartrate-upload')
+        lines = [
+            json.dumps({
+                "value": 70,
+                "activity_level": "resting",
+                "timestamp": (timezone.now() - timedelta(minutes=i)).isoformat(),
+                "source": "device"
+            })
+            for i in range(5)
+        ]
+        # Valid for the serializer but outside the range enforced by HeartRate.clean()
+        lines.append(json.dumps({
+            "value": 250,
+            "activity_level": "active",
+            "timestamp": timezone.now().isoformat(),
+            "source": "device"
+        }))
+        lines.append("not json")
+
+        response = authenticated_client.post(url, data="\n".join(lines), content_type='application/x-ndjson')
+
+        assert response.status_code == status.HTTP_200_OK
+        summary = read_progress(response)[-1]
+        assert summary['status'] == 'complete'
+        assert summary['inserted'] == 5
+        assert summary['rejected'] == 2
+        assert [error['line'] for error in summary['errors']] == [6, 7]
+        assert HeartRate.objects.filter(user=user).count() == 5
+
+    def test_csv_upload_flushes_batches(self, authenticated_client, user, monkeypatch):
+        """Test that CSV rows are flushed in fixed-size batches with progress reports"""
+        url = reverse('spo2-upload')
+        rows = ["timestamp,value,measurement_method,source"]
+        rows += [
+            f"{(timezone.now() - timedelta(minutes=i)).isoformat()},{95 + i % 5},,device"
+            for i in range(25)
+        ]
+
+        monkeypatch.setattr(SpO2ViewSet, 'upload_batch_size', 10)
+        response = authenticated_client.post(url, data="\n".join(rows), content_type='text/csv')
+        progress = read_progress(response)
+
+        assert [update['inserted'] for update in progress] == [10, 20, 25]
+        assert progress[-1]['rejected'] == 0
+        assert SpO2.objects.filter(user=user, measurement_method='OTHER').count() == 25
+
+    def test_upload_rejects_unknown_content_type(self, authenticated_client):
+        """Test that only NDJSON and CSV bodies are accepted"""
+        url = reverse('heartrate-upload')
+        response = authenticated_client.post(url, data="<xml/>", content_type='application/xml')
+
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
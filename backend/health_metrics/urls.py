@@ -1,17 +1,27 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 from .views import (
+    AlertViewSet,
     BloodPressureViewSet,
+    DashboardView,
     DailyStepsViewSet,
     HeartRateViewSet,
+    ResultCacheStatsView,
     SleepDurationViewSet,
-    SpO2ViewSet
+    SpO2ViewSet,
+    live_readings
 )
 
 router = DefaultRouter()
+router.register(r'alerts', AlertViewSet)
 router.register(r'blood-pressure', BloodPressureViewSet)
 router.register(r'daily-steps', DailyStepsViewSet)
 router.register(r'heart-rate', HeartRateViewSet)
 router.register(r'sleep-duration', SleepDurationViewSet)
 router.register(r'spo2', SpO2ViewSet)
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = router.urls + [
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('live/readings/', live_readings, name='live-readings'),
+    path('result-cache/stats/', ResultCacheStatsView.as_view(), name='result-cache-stats'),
+]
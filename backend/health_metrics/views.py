@@ -1,15 +1,59 @@
-from rest_framework import viewsets, filters, permissions, status
-from rest_framework.pagination import PageNumberPagination
+from rest_framework import viewsets, filters, permissions, serializers, status
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models.functions import TruncHour, TruncDay
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.settings import api_settings
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+import redis
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db import models
-from django.db.models import Avg, Min, Max
+from django.db import models, transaction
+from django.db.models import Avg, Min, Max, Value
+from django.db.models.functions import Concat, Trim
 from datetime import timedelta  
-from .models import BloodPressure, DailySteps, HeartRate, SleepDuration, SpO2
+from decimal import Decimal
+import copy
+import json
+from users.models import Role
+from users.permissions import IsDoctorOrNurseOrAdmin
+from .aggregation import AGGREGATES, BUCKETS, bucketed_series
+from .dashboard import WINDOWS, build_dashboard
+from .downsampling import downsample_ids, downsample_rows
+from . import live
+from .conditional import ConditionalGetMixin
+from .result_cache import cached_result, get_stats
+from .hrv import hrv_by_window, hrv_for_users
+from .listing import list_plan
+from .ingestion import (
+    CSV_CONTENT_TYPES,
+    NDJSON_CONTENT_TYPES,
+    ingest_rows,
+    iter_csv,
+    iter_lines,
+    iter_ndjson
+)
+from .models import (
+    METRIC_MODELS,
+    Alert,
+    BaselineStats,
+    BloodPressure,
+    DailySteps,
+    HeartRate,
+    MetricRollup,
+    MetricVersion,
+    SleepDuration,
+    SpO2
+)
+from .pagination import KeysetPagination, StandardResultsPagination
+from .renderers import ArrowStreamRenderer, ColumnarRenderer, ParquetRenderer
 from .serializers  import (
+    AlertSerializer,
     BloodPressureSerializer,
     DailyStepsSerializer,
     HeartRateSerializer,
@@ -24,19 +68,19 @@ from .filters import(
     SpO2FilterSet
 )
 # Create your views here.
-class StandardResultsPagination(PageNumberPagination):
-    """Standard pagination for all viewsets"""
-    page_size = 100
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
-class BaseHealthMetricsViewSet(viewsets.ModelViewSet):
+class BaseHealthMetricsViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """Base viewset for all health metrics"""
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsPagination
+    keyset_pagination_class = KeysetPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ArrowStreamRenderer, ParquetRenderer]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
     ordering_fields = ['timestamp', 'created_at', 'updated_at']
     ordering = ['-timestamp']
+    conditional_exempt_actions = ('hrv_batch',)
+    bulk_max_items = 5000
+    upload_batch_size = 1000
+    max_points_limit = 10000
 
     def get_queryset(self):
         """
@@ -45,6 +89,12 @@ class BaseHealthMetricsViewSet(viewsets.ModelViewSet):
         """
         user = self.request.user
         queryset = self.queryset
+        fields = self.get_list_fields()
+        if self.action in ('list', 'retrieve') and (fields is None or 'full_name' in fields):
+            # Serialized rows show the user's name; computing it in SQL keeps a page at a constant query count
+            queryset = queryset.annotate(
+                full_name=Trim(Concat('user__first_name', Value(' '), 'user__last_name'))
+            )
 
         # If the request user is staff and a user_id is provided, filter by that user
         if user.is_staff and 'user_id' in self.request.query_params:
@@ -52,11 +102,288 @@ class BaseHealthMetricsViewSet(viewsets.ModelViewSet):
             return queryset.filter(user_id=user_id)
         
         return queryset.filter(user=user)
-    
+
+    def get_conditional_user_id(self):
+        """The user get_queryset() restricts readings to, None if user_id is not a valid id"""
+        user = self.request.user
+        if user.is_staff and 'user_id' in self.request.query_params:
+            try:
+                return int(self.request.query_params.get('user_id'))
+            except ValueError:
+                return None
+        return user.id
+
+    def get_list_fields(self):
+        """
+        Fields requested with ?fields=timestamp,value on the list action, None
+        for all of them. The names are checked by list().
+        """
+        if self.action != 'list' or 'fields' not in self.request.query_params:
+            return None
+        return [name.strip() for name in self.request.query_params['fields'].split(',') if name.strip()]
+
+    def get_max_points(self):
+        """
+        The ?max_points= chart requests downsample to, None without it.
+
+        Raises:
+            ValueError: If it is not an integer between 3 and max_points_limit
+        """
+        if 'max_points' not in self.request.query_params:
+            return None
+        max_points = int(self.request.query_params['max_points'])
+        if not 3 <= max_points <= self.max_points_limit:
+            raise ValueError(max_points)
+        return max_points
+
+    def max_points_error(self):
+        return Response(
+            {"error": f"max_points must be an integer between 3 and {self.max_points_limit}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    @property
+    def paginator(self):
+        """
+        Uses keyset pagination on (timestamp, id) when the client opts in
+        with ?pagination=cursor, page number pagination otherwise.
+        """
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def list(self, request, *args, **kwargs):
+        """
+        Lists readings through the precompiled row path of listing.py,
+        which reads values_list() rows instead of model instances and
+        produces the same JSON as the serializer.
+
+        With Accept: application/vnd.apache.arrow.stream or
+        application/vnd.apache.parquet (or ?format=arrow / parquet) the page
+        is returned as typed columns, with the pagination links in a Link header.
+
+        Query Parameters:
+        - fields: Comma separated fields to return (default: all); only their
+          columns are read from the database
+        - max_points: Downsample the filtered readings to at most this many
+          with LTTB (see downsampling.py), returned unpaginated in time order
+        - downsample_field: Value field whose curve is kept (default: the
+          metric's first value field)
+        """
+        fields = self.get_list_fields()
+        if fields is not None:
+            available = list(self.get_serializer_class()().fields)
+            if not fields or not all(field in available for field in fields):
+                return Response(
+                    {"error": f"Fields must be chosen from: {', '.join(available)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        try:
+            max_points = self.get_max_points()
+        except ValueError:
+            return self.max_points_error()
+
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = list_plan(self.get_serializer_class(), queryset, fields)
+
+        if max_points is not None:
+            value_fields = self.queryset.model.value_fields
+            downsample_field = request.query_params.get('downsample_field', value_fields[0])
+            if downsample_field not in value_fields:
+                return Response(
+                    {"error": f"downsample_field must be one of: {', '.join(value_fields)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            ids = downsample_ids(queryset, downsample_field, max_points)
+            rows = plan.rows(queryset.filter(id__in=ids).order_by('timestamp', 'id'))
+            if isinstance(request.accepted_renderer, ColumnarRenderer):
+                return Response(plan.table(rows))
+            return Response(plan.represent(rows))
+
+        rows = plan.rows(queryset)
+
+        page = self.paginate_queryset(rows)
+        if isinstance(request.accepted_renderer, ColumnarRenderer):
+            if page is None:
+                return Response(plan.table(rows))
+            return Response(plan.table(page), headers=self.paginator.get_paginated_headers())
+        if page is not None:
+            return self.get_paginated_response(plan.represent(page))
+        return Response(plan.represent(rows))
+
     def perform_create(self, serializer):
         """Automatically set the user to the current authenticated user"""
         serializer.save(user=self.request.user)
 
+    def perform_update(self, serializer):
+        """Refresh the rollup buckets the reading moved out of and into, the user's baselines and version"""
+        previous = copy.copy(serializer.instance)
+        with transaction.atomic():
+            instance = serializer.save()
+            MetricVersion.objects.bump(self.queryset.model, [instance.user_id])
+            MetricRollup.objects.refresh_buckets(
+                self.queryset.model, instance.user_id, removed=[previous], added=[instance]
+            )
+            BaselineStats.objects.replace_readings(
+                self.queryset.model, instance.user_id, removed=[previous], added=[instance]
+            )
+
+    def perform_destroy(self, instance):
+        """Refresh the rollup buckets of the deleted reading, the user's baselines and version"""
+        with transaction.atomic():
+            instance.delete()
+            MetricVersion.objects.bump(self.queryset.model, [instance.user_id])
+            MetricRollup.objects.refresh_buckets(self.queryset.model, instance.user_id, removed=[instance])
+            BaselineStats.objects.replace_readings(self.queryset.model, instance.user_id, removed=[instance])
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create many readings in a single request.
+
+        Expects a JSON list of readings. Valid readings are written in chunks
+        with bulk_create; invalid ones are reported by their index in the
+        payload without failing the rest of the batch.
+
+        Returns:
+        - Number of readings created and rejected
+        - Per-item validation errors
+        """
+        serializer = self.get_serializer(data=request.data, many=True, max_length=self.bulk_max_items)
+        serializer.is_valid(raise_exception=True)
+
+        created = serializer.save(user=request.user)
+        errors = serializer.item_errors
+
+        response_data = {
+            "created": len(created),
+            "rejected": len(errors),
+            "errors": errors
+        }
+
+        if not created:
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(response_data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def upload(self, request):
+        """
+        Stream a historical backfill into the database.
+
+        The body is an NDJSON (application/x-ndjson) or CSV (text/csv) file
+        with one reading per line. It is parsed incrementally and flushed in
+        fixed-size batches, so uploads of any size use constant memory.
+
+        Query Parameters:
+        - user_id: Staff only, the patient the readings belong to
+
+        Returns:
+        - An NDJSON stream with one progress line per flushed batch and a
+          final summary with inserted and rejected row counts
+        """
+        content_type = request.content_type.split(';')[0].strip()
+        if content_type in NDJSON_CONTENT_TYPES:
+            parse_rows = iter_ndjson
+        elif content_type in CSV_CONTENT_TYPES:
+            parse_rows = iter_csv
+        else:
+            return Response(
+                {"error": "Upload must be NDJSON (application/x-ndjson) or CSV (text/csv)"},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+
+        if request.stream is None:
+            return Response(
+                {"error": "Upload body is empty"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        target_user = request.user
+        if request.user.is_staff and 'user_id' in request.query_params:
+            target_user = get_object_or_404(get_user_model(), pk=request.query_params.get('user_id'))
+
+        progress = ingest_rows(
+            parse_rows(iter_lines(request.stream)),
+            self.get_serializer(),
+            target_user,
+            batch_size=self.upload_batch_size
+        )
+
+        return StreamingHttpResponse(
+            (json.dumps(update) + "\n" for update in progress),
+            content_type='application/x-ndjson'
+        )
+
+    @action(detail=False, methods=['get'])
+    def series(self, request):
+        """
+        Time-bucketed aggregates computed in SQL, for charts.
+
+        Query Parameters:
+        - bucket: Bucket width, one of 1m, 5m, 15m, 1h, 6h, 1d (default: 1h)
+        - agg: Comma separated aggregates from avg, min, max, count, p50, p95
+          (default: avg,min,max,count)
+        - fields: Comma separated value fields to aggregate (default: all)
+        - max_points: Downsample the buckets to at most this many with LTTB on
+          the first field's first aggregate; buckets without it are left out
+        - start_date, end_date, last_days and the metric's other filters
+
+        Returns:
+        - One row per bucket with a '<field>_<agg>' key per combination
+        """
+        bucket = request.query_params.get('bucket', '1h')
+        if bucket not in BUCKETS:
+            return Response(
+                {"error": f"Bucket must be one of: {', '.join(BUCKETS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        aggregates = request.query_params.get('agg', 'avg,min,max,count').split(',')
+        if not all(aggregate in AGGREGATES for aggregate in aggregates):
+            return Response(
+                {"error": f"Aggregates must be chosen from: {', '.join(AGGREGATES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        value_fields = self.queryset.model.value_fields
+        fields = request.query_params.get('fields')
+        fields = fields.split(',') if fields else list(value_fields)
+        if not all(field in value_fields for field in fields):
+            return Response(
+                {"error": f"Fields must be chosen from: {', '.join(value_fields)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            max_points = self.get_max_points()
+        except ValueError:
+            return self.max_points_error()
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = bucketed_series(queryset, bucket, aggregates, fields)
+        if max_points is not None:
+            rows = downsample_rows(rows, 'bucket', f"{fields[0]}_{aggregates[0]}", max_points)
+
+        timestamp_field = serializers.DateTimeField()
+        results = [
+            {
+                key: timestamp_field.to_representation(value) if key == 'bucket'
+                else round(value, 2) if isinstance(value, float) else value
+                for key, value in row.items()
+            }
+            for row in rows
+        ]
+
+        return Response({
+            "bucket": bucket,
+            "aggregates": aggregates,
+            "fields": fields,
+            "results": results
+        })
+
 class BloodPressureViewSet(BaseHealthMetricsViewSet):
     """ViewSet for BloodPressure metrics"""
     queryset = BloodPressure.objects.all()
@@ -65,6 +392,7 @@ class BloodPressureViewSet(BaseHealthMetricsViewSet):
     search_fields = ['source']
 
     @action(detail=False, methods=['get'])
+    @cached_result
     def time_of_day_analysis(self, request):
         """
         Analyze blood pressure patterns by time of day (morning vs evening).
@@ -143,6 +471,7 @@ class BloodPressureViewSet(BaseHealthMetricsViewSet):
             return Response(response_data)
         
     @action(detail=False, methods=['get'])
+    @cached_result
     def elevation_check(self, request):
         """
         Checks whether blood pressure is consistently elevated.
@@ -288,6 +617,7 @@ class DailyStepsViewSet(BaseHealthMetricsViewSet):
     search_fields = ['source', 'device']
 
     @action(detail=False, methods=['get'])
+    @cached_result
     def weekly_average(self, request):
         """
         Get average number of steps per day over the past week.
@@ -368,9 +698,18 @@ class HeartRateViewSet(BaseHealthMetricsViewSet):
         })
     
     @action(detail=False, methods=['get'])
+    @cached_result
     def hrv(self, request):
         """
         End-point for calculate_hrv function in HeartRate class
+
+        Query Parameters:
+        - time_window: Hours of readings per window (default: 24, max: 24)
+        - days: If provided, HRV of every time_window-hour window over the last N days (max: 90)
+
+        Returns:
+        - RMSSD (hrv), SDNN and pNN50 of the window ending at the latest reading,
+          or one entry per window when days is given
         """
         try:
             time_window = int(request.query_params.get('time_window', 24))
@@ -391,23 +730,96 @@ class HeartRateViewSet(BaseHealthMetricsViewSet):
                 {"error": "No heart rate data found"},
                 status=status.HTTP_404_NOT_FOUND
             )
+
+        if 'days' in request.query_params:
+            try:
+                days = int(request.query_params.get('days'))
+                if days <= 0 or days > 90:
+                    return Response(
+                        {"error": "Days must be between 1 and 90"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+            except ValueError:
+                return Response(
+                    {"error": "Days parameter must be a valid integer"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            windows = hrv_by_window(
+                queryset.filter(timestamp__gte=timezone.now() - timedelta(days=days)), time_window
+            )
+            timestamp_field = serializers.DateTimeField()
+            return Response({
+                "time_window_hours": time_window,
+                "unit": "milliseconds (ms)",
+                "windows": [
+                    {"window_start": timestamp_field.to_representation(window_start), **summary}
+                    for window_start, summary in windows.items()
+                ]
+            })
         
         latest_hr = queryset.latest('timestamp')
 
-        hrv_value = latest_hr.calculate_hrv(time_window)
+        summary = latest_hr.get_hrv_summary(time_window)
 
-        if not hrv_value:
+        if not summary:
             return Response(
                 {"message": "Insufficent data to calculate HRV"},
                 status=status.HTTP_200_OK)
         
         return Response({
-            "hrv": hrv_value,
+            "hrv": summary['rmssd'],
+            "sdnn": summary['sdnn'],
+            "pnn50": summary['pnn50'],
+            "readings": summary['count'],
             "time_window_hours": time_window,
             "unit": "milliseconds (ms)",   
         },status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated, IsDoctorOrNurseOrAdmin])
+    def hrv_batch(self, request):
+        """
+        HRV of many patients in a single query, for the clinician patient list.
+
+        Query Parameters:
+        - user_ids: Comma separated patient ids (default: all patients)
+        - time_window: Hours before each patient's latest reading (default: 24, max: 24)
+
+        Returns:
+        - One entry per patient with at least two readings in their window
+        """
+        try:
+            time_window = int(request.query_params.get('time_window', 24))
+            if time_window <= 0 or time_window > 24:
+                return Response(
+                    {"error": "Time window must be within 24hrs"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if 'user_ids' in request.query_params:
+                user_ids = [int(user_id) for user_id in request.query_params.get('user_ids').split(',')]
+            else:
+                user_ids = list(
+                    get_user_model().objects.filter(role=Role.USER).values_list('id', flat=True)
+                )
+        except ValueError:
+            return Response(
+                {"error": "Time window and user ids must be valid integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = hrv_for_users(user_ids, time_window)
+
+        return Response({
+            "time_window_hours": time_window,
+            "unit": "milliseconds (ms)",
+            "results": [
+                {"user_id": user_id, **summary}
+                for user_id, summary in sorted(results.items())
+            ]
+        })
     
     @action(detail=False, methods=['get'])
+    @cached_result
     def baseline_comparison(self, request):
         """
         End point for function compare_to_baseline in HeartRate class
@@ -426,15 +838,13 @@ class HeartRateViewSet(BaseHealthMetricsViewSet):
             )
         
         baseline_activity = request.query_params.get('baseline_activity', None)
-        queryset = self.get_queryset()
+        latest_hr = self.get_queryset().order_by('-timestamp').first()
 
-        if not queryset.exists():
+        if latest_hr is None:
             return Response(
                 {"error": "No heart rate data found"},
                 status=status.HTTP_404_NOT_FOUND
             )
-        
-        latest_hr = queryset.latest('timestamp')
 
         result = latest_hr.compare_to_baseline(baseline_days=baseline_days, baseline_activity=baseline_activity)
 
@@ -542,6 +952,7 @@ class SleepDurationViewSet(BaseHealthMetricsViewSet):
         return Response(response_data)
 
     @action(detail=False, methods=['get'])
+    @cached_result
     def weekly_average(self, request):
         """Endpoint for weekly_average method in SleepDuration class"""
         try:
@@ -701,4 +1112,201 @@ class SpO2ViewSet(BaseHealthMetricsViewSet):
             "latest_value":latest_value,
             "timestamp": timestamp
         }
-        return Response(response_data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class AlertViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for alerts raised by the streaming anomaly detectors"""
+    queryset = Alert.objects.all()
+    serializer_class = AlertSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = StandardResultsPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['metric', 'field', 'detector', 'severity', 'acknowledged']
+    ordering_fields = ['timestamp', 'created_at']
+    ordering = ['-timestamp']
+
+    def get_queryset(self):
+        """
+        Restricts the returned alerts to the authenticated user,
+        unless the user is staff and a user_id parameter is provided
+        """
+        user = self.request.user
+        if user.is_staff and 'user_id' in self.request.query_params:
+            return self.queryset.filter(user_id=self.request.query_params.get('user_id'))
+        return self.queryset.filter(user=user)
+
+    @action(detail=True, methods=['post'])
+    def acknowledge(self, request, pk=None):
+        """Mark an alert as seen"""
+        alert = self.get_object()
+        alert.acknowledged = True
+        alert.save(update_fields=['acknowledged'])
+        return Response(self.get_serializer(alert).data, status=status.HTTP_200_OK)
+
+
+
+class DashboardView(ConditionalGetMixin, APIView):
+    """Latest values, window aggregates and downsampled series of every metric in one response"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_conditional_models(self):
+        return METRIC_MODELS
+
+    def get_conditional_user_id(self):
+        """The patient whose dashboard is shown, None when get() would refuse the request"""
+        if 'user_id' not in self.request.query_params:
+            return self.request.user.id
+        if not (self.request.user.is_staff or IsDoctorOrNurseOrAdmin().has_permission(self.request, self)):
+            return None
+        try:
+            return int(self.request.query_params['user_id'])
+        except ValueError:
+            return None
+
+    def get(self, request):
+        """
+        Query Parameters:
+        - window: One of 1h, 6h, 12h, 24h, 7d, 30d (default: 24h)
+        - user_id: Patient whose dashboard to show, for staff, doctors, nurses and admins
+
+        Returns:
+        - Per metric: its bucket width, the latest reading, count/avg/min/max
+          of each field over the window and one row per bucket
+        """
+        window = request.query_params.get('window', '24h')
+        if window not in WINDOWS:
+            return Response(
+                {"error": f"Window must be one of: {', '.join(WINDOWS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        target_user = request.user
+        if 'user_id' in request.query_params:
+            if not (request.user.is_staff or IsDoctorOrNurseOrAdmin().has_permission(request, self)):
+                return Response(
+                    {"error": IsDoctorOrNurseOrAdmin.message},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            try:
+                target_user = get_object_or_404(get_user_model(), pk=int(request.query_params['user_id']))
+            except ValueError:
+                return Response(
+                    {"error": "user_id must be a valid integer"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        dashboard = build_dashboard(target_user, window)
+
+        timestamp_field = serializers.DateTimeField()
+
+        def represent(key, value):
+            if key in ('bucket', 'timestamp') and value is not None:
+                return timestamp_field.to_representation(value)
+            if isinstance(value, (float, Decimal)):
+                return round(float(value), 2)
+            return value
+
+        metrics = {}
+        for name, metric in dashboard['metrics'].items():
+            latest = metric['latest']
+            metrics[name] = {
+                "bucket": metric['bucket'],
+                "latest": {key: represent(key, value) for key, value in latest.items()} if latest else None,
+                "summary": {
+                    field: {key: represent(key, value) for key, value in stats.items()}
+                    for field, stats in metric['summary'].items()
+                },
+                "series": [{key: represent(key, value) for key, value in row.items()} for row in metric['series']]
+            }
+
+        return Response({
+            "window": window,
+            "user_id": target_user.id,
+            "start": timestamp_field.to_representation(dashboard['start']),
+            "metrics": metrics
+        }, status=status.HTTP_200_OK)
+
+
+class ResultCacheStatsView(APIView):
+    """Hit and miss counters of the analytics result cache"""
+    permission_classes = [permissions.IsAdminUser]
+    metric_viewsets = [BloodPressureViewSet, DailyStepsViewSet, HeartRateViewSet, SleepDurationViewSet, SpO2ViewSet]
+
+    def get(self, request):
+        """
+        Returns:
+        - Per 'metric.action': hits, misses and hit ratio since the counters were created
+        """
+        names = [
+            f"{viewset.queryset.model._meta.model_name}.{name}"
+            for viewset in self.metric_viewsets
+            for name, method in vars(viewset).items()
+            if getattr(method, 'cached_result', False)
+        ]
+        stats = get_stats(names)
+        if stats is None:
+            return Response(
+                {"error": "Result cache is temporarily unavailable"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        return Response({"actions": stats})
+
+
+@require_GET
+async def live_readings(request):
+    """
+    Server-Sent Events stream of newly inserted readings, served by the ASGI app.
+
+    Query Parameters:
+    - metrics: Comma separated metric names, e.g. heartrate,spo2 (default: all)
+    - user_ids: Comma separated patient ids, for doctors, nurses and admins (default: own readings)
+
+    Returns:
+    - text/event-stream with one event per inserted batch, named after its metric,
+      whose data is {"metric": ..., "readings": [...]}
+    """
+    try:
+        authenticated = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as exc:
+        return JsonResponse({"error": str(exc.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    if authenticated is None:
+        return JsonResponse(
+            {"error": "Authentication credentials were not provided."}, status=status.HTTP_401_UNAUTHORIZED
+        )
+    request.user = authenticated[0]
+
+    available = [model._meta.model_name for model in METRIC_MODELS]
+    metrics = request.GET.get('metrics')
+    metrics = metrics.split(',') if metrics else available
+    if not set(metrics) <= set(available):
+        return JsonResponse(
+            {"error": f"Invalid metrics. Must be among: {', '.join(available)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    user_ids = [request.user.id]
+    if 'user_ids' in request.GET:
+        if not IsDoctorOrNurseOrAdmin().has_permission(request, None):
+            return JsonResponse(
+                {"error": IsDoctorOrNurseOrAdmin.message}, status=status.HTTP_403_FORBIDDEN
+            )
+        try:
+            user_ids = [int(user_id) for user_id in request.GET['user_ids'].split(',')]
+        except ValueError:
+            return JsonResponse(
+                {"error": "user_ids must be a comma separated list of integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    try:
+        client, pubsub = await live.subscribe(metrics, user_ids)
+    except redis.RedisError:
+        return JsonResponse(
+            {"error": "Live updates are temporarily unavailable"}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+    response = StreamingHttpResponse(live.stream_events(client, pubsub), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
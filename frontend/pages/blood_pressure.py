@@ -1,11 +1,10 @@
 import streamlit as st
-from utils.api import get_blood_pressure_data
+from utils.api import conditional_get, get_blood_pressure_data
+from utils.live import live_dataframe
 import plotly.graph_objects as go
 import pandas as pd
 from streamlit_autorefresh import st_autorefresh
 import datetime
-import requests
-import time
 
 
 # Auto-refresh every 5 seconds
@@ -14,6 +13,11 @@ st_autorefresh(interval=refresh_interval, key="bp_autorefresh")
 
 ALLOWED_ROLES = ['DOCTOR', 'NURSE', 'ADMIN']
 
+@st.cache_data(ttl=600) # New readings are pushed by the live feed in between
+def cached_get_blood_pressure_data(days, user_id=None):
+    print(f"CACHE MISS: Calling API for get_blood_pressure_data(days={days}) for user {user_id or 'self'}")
+    return get_blood_pressure_data(days, user_id)
+
 def show_blood_pressure_page(user_id=None):
     current_role = st.session_state.get("role", "USER")
     if current_role not in ALLOWED_ROLES:
@@ -45,9 +49,11 @@ def show_blood_pressure_page(user_id=None):
 
     if refresh_button:
         with st.spinner("Refreshing data..."):
-            time.sleep(0.5)
+            cached_get_blood_pressure_data.clear()
+            st.rerun()
 
-    blood_pressure_df = get_blood_pressure_data(days, user_id)
+    blood_pressure_df = live_dataframe('bloodpressure', cached_get_blood_pressure_data, user_id=user_id,
+                                       days=days, poll_seconds=5)
 
     if blood_pressure_df.empty:
         st.warning("No blood pressure data available for the selected period. Please check your connection or try another time range.")
@@ -209,7 +215,7 @@ def run_time_of_day_analysis():
         days = st.selectbox("Analysis period", [1, 3, 7, 14, 30, 60, 90], index=1)
 
     with st.spinner("Analyzing time of day patterns"):
-        response = requests.get(
+        response = conditional_get(
             f"{API_BASE_URL}/blood-pressure/time_of_day_analysis/?days={days}",
             headers=headers
         )
@@ -265,7 +271,7 @@ def run_age_comparison():
         age = st.number_input("Enter user age for personalized assessment", min_value=18, max_value=120, value=40, format='%d')
 
     with st.spinner("Generating age-based assessment"):
-        response = requests.get(
+        response = conditional_get(
             f"{API_BASE_URL}/blood-pressure/age_comparison?age={age}",
             headers=headers
         )
@@ -311,7 +317,7 @@ def run_elevation_check():
         days = st.selectbox("Check period", [1,3, 7, 14, 30], index=1, key="elevation_days")
     
     with st.spinner("Checking blood pressure elevation..."):
-        response = requests.get(
+        response = conditional_get(
             f"{API_BASE_URL}/blood-pressure/elevation_check/?days={days}",
             headers=headers
         )
@@ -1,5 +1,6 @@
 import streamlit as st
-from utils.api import get_daily_steps_data
+from utils.api import conditional_get, get_daily_steps_data
+from utils.live import live_dataframe
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -12,7 +13,7 @@ import requests
 refresh_interval = 30 * 1000
 st_autorefresh(interval=refresh_interval, key='steps_autorefresh')
 
-@st.cache_data(ttl=120)
+@st.cache_data(ttl=600) # New readings are pushed by the live feed in between
 def cached_get_daily_steps_data(user_identifier, days, user_id):
     print(f"CACHE MISS: Calling API for get_daily_steps_data(days={days}) for user {user_identifier}")
     return get_daily_steps_data(days=days, user_id=user_id)
@@ -66,7 +67,8 @@ def show_daily_steps_page(user_id=None):
             st.rerun()
 
     with st.spinner("Fetching daily steps data..."):
-        steps_df = cached_get_daily_steps_data(user_identifier_for_cache, days, user_id=user_id)
+        steps_df = live_dataframe('dailysteps', cached_get_daily_steps_data, user_id=user_id,
+                                  user_identifier=user_identifier_for_cache, days=days, poll_seconds=120)
 
     if steps_df.empty:
         st.warning("No daily steps data available for the selected period. Have you synced your device?")
@@ -148,7 +150,7 @@ def run_weekly_average_analysis(days: int, user_id=None):
 
     with st.spinner(f"Analyzing {days}-Day average..."):
         try:
-            response = requests.get(endpoint_url, headers=headers, params=params)
+            response = conditional_get(endpoint_url, headers=headers, params=params)
             response.raise_for_status()
 
             data = response.json()
@@ -1,16 +1,22 @@
 import streamlit as st
+import pandas as pd
 from typing import Optional
-from utils.api import (
-    get_heart_rate_data, 
-    get_blood_pressure_data,
-    get_spo2_data,
-    get_daily_steps_data)
+from utils.api import get_dashboard, series_dataframe
 from utils.visualizations import (
     plot_heart_rate, 
     plot_blood_pressure, 
     plot_spo2_gauge,
     plot_daily_steps)
 
+TIME_PERIODS = {
+    "Last 1 hour": "1h",
+    "Last 6 hours": "6h",
+    "Last 12 hours": "12h",
+    "Last 24 hours": "24h",
+    "Last 7 days": "7d",
+    "Last 30 days": "30d",
+}
+
 def show_dashboard(user_id: Optional[int] = None):
     if user_id:
         st.title(f"Patient Health Dashboard (ID: {user_id})")
@@ -20,76 +26,52 @@ def show_dashboard(user_id: Optional[int] = None):
 
     time_period = st.selectbox(
         "Select time period:", 
-        ["Last 1 hour", "Last 6 hours", "Last 12 hours","Last 24 hours", "Last 7 days", "Last 30 days"],
+        list(TIME_PERIODS),
         index=3,
         key=f"dashboard_time_period_{user_id or 'self'}"
     )
-    
-    if time_period == "Last 1 hour":
-        hr_days, hr_hours = 0, 1
-        other_days = 1
-    elif time_period == "Last 6 hours":
-        hr_days, hr_hours = 0, 6
-        other_days = 1
-    elif time_period == "Last 12 hours":
-        hr_days, hr_hours = 0, 12
-        other_days = 1
-    elif time_period == "Last 24 hours":
-        hr_days, hr_hours = 0, 24
-        other_days = 1
-    elif time_period == "Last 7 days":
-        hr_days, hr_hours = 7, 0
-        other_days = 7
-    else:  # Last 30 days
-        hr_days, hr_hours = 30, 0
-        other_days = 30
-    
-        
-    # Get data
-    heart_rate_df = get_heart_rate_data(days=hr_days, hours=hr_hours, user_id=user_id)
-    blood_pressure_df = get_blood_pressure_data(days=other_days, user_id=user_id)
-    spo2_df =  get_spo2_data(days=other_days, user_id=user_id)
-    daily_steps_df = get_daily_steps_data(days=other_days, user_id=user_id)
+
+    # Get data: one request for every metric, series come back already bucketed
+    metrics = get_dashboard(window=TIME_PERIODS[time_period], user_id=user_id) or {}
+    heart_rate = metrics.get('heartrate', {})
+    blood_pressure = metrics.get('bloodpressure', {})
+    spo2 = metrics.get('spo2', {})
+    daily_steps = metrics.get('dailysteps', {})
 
     # Display top metrics
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        if not heart_rate_df.empty:
-            avg_hr = heart_rate_df['value'].mean()
+        avg_hr = heart_rate.get('summary', {}).get('value', {}).get('avg')
+        if avg_hr is not None:
             st.metric("Average Heart Rate", f"{avg_hr:.1f} BPM")
 
     with col2:
-        if not blood_pressure_df.empty:
-            latest_reading = blood_pressure_df.iloc[-1]
-            latest_systolic = latest_reading['systolic']
-            latest_diastolic = latest_reading['diastolic']
-            st.metric("Latest Reading", f"{latest_systolic}/{latest_diastolic} mmHg")
+        latest_reading = blood_pressure.get('latest')
+        if latest_reading:
+            st.metric("Latest Reading", f"{latest_reading['systolic']}/{latest_reading['diastolic']} mmHg")
 
     with col3:
-        if not spo2_df.empty:
-            latest_spo2 = spo2_df.iloc[-1]['value']
-            st.metric("Latest SpO₂", f"{latest_spo2:.0f}%")
+        latest_spo2 = spo2.get('latest')
+        if latest_spo2:
+            st.metric("Latest SpO₂", f"{latest_spo2['value']:.0f}%")
 
     with col4:
-        if not daily_steps_df.empty:
-            latest_entry = daily_steps_df.iloc[-1]
-            latest_steps = latest_entry['count']
-            latest_goal = latest_entry.get('goal', 10000)
-            latest_date = latest_entry['timestamp']
-            st.metric("Latest Steps", f"{latest_steps:,}", help=f"Recorded on {latest_date}")
-            st.metric("Goal", f"{latest_goal}")
+        latest_entry = daily_steps.get('latest')
+        if latest_entry:
+            st.metric("Latest Steps", f"{latest_entry['count']:,}", help=f"Recorded on {latest_entry['timestamp']}")
+            st.metric("Goal", f"{latest_entry.get('goal', 10000)}")
 
 
     # Display charts
     st.subheader("Heart Rate")
-    plot_heart_rate(heart_rate_df)
+    plot_heart_rate(series_dataframe(heart_rate, {'value_avg': 'value'}))
     
     st.subheader("Blood Pressure")
-    plot_blood_pressure(blood_pressure_df)
+    plot_blood_pressure(series_dataframe(blood_pressure, {'systolic_avg': 'systolic', 'diastolic_avg': 'diastolic'}))
 
     st.subheader("Oxygen Saturation (SpO2)")
-    plot_spo2_gauge(spo2_df)
+    plot_spo2_gauge(pd.DataFrame([spo2['latest']]) if spo2.get('latest') else pd.DataFrame())
 
     st.subheader("Daily Steps")
-    plot_daily_steps(daily_steps_df)
\ No newline at end of file
+    plot_daily_steps(series_dataframe(daily_steps, {'count_max': 'count'}))
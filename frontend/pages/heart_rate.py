@@ -1,5 +1,6 @@
 import streamlit as st
-from utils.api import get_heart_rate_data 
+from utils.api import conditional_get, get_heart_rate_data
+from utils.live import live_dataframe
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
@@ -17,7 +18,8 @@ refresh_interval = 10 * 1000
 st_autorefresh(interval=refresh_interval, key="hr_autorefresh")
 ALLOWED_ROLES = ['DOCTOR', 'NURSE', 'ADMIN']
 
-@st.cache_data(ttl=60)
+# New readings are pushed by the live feed between full fetches (see utils/live.py)
+@st.cache_data(ttl=600)
 def cached_get_heart_rate_data(user_identifier: str, fetch_days: int, fetch_hours: int, user_id: int | None = None) -> pd.DataFrame:
     """
     Fetches heart rate data from the API, cached based on user and fetch range.
@@ -148,10 +150,11 @@ def show_heart_rate_page(user_id=None):
     if can_fetch:
         with st.spinner(f"Fetching heart rate data ({time_description})..."):
             try:
-                heart_rate_df_raw = cached_get_heart_rate_data(user_identifier=user_identifier_for_cache,
-                                                           fetch_days=fetch_days,
-                                                           fetch_hours=fetch_hours,
-                                                           user_id=user_id)
+                heart_rate_df_raw = live_dataframe('heartrate', cached_get_heart_rate_data,
+                                                   user_id=user_id,
+                                                   user_identifier=user_identifier_for_cache,
+                                                   fetch_days=fetch_days,
+                                                   fetch_hours=fetch_hours)
             except Exception as e:
                 st.error(f"Error fetching heart rate data: {e}")
                 logging.exception("Exception during cached_get_heart_rate_data call")
@@ -381,7 +384,7 @@ def run_hrv_analysis():
         time_window = st.selectbox("Time window (hours)", [1, 2, 4, 8, 12, 24], index=2)
 
     with st.spinner("Calculating heart rate variablity..."):
-        response = requests.get(
+        response = conditional_get(
             f"{API_BASE_URL}/heart-rate/hrv/?time_window={time_window}", headers=headers
         )
 
@@ -425,7 +428,7 @@ def run_baseline_comparison():
     activity_param = None if baseline_activity == "all" else baseline_activity
 
     with st.spinner("Comparing to baseline..."):
-        response = requests.get(
+        response = conditional_get(
             f"{API_BASE_URL}/heart-rate/baseline_comparison/?baseline_days={baseline_days}&baseline_activity={activity_param}",
             headers=headers
         )
@@ -477,7 +480,7 @@ def run_resting_analysis():
     headers = {"Authorization": f"Bearer {st.session_state['access_token']}"}
 
     with st.spinner("Calculating resting heart rate..."):
-        response = requests.get(
+        response = conditional_get(
             f"{API_BASE_URL}/heart-rate/resting_average/",
             headers=headers
         )
@@ -1,5 +1,6 @@
 import streamlit as st
-from utils.api import get_sleep_duration_data
+from utils.api import conditional_get, get_sleep_duration_data
+from utils.live import live_dataframe
 import plotly.graph_objects as go
 import plotly.express as px
 from streamlit_autorefresh import st_autorefresh
@@ -11,7 +12,7 @@ import time
 refresh_interval = 10 * 60 * 1000
 st_autorefresh(interval=refresh_interval, key="sleep_autorefresh")
 
-@st.cache_data(ttl=300)
+@st.cache_data(ttl=600) # New readings are pushed by the live feed in between
 def cached_get_sleep_duration(user_identifier, days, user_id=None):
     print(f"CACHE MISS: Calling API for get_sleep_duration_data(days={days}) for user {user_identifier}")
     return get_sleep_duration_data(days, user_id=user_id)
@@ -79,7 +80,8 @@ def show_sleep_duration_page(user_id=None):
             st.rerun()
 
     with st.spinner("Fetching sleep data..."):
-        sleep_df = cached_get_sleep_duration(user_identifier_for_cache, days, user_id=user_id)
+        sleep_df = live_dataframe('sleepduration', cached_get_sleep_duration, user_id=user_id, time_column='end_time',
+                                  user_identifier=user_identifier_for_cache, days=days, poll_seconds=300)
 
     if sleep_df.empty:
         st.warning("No sleep data available for selected period.")
@@ -166,7 +168,7 @@ def run_sufficiency_check(age: int, user_id=None):
 
     with st.spinner("Checking sleep sufficiency..."):
         try:
-            response = requests.get(endpoint_url, headers=headers, params=params)
+            response = conditional_get(endpoint_url, headers=headers, params=params)
             response.raise_for_status()
 
             data = response.json()
@@ -209,7 +211,7 @@ def run_weekly_average_sleep(days: int, age: int = None, user_id=None):
 
     with st.spinner(f"Analyzing {days}-Days average sleep sessions..."):
         try:
-            respone = requests.get(endpoint_url, headers=headers, params=params)
+            respone = conditional_get(endpoint_url, headers=headers, params=params)
             respone.raise_for_status()
 
             data = respone.json()
@@ -1,5 +1,6 @@
 import streamlit as st
-from utils.api import get_spo2_data
+from utils.api import conditional_get, get_spo2_data
+from utils.live import live_dataframe
 import plotly.graph_objects as go
 import pandas as pd
 from streamlit_autorefresh import st_autorefresh
@@ -12,7 +13,7 @@ refresh_interval = 15 * 1000
 st_autorefresh(interval=refresh_interval, key="spo2_autorefresh")
 
 
-@st.cache_data(ttl=60) # Cache for 1 minute
+@st.cache_data(ttl=600) # New readings are pushed by the live feed in between
 def cached_get_spo2_data(user_identifier, days, user_id=None):
     print(f"CACHE MISS: Calling API for get_spo2_data(days={days}) for user {user_identifier}")
     return get_spo2_data(days, user_id=user_id)
@@ -82,7 +83,8 @@ def show_spo2_page(user_id=None):
 
     # Fetch data
     with st.spinner("Fetching SpO2 data..."):
-        spo2_df = cached_get_spo2_data(user_identifier_for_cache, days, user_id=user_id)
+        spo2_df = live_dataframe('spo2', cached_get_spo2_data, user_id=user_id,
+                                 user_identifier=user_identifier_for_cache, days=days)
 
         if time_period != "Custom range":
             start_dt_filter = now - time_deltas[time_period]
@@ -243,7 +245,7 @@ def run_lowest_reading_analysis(user_id=None):
 
     with st.spinner(f"Finding lowest reading in the last {selected_period}..."):
         try:
-            response = requests.get(endpoint_url, headers=headers, params=params)
+            response = conditional_get(endpoint_url, headers=headers, params=params)
             response.raise_for_status()
             data = response.json()
 
@@ -287,7 +289,7 @@ def run_alert_check(user_id=None):
 
     with st.spinner("Checking latest reading for alerts..."):
         try:
-            response = requests.get(endpoint_url, headers=headers, params=params)
+            response = conditional_get(endpoint_url, headers=headers, params=params)
 
             if response.status_code == 200:
                 data = response.json()
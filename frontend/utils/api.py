@@ -1,16 +1,41 @@
 import requests
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
 from datetime import datetime, timedelta
 import json
 import logging
 import time
+from collections import OrderedDict
 from functools import wraps
 from typing import Optional, List, Dict, Any
+from urllib.parse import urlparse, parse_qs
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 API_BASE_URL = "http://localhost:8000/api"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+CONDITIONAL_CACHE_SIZE = 256
+
+# Last response with an ETag per (url, params, headers), revalidated with If-None-Match
+_conditional_cache: "OrderedDict[tuple, requests.Response]" = OrderedDict()
+
+
+class CursorPage(list):
+    """A page of results that also carries the cursor of the next page (None on the last page)."""
+    def __init__(self, results, next_cursor: Optional[str] = None):
+        super().__init__(results)
+        self.next_cursor = next_cursor
+
+
+class TablePage:
+    """A page of results as a pyarrow Table, with the cursor of the next page (None on the last page)."""
+    def __init__(self, table: pa.Table, next_cursor: Optional[str] = None):
+        self.table = table
+        self.next_cursor = next_cursor
+
+    def __len__(self):
+        return self.table.num_rows
 
 
 def paginated_dataframe(
@@ -19,10 +44,14 @@ def paginated_dataframe(
         max_pages: Optional[int] = None,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        use_cursor: bool = False,
 ):
     """
     Decorator that transforms a single-page fetching function into a generator that handles pagination
     automatically, with safeguards for memory usage.
+
+    With use_cursor=True the wrapped function also receives a 'cursor' kwarg and pages are followed through
+    the API's keyset cursors instead of page numbers.
   """
     def decorator(fetch_func):
         @wraps(fetch_func)
@@ -35,8 +64,10 @@ def paginated_dataframe(
             logging.info(f"Beginning paginated fetch with page_size={page_size}")
 
             current_page = 1
+            current_cursor = None
             records_fetched = 0
             pages_fetched = 0
+            cursor_kwargs = {}
 
             while True:
                 # Handles retries for network/service failures
@@ -45,7 +76,9 @@ def paginated_dataframe(
                 while retries <= max_retries:
                     try:
                         # Call the original function to fetch a single page data
-                        page_data = fetch_func(page=current_page, page_size=page_size, *args, **kwargs)
+                        if use_cursor:
+                            cursor_kwargs = {'cursor': current_cursor}
+                        page_data = fetch_func(page=current_page, page_size=page_size, *args, **kwargs, **cursor_kwargs)
                         break
                     except requests.exceptions.HTTPError as e:
                         status_code = e.response.status_code
@@ -83,10 +116,17 @@ def paginated_dataframe(
                 yield page_data
 
                 # Update counters
-                page_size_actual = len(page_data) if isinstance(page_data, list) else 0
+                page_size_actual = len(page_data)
                 records_fetched += page_size_actual
                 pages_fetched += 1
 
+                # In cursor mode the API tells us when there is no next page
+                if use_cursor:
+                    current_cursor = getattr(page_data, 'next_cursor', None)
+                    if not current_cursor:
+                        logging.info(f"Followed the last cursor page ({current_page}) for {fetch_func.__name__}")
+                        break
+
                 # Stop if the page fetched less than requested (likely the last page)
                 if page_size_actual < page_size:
                     logging.info(f"Fetched last page ({current_page}) with {page_size_actual} records for {fetch_func.__name__}")
@@ -112,33 +152,80 @@ def paginated_dataframe(
     return decorator
             
 
+def conditional_get(url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None,
+                    timeout: float = 15) -> requests.Response:
+    """
+    requests.get() that revalidates the previous response of the same request with If-None-Match.
+    When the API answers 304 Not Modified the previous response is returned, so callers parse it as usual.
+    """
+    key = (url, tuple(sorted((params or {}).items())), tuple(sorted(headers.items())))
+    cached = _conditional_cache.get(key)
+    request_headers = dict(headers)
+    if cached is not None:
+        request_headers['If-None-Match'] = cached.headers['ETag']
+
+    response = requests.get(url, headers=request_headers, params=params, timeout=timeout)
+    if response.status_code == 304 and cached is not None:
+        logging.debug(f"Not modified since last fetch: {url} {params}")
+        _conditional_cache.move_to_end(key)
+        return cached
+
+    if response.status_code == 200 and 'ETag' in response.headers:
+        _conditional_cache[key] = response
+        _conditional_cache.move_to_end(key)
+        while len(_conditional_cache) > CONDITIONAL_CACHE_SIZE:
+            _conditional_cache.popitem(last=False)
+    return response
+
 def get_headers() -> Dict[str, str]:
     if "access_token" not in st.session_state:
         return {}
     return {"Authorization": f"Bearer {st.session_state['access_token']}"}
 
 def _fetch_paginated_data(endpoint_url:str, page: int, page_size:int, headers: Dict[str, str], 
-                          params: Optional[Dict[str, Any]] = None) -> Optional[List[Dict]]:
+                          params: Optional[Dict[str, Any]] = None, cursor: Optional[str] = None,
+                          use_cursor: bool = False, columnar: bool = False) -> Optional[List[Dict]]:
     """
     Internal helper to fetch one page from DRF endpoint.
     Returns the list of results or None if no data/error.
+
+    With use_cursor=True the endpoint's keyset pagination is used: 'cursor' is the position returned by the
+    previous page (None for the first page) and the results come back as a CursorPage holding the next cursor.
+
+    With columnar=True the page is requested as an Arrow stream and returned as a TablePage, its next link
+    being read from the Link header.
     """
     if params is None:
         params = {}
     # Add pagination params
-    params['page'] = page
+    if use_cursor:
+        params['pagination'] = 'cursor'
+        if cursor:
+            params['cursor'] = cursor
+    else:
+        params['page'] = page
     params['page_size'] = page_size
 
     try:
         logging.debug(f"Fetching page {page} from {endpoint_url} with params: {params}")
-        response = requests.get(endpoint_url, headers=headers, params=params, timeout=15)
+        if columnar:
+            headers = {**headers, 'Accept': ARROW_STREAM}
+        response = conditional_get(endpoint_url, headers, params, timeout=15)
         response.raise_for_status()
+        if columnar:
+            table = pa.ipc.open_stream(response.content).read_all()
+            if table.num_rows == 0:
+                logging.debug(f"No results found on page {page} for {endpoint_url}")
+                return None
+            return TablePage(table, _next_cursor(response.links.get('next', {}).get('url')))
         data = response.json()
         results = data['results']
 
         if not results:
             logging.debug(f"No results found on page {page} for {endpoint_url}")
             return None # No more results on this page (or endpoint is empty)
+        if use_cursor:
+            return CursorPage(results, _next_cursor(data.get('next')))
         return results
     except requests.exceptions.Timeout:
         logging.error(f"API request timed out fetching page {page} from {endpoint_url}")
@@ -148,18 +235,39 @@ def _fetch_paginated_data(endpoint_url:str, page: int, page_size:int, headers: D
     except json.JSONDecodeError as e:
         logging.error(f"Failed to decode JSON from {endpoint_url} (page {page}): {e}. Response text: {response.text[:500]}")
         raise
+    except pa.ArrowInvalid as e:
+        logging.error(f"Failed to read Arrow stream from {endpoint_url} (page {page}): {e}")
+        raise
+
+def _next_cursor(next_url: Optional[str]) -> Optional[str]:
+    """Extracts the cursor query parameter from a DRF 'next' link."""
+    if not next_url:
+        return None
+    return parse_qs(urlparse(next_url).query).get('cursor', [None])[0]
+
+def _pages_dataframe(pages: List[TablePage]) -> pd.DataFrame:
+    """
+    Concatenates Arrow pages into one DataFrame. Columns keep their Arrow types, so timestamps are
+    already timezone-aware datetimes and numeric columns need no conversion.
+    """
+    table = pa.concat_tables([page.table for page in pages])
+    return table.to_pandas(split_blocks=True, self_destruct=True)
 
 # --- Heart Rate ---
 
-@paginated_dataframe(page_size=100)
-def _get_heart_rate_pages(*, page: int, page_size: int, headers: Dict, start_datetime: str, user_id: Optional[int] = None):
+# Columns the heart rate page uses, requested with ?fields=; ids let live readings replace fetched ones
+HEART_RATE_FIELDS = ('id', 'timestamp', 'value', 'activity_level')
+
+@paginated_dataframe(page_size=1000, use_cursor=True)
+def _get_heart_rate_pages(*, page: int, page_size: int, headers: Dict, start_datetime: str, user_id: Optional[int] = None,
+                          cursor: Optional[str] = None):
     """Fetches a single page of heart rate data."""
     url = f"{API_BASE_URL}/heart-rate/"
-    params = {'start_date': start_datetime}
+    params = {'start_date': start_datetime, 'fields': ','.join(HEART_RATE_FIELDS)}
     if user_id is not None:
         params['user_id'] = user_id
     logging.debug(f"Fetching heart rate page {page} with params: {params}")
-    return _fetch_paginated_data(url, page, page_size, headers, params)
+    return _fetch_paginated_data(url, page, page_size, headers, params, cursor=cursor, use_cursor=True, columnar=True)
 
 def get_heart_rate_data(days: int = 1, hours: int = 0, user_id: Optional[int] = None) -> pd.DataFrame:
     """
@@ -167,24 +275,24 @@ def get_heart_rate_data(days: int = 1, hours: int = 0, user_id: Optional[int] =
     You can use days=0 and hours=1 to fetch just the last hour of data.
     """
     start_date_obj = datetime.now() - timedelta(days=days, hours=hours)
-    start_datetime_iso = start_date_obj.strftime('%Y-%m-%dT%H:%M:%S')
+    # Whole minutes keep the URL, and so its ETag, stable between refreshes
+    start_datetime_iso = start_date_obj.strftime('%Y-%m-%dT%H:%M:00')
     headers = get_headers()
     if not headers: return pd.DataFrame()
 
-    all_results = []
+    pages = []
     page_generator = _get_heart_rate_pages(headers=headers, start_datetime=start_datetime_iso, user_id=user_id)
     try:
         for page_data in page_generator:
-            if page_data: all_results.extend(page_data)
+            if page_data: pages.append(page_data)
     except (RuntimeError, requests.exceptions.RequestException) as e:
         # Catch errors raised by the generator/fetcher if retries failed
         st.error(f"Failed to fetch heart rate data: {e}")
         logging.error(f"Error during heart rate pagination: {e}")
         return pd.DataFrame()
     
-    if all_results:
-        df = pd.DataFrame(all_results)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', errors='coerce')
+    if pages:
+        df = _pages_dataframe(pages)
         logging.info(f"Total heart rate records processed for user {user_id or 'self'} : {len(df)}")
         if not df.empty and 'activity_level' in df.columns:
             logging.info(f"Unique activity levels in final DataFrame: {df['activity_level'].unique()}")
@@ -195,15 +303,17 @@ def get_heart_rate_data(days: int = 1, hours: int = 0, user_id: Optional[int] =
 
 # --- Daily Steps ---
 
+DAILY_STEPS_FIELDS = ('id', 'timestamp', 'count', 'goal')
+
 @paginated_dataframe(page_size=100)
 def _get_daily_steps_pages(*, page: int, page_size: int, headers: Dict, start_date: str, user_id: Optional[int] = None):
     """Fetch single page of daily steps data"""
     url = f"{API_BASE_URL}/daily-steps/"
-    params = {'start_date': start_date}
+    params = {'start_date': start_date, 'fields': ','.join(DAILY_STEPS_FIELDS)}
     if user_id is not None:
         params['user_id'] = user_id
     logging.debug(f"Fetching daily steps page {page} with params: {params}")
-    return _fetch_paginated_data(url, page, page_size, headers, params)
+    return _fetch_paginated_data(url, page, page_size, headers, params, columnar=True)
 
 
 def get_daily_steps_data(days: int = 7, user_id: Optional[int] = None) -> pd.DataFrame:
@@ -213,19 +323,18 @@ def get_daily_steps_data(days: int = 7, user_id: Optional[int] = None) -> pd.Dat
     headers = get_headers()
     if not headers: return pd.DataFrame()
 
-    all_results = []
+    pages = []
     page_generator = _get_daily_steps_pages(headers=headers, start_date=start_date, user_id=user_id)
     try:
         for page_data in page_generator:
-            if page_data: all_results.extend(page_data)
+            if page_data: pages.append(page_data)
     except (RuntimeError, requests.exceptions.RequestException) as e:
         st.error(f"Failed to fetch daily steps data: {e}")
         logging.error(f"Error during daily steps pagination: {e}")
         return pd.DataFrame()
     
-    if all_results:
-        df = pd.DataFrame(all_results)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', errors='coerce')
+    if pages:
+        df = _pages_dataframe(pages)
         #df = df[df['timestamp'].dt.date >= start_date_obj.date()]
         logging.info(f"Total daily steps records processed for user {user_id or 'self'}: {len(df)}")
         return df.sort_values(by='timestamp').reset_index(drop=True)
@@ -235,15 +344,17 @@ def get_daily_steps_data(days: int = 7, user_id: Optional[int] = None) -> pd.Dat
     
 # --- Blood Pressure ---
 
+BLOOD_PRESSURE_FIELDS = ('id', 'timestamp', 'systolic', 'diastolic')
+
 @paginated_dataframe(page_size=100)
 def _get_blood_pressure_pages(*, page: int, page_size: int, headers: Dict, start_date: str, user_id: Optional[int] = None) :
     """Fetches a single page of blood pressure data"""
     url = f"{API_BASE_URL}/blood-pressure/"
-    params = {'start_date': start_date}
+    params = {'start_date': start_date, 'fields': ','.join(BLOOD_PRESSURE_FIELDS)}
     if user_id is not None:
         params['user_id'] = user_id
     logging.debug(f"Fetching blood pressure page {page} with params: {params}") 
-    return _fetch_paginated_data(url, page, page_size, headers, params)
+    return _fetch_paginated_data(url, page, page_size, headers, params, columnar=True)
 
 def get_blood_pressure_data(days: int, user_id: Optional[int] = None):
     """Get ALL Blood pressure data, using the paginated fetcher."""
@@ -252,19 +363,18 @@ def get_blood_pressure_data(days: int, user_id: Optional[int] = None):
     headers = get_headers()
     if not headers: return pd.DataFrame()
 
-    all_results = []
+    pages = []
     page_generator = _get_blood_pressure_pages(headers=headers, start_date=start_date, user_id=user_id)
     try:
         for page_data in page_generator:
-            if page_data: all_results.extend(page_data)
+            if page_data: pages.append(page_data)
     except (RuntimeError, requests.exceptions.RequestException) as e:
         st.error(f"Failed to fetch daily steps data: {e}")
         logging.error(f"Error during daily steps pagination: {e}")
         return pd.DataFrame()
     
-    if all_results:
-        df = pd.DataFrame(all_results)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', errors='coerce')
+    if pages:
+        df = _pages_dataframe(pages)
         #df = df[df['timestamp'] >= start_date_obj]
         logging.info(f"Total blood pressure records processed for user {user_id or 'self'}: {len(df)}")
         return df.sort_values(by='timestamp').reset_index(drop=True)
@@ -274,15 +384,17 @@ def get_blood_pressure_data(days: int, user_id: Optional[int] = None):
     
 # --- Sleep Duration ---   
 
+SLEEP_DURATION_FIELDS = ('id', 'timestamp', 'start_time', 'end_time', 'duration', 'quality', 'interruptions')
+
 @paginated_dataframe(page_size=100)
 def _get_sleep_duration_pages(*, page: int, page_size: int, headers: Dict, start_date: str, user_id: Optional[int] = None):
     """Fetch single page sleep duration data"""
     url = f"{API_BASE_URL}/sleep-duration/"
-    params = {'start_date': start_date}
+    params = {'start_date': start_date, 'fields': ','.join(SLEEP_DURATION_FIELDS)}
     if user_id is not None:
         params['user_id'] = user_id
     logging.debug(f"Fetching sleep duration page {page} with params: {params}")
-    return _fetch_paginated_data(url, page, page_size, headers, params)
+    return _fetch_paginated_data(url, page, page_size, headers, params, columnar=True)
 
 def get_sleep_duration_data(days: int = 1, user_id: Optional[int] =  None) -> pd.DataFrame:
     """Get ALL Sleep Duration data, using the paginated fetcher."""
@@ -291,23 +403,20 @@ def get_sleep_duration_data(days: int = 1, user_id: Optional[int] =  None) -> pd
     headers = get_headers()
     if not headers: return pd.DataFrame()
 
-    all_results = []
+    pages = []
     page_generator = _get_sleep_duration_pages(headers=headers, start_date=start_date, user_id=user_id)
     try:
         for page_data in page_generator:
-            if page_data: all_results.extend(page_data)
+            if page_data: pages.append(page_data)
     except (RuntimeError, requests.exceptions.RequestException) as e:
         st.error(f"Failed to fetch daily steps data: {e}")
         logging.error(f"Error during daily steps pagination: {e}")
         return pd.DataFrame()
 
-    if all_results:
-        df = pd.DataFrame(all_results)
-        for col in ['timestamp', 'start_time', 'end_time']:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
-            #df = df[df['end_time'].dt.date >= start_date_obj.date()]
-            logging.info(f"Total sleep duration records processed for user {user_id or 'self'}: {len(df)}")
+    if pages:
+        df = _pages_dataframe(pages)
+        #df = df[df['end_time'].dt.date >= start_date_obj.date()]
+        logging.info(f"Total sleep duration records processed for user {user_id or 'self'}: {len(df)}")
         return df.sort_values(by='end_time').reset_index(drop=True)
     else:
         logging.info(f"No sleep duration results fetched for user {user_id or 'self'}.")
@@ -315,15 +424,18 @@ def get_sleep_duration_data(days: int = 1, user_id: Optional[int] =  None) -> pd
 
 # --- SpO2 ---
 
-@paginated_dataframe(page_size=100)
-def _get_spo2_pages(*, page: int, page_size: int, headers: Dict, start_date: str, user_id: Optional[int] = None):
+SPO2_FIELDS = ('id', 'timestamp', 'value')
+
+@paginated_dataframe(page_size=1000, use_cursor=True)
+def _get_spo2_pages(*, page: int, page_size: int, headers: Dict, start_date: str, user_id: Optional[int] = None,
+                    cursor: Optional[str] = None):
     """Fetches a single page of SpO2 data."""
     url = f"{API_BASE_URL}/spo2/"
-    params = {'start_date': start_date}
+    params = {'start_date': start_date, 'fields': ','.join(SPO2_FIELDS)}
     if user_id is not None:
         params['user_id'] = user_id
     logging.debug(f"Fetching SpO2 page {page} with params: {params}")
-    return _fetch_paginated_data(url, page, page_size, headers, params)
+    return _fetch_paginated_data(url, page, page_size, headers, params, cursor=cursor, use_cursor=True, columnar=True)
 
 def get_spo2_data(days: int = 1, user_id: Optional[int] = None) -> pd.DataFrame:
     """Get ALL SpO2 data, using the paginated fetcher."""
@@ -332,25 +444,64 @@ def get_spo2_data(days: int = 1, user_id: Optional[int] = None) -> pd.DataFrame:
     headers = get_headers()
     if not headers: return pd.DataFrame()
 
-    all_results = []
+    pages = []
     page_generator = _get_spo2_pages(headers=headers, start_date=start_date, user_id=user_id)
     try:
         for page_data in page_generator:
-            if page_data: all_results.extend(page_data)
+            if page_data: pages.append(page_data)
     except (RuntimeError, requests.exceptions.RequestException) as e:
         st.error(f"Failed to fetch daily steps data: {e}")
         logging.error(f"Error during daily steps pagination: {e}")
         return pd.DataFrame()
 
-    if all_results:
-        df = pd.DataFrame(all_results)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', errors='coerce')
+    if pages:
+        df = _pages_dataframe(pages)
         #df = df[df['timestamp'] >= start_date_obj]
         return df.sort_values(by='timestamp').reset_index(drop=True)
     else:
         logging.info(f"No sleep duration results fetched for user {user_id or 'self'}.")
     return pd.DataFrame()
 
+# --- Dashboard ---
+
+def get_dashboard(window: str = '24h', user_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Fetch latest values, window aggregates and bucketed series of every metric in one request.
+    Returns the 'metrics' mapping of the response, or None on error.
+    """
+    headers = get_headers()
+    if not headers: return None
+
+    params = {'window': window}
+    if user_id is not None:
+        params['user_id'] = user_id
+    try:
+        response = conditional_get(f"{API_BASE_URL}/dashboard/", headers, params, timeout=15)
+        response.raise_for_status()
+        return response.json()['metrics']
+    except requests.exceptions.HTTPError as e:
+        status_code = e.response.status_code
+        logging.error(f"HTTP error fetching dashboard: {e}")
+        if status_code in [401, 403]:
+            st.error(f"Authentication or Permission Error ({status_code}). Please login again or check permissions.")
+        else:
+            st.error(f"API Error ({status_code}) fetching dashboard.")
+    except (requests.exceptions.RequestException, json.JSONDecodeError, KeyError) as e:
+        logging.error(f"Error fetching dashboard: {e}")
+        st.error("Failed to fetch dashboard data.")
+    return None
+
+def series_dataframe(metric: Dict[str, Any], columns: Dict[str, str]) -> pd.DataFrame:
+    """
+    Turns a dashboard metric's bucketed series into a DataFrame with a 'timestamp' column,
+    renaming series keys (e.g. 'value_avg') to the column names the charts expect (e.g. 'value').
+    """
+    if not metric or not metric.get('series'):
+        return pd.DataFrame()
+    df = pd.DataFrame(metric['series']).rename(columns={'bucket': 'timestamp', **columns})
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', errors='coerce')
+    return df[['timestamp', *columns.values()]].dropna(subset=['timestamp'])
+
 def get_user_list() -> Optional[pd.DataFrame]:
     """Fetches the list of users accessible by the logged-in professional."""
     url = f"{API_BASE_URL}/patients/"
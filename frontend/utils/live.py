@@ -0,0 +1,132 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+import requests
+import streamlit as st
+
+from utils.api import API_BASE_URL, get_headers
+
+LIVE_URL = f"{API_BASE_URL}/live/readings/"
+
+
+class LiveFeed:
+    """
+    Background reader of the API's Server-Sent Events stream of new readings.
+
+    Readings are buffered until the next rerun drains them; the thread ends
+    when the stream fails (e.g. expired token or Redis down) and is started
+    again by live_dataframe() on a later rerun.
+    """
+    def __init__(self, metric: str, headers: Dict[str, str], user_id: Optional[int] = None):
+        self.metric = metric
+        self.params = {'metrics': metric}
+        if user_id is not None:
+            self.params['user_ids'] = str(user_id)
+        self.headers = {**headers, 'Accept': 'text/event-stream'}
+        self.buffer = deque(maxlen=50000)
+        self.connected = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True, name=f"live-{metric}-{user_id}")
+
+    def start(self) -> "LiveFeed":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def is_alive(self) -> bool:
+        return self.thread.is_alive() and not self.stopped.is_set()
+
+    def drain(self) -> List[Dict]:
+        readings = []
+        while self.buffer:
+            readings.append(self.buffer.popleft())
+        return readings
+
+    def _run(self):
+        try:
+            with requests.get(LIVE_URL, headers=self.headers, params=self.params, stream=True, timeout=(5, 60)) as response:
+                response.raise_for_status()
+                self.connected.set()
+                data = []
+                for line in response.iter_lines(decode_unicode=True):
+                    if self.stopped.is_set():
+                        break
+                    if line is None:
+                        continue
+                    if line.startswith('data:'):
+                        data.append(line[5:].strip())
+                    elif line == '' and data:
+                        self.buffer.extend(json.loads('\n'.join(data)).get('readings', []))
+                        data = []
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logging.warning(f"Live feed for {self.metric} stopped: {e}")
+        finally:
+            self.connected.clear()
+            self.stopped.set()
+
+
+def live_dataframe(
+        metric: str,
+        fetch: Callable[..., pd.DataFrame],
+        user_id: Optional[int] = None,
+        time_column: str = 'timestamp',
+        poll_seconds: int = 60,
+        **fetch_kwargs,
+) -> pd.DataFrame:
+    """
+    Returns the cached full fetch of a page plus the readings pushed since.
+
+    `fetch` is the page's st.cache_data function, called with user_id and
+    fetch_kwargs. While the live feed is connected the full fetch stays cached
+    and every rerun only appends new readings; without it the cache is cleared
+    every poll_seconds, as the pages polled before.
+    """
+    feed_key = f"live_feed_{metric}_{user_id}"
+    rows_key = f"live_rows_{metric}_{user_id}"
+    polled_key = f"live_polled_{metric}_{user_id}"
+
+    feed = st.session_state.get(feed_key)
+    if feed is None or not feed.is_alive():
+        headers = get_headers()
+        if headers:
+            feed = st.session_state[feed_key] = LiveFeed(metric, headers, user_id).start()
+            st.session_state[rows_key] = []
+
+    if feed is None or not feed.connected.is_set():
+        if time.monotonic() - st.session_state.get(polled_key, 0) > poll_seconds:
+            fetch.clear()
+            st.session_state[polled_key] = time.monotonic()
+
+    base_df = fetch(user_id=user_id, **fetch_kwargs)
+
+    rows = st.session_state.setdefault(rows_key, [])
+    if feed is not None:
+        rows.extend(feed.drain())
+    if not rows:
+        return base_df
+
+    live_df = pd.DataFrame(rows)
+    for column in (time_column, 'start_time', 'end_time'):
+        if column in live_df.columns:
+            live_df[column] = pd.to_datetime(live_df[column], format='ISO8601', errors='coerce')
+
+    if not base_df.empty and time_column in base_df.columns:
+        # Readings already in the cached fetch no longer need to be kept
+        newest = base_df[time_column].max()
+        live_df = live_df[live_df[time_column] > newest]
+        st.session_state[rows_key] = live_df.to_dict('records')
+        if live_df.empty:
+            return base_df
+
+    merged = pd.concat([base_df, live_df], ignore_index=True)
+    merged[time_column] = pd.to_datetime(merged[time_column], utc=True)
+    if 'id' in merged.columns:
+        merged = merged.drop_duplicates(subset='id', keep='last')
+    return merged.sort_values(by=time_column).reset_index(drop=True)
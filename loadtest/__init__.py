@@ -0,0 +1,9 @@
+"""
+Load-testing harness for the health monitoring API.
+
+Replays the traffic of N patient devices posting readings and M Streamlit
+tabs polling the endpoints of frontend/utils/api.py on their autorefresh
+interval, then reports p50/p95/p99 latency, error rate and throughput per
+endpoint. Self-contained: it only needs requests and a running API, see
+README.md.
+"""
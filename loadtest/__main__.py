@@ -0,0 +1,124 @@
+"""
+Command line of the load test, see README.md:
+
+    python -m loadtest --devices 500 --dashboards 100 --duration 300
+"""
+import argparse
+import logging
+import sys
+import threading
+import time
+from .clients import PAGES, ApiClient, Dashboard, Device, provision
+from .stats import Stats, format_report, write_report
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m loadtest',
+        description='Replay device and dashboard traffic against the API and report latency, errors and '
+                    'throughput per endpoint.'
+    )
+    parser.add_argument('--base-url', default='http://localhost:8000/api', help='API root, as API_BASE_URL')
+    parser.add_argument('--devices', type=int, default=100, help='Simulated patient devices')
+    parser.add_argument('--dashboards', type=int, default=20, help='Simulated Streamlit tabs')
+    parser.add_argument('--duration', type=float, default=120, help='Seconds measured, after the ramp-up')
+    parser.add_argument('--ramp-up', type=float, default=10, help='Seconds to start every client in, not measured')
+
+    devices = parser.add_argument_group('devices')
+    devices.add_argument('--hr-interval', type=float, default=60, help='Seconds between heart rates (0: none)')
+    devices.add_argument('--spo2-interval', type=float, default=300, help='Seconds between SpO2 readings (0: none)')
+    devices.add_argument('--bp-interval', type=float, default=0, help='Seconds between blood pressures (0: none)')
+    devices.add_argument('--batch', type=int, default=1, help='Readings per post; above 1 posts to the bulk endpoints')
+
+    dashboards = parser.add_argument_group('dashboards')
+    dashboards.add_argument(
+        '--page', action='append', choices=list(PAGES),
+        help='Frontend page the tabs show, may be repeated, tabs are spread over them (default: heart_rate, dashboard)'
+    )
+    dashboards.add_argument('--refresh', type=float, default=10, help='Seconds between reruns (st_autorefresh)')
+    dashboards.add_argument(
+        '--cache-ttl', type=float, default=600,
+        help='Seconds a page keeps its list fetch (st.cache_data ttl); 0 fetches on every rerun'
+    )
+    dashboards.add_argument('--staff-email', help='Staff account of the tabs, viewing the devices\' patients')
+    dashboards.add_argument('--staff-password', help='Password of --staff-email')
+
+    parser.add_argument('--prefix', default='loadtest', help='Email prefix of the device accounts')
+    parser.add_argument('--password', default='loadtest-password', help='Password of the device accounts')
+    parser.add_argument('--no-provision', action='store_true', help="Don't register missing device accounts")
+    parser.add_argument('--seed', type=int, help='Seed of the device readings')
+    parser.add_argument('--output', help='Also write the report as JSON to this file')
+    return parser.parse_args(argv)
+
+
+def patient_ids(base_url, email, password, emails):
+    """Ids of the device accounts, as listed to a staff account."""
+    client = ApiClient(base_url)
+    if not client.login(email, password):
+        raise SystemExit(f"Could not log in as {email}")
+    response = client.request('GET /patients/', 'GET', '/patients/')
+    patients = response.json() if response is not None and response.status_code == 200 else []
+    patients = patients['results'] if isinstance(patients, dict) else patients
+    ids = {patient['email']: patient['id'] for patient in patients}
+    return [ids[email] for email in emails if email in ids]
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.devices < 1 and args.dashboards < 1:
+        raise SystemExit('Nothing to run: --devices and --dashboards are both 0')
+    emails = [f'{args.prefix}-{i}@example.com' for i in range(max(args.devices, 1))]
+    if not args.no_provision:
+        logging.info(f"Registered {provision(args.base_url, emails, args.password)} device accounts")
+
+    stats = Stats()
+    stop = threading.Event()
+    intervals = {'heart-rate': args.hr_interval, 'spo2': args.spo2_interval, 'blood-pressure': args.bp_interval}
+    clients = [
+        Device(ApiClient(args.base_url, stats), email, args.password, intervals, args.batch, stop,
+               seed=None if args.seed is None else args.seed + i)
+        for i, email in enumerate(emails[:args.devices])
+    ]
+
+    pages = args.page or ['heart_rate', 'dashboard']
+    user_ids = [None] * len(emails)
+    if args.staff_email:
+        user_ids = patient_ids(args.base_url, args.staff_email, args.staff_password, emails) or user_ids
+    for i in range(args.dashboards):
+        # Patients look at their own pages, staff at their patients' pages
+        email, password = (args.staff_email, args.staff_password) if args.staff_email else (
+            emails[i % len(emails)], args.password
+        )
+        clients.append(Dashboard(
+            ApiClient(args.base_url, stats), email, password, pages[i % len(pages)], args.refresh, args.cache_ttl,
+            stop, user_id=user_ids[i % len(user_ids)]
+        ))
+
+    logging.info(f"Starting {args.devices} devices and {args.dashboards} dashboards over {args.ramp_up:g}s")
+    for client in clients:
+        client.start()
+        time.sleep(args.ramp_up / len(clients))
+
+    stats.start()
+    logging.info(f"Measuring for {args.duration:g}s")
+    try:
+        time.sleep(args.duration)
+    except KeyboardInterrupt:
+        logging.info("Interrupted, reporting what was measured so far")
+    stats.stop()
+    stop.set()
+    for client in clients:
+        client.join(timeout=5)
+
+    report = stats.report()
+    print(format_report(report))
+    if args.output:
+        write_report(report, args.output)
+    total = report['endpoints'][-1]
+    return 1 if total['requests'] == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Simulated devices and dashboards.
+
+Every client is a thread with a requests session of its own, logged in
+with a JWT like the frontend, and records each request in the shared Stats.
+"""
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+import requests
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+
+class ApiClient:
+    """A requests session against the API that times every request into Stats (if given)."""
+
+    def __init__(self, base_url: str, stats=None, timeout: float = 15):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.timeout = timeout
+        self.session = requests.Session()
+        # Last ETag per (url, params, accept), revalidated with If-None-Match like utils.api.conditional_get
+        self.etags = {}
+
+    def request(self, endpoint: str, method: str, path: str, conditional: bool = False, **kwargs):
+        """
+        Send a request, recorded under `endpoint`.
+
+        Returns:
+            The response, or None if the request got none (connection error, timeout)
+        """
+        url = path if path.startswith('http') else f"{self.base_url}{path}"
+        headers = dict(kwargs.pop('headers', None) or {})
+        key = (url, tuple(sorted((kwargs.get('params') or {}).items())), headers.get('Accept'))
+        if conditional and key in self.etags:
+            headers['If-None-Match'] = self.etags[key]
+
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+        except requests.RequestException as exc:
+            if self.stats is not None:
+                self.stats.record(endpoint, time.perf_counter() - started, type(exc).__name__)
+            return None
+        if self.stats is not None:
+            self.stats.record(endpoint, time.perf_counter() - started, response.status_code)
+
+        if conditional and response.status_code == 200 and 'ETag' in response.headers:
+            self.etags[key] = response.headers['ETag']
+        return response
+
+    def login(self, email: str, password: str) -> bool:
+        response = self.request('POST /token/', 'POST', '/token/', json={'email': email, 'password': password})
+        if response is None or response.status_code != 200:
+            return False
+        self.session.headers['Authorization'] = f"Bearer {response.json()['access']}"
+        return True
+
+
+def provision(base_url: str, emails, password: str) -> int:
+    """
+    Register patient accounts that don't exist yet (setup traffic, not measured).
+
+    Returns:
+        Number of accounts created
+    """
+    client = ApiClient(base_url)
+    created = 0
+    for email in emails:
+        response = client.request('POST /register', 'POST', '/register', json={
+            'email': email, 'password': password, 'first_name': 'Load', 'last_name': 'Test',
+            'name': 'Load Test', 'age': 40, 'gender': 'other',
+        })
+        if response is None:
+            raise RuntimeError(f"Could not reach {base_url}")
+        created += response.status_code == 201
+    return created
+
+
+def heart_rate(rng: random.Random) -> dict:
+    hour = datetime.now(timezone.utc).hour
+    level = 'sleeping' if hour < 6 or hour > 22 else 'active' if 9 <= hour < 17 else 'resting'
+    return {'value': min(180, max(40, round(rng.gauss(75, 8)))), 'activity_level': level}
+
+
+def spo2(rng: random.Random) -> dict:
+    return {'value': min(100, max(70, round(rng.gauss(97, 1)))), 'measurement_method': 'OTHER'}
+
+
+def blood_pressure(rng: random.Random) -> dict:
+    systolic = min(180, max(90, round(rng.gauss(120, 10))))
+    return {
+        'systolic': systolic,
+        'diastolic': max(60, min(systolic - 10, round(rng.gauss(80, 6)))),
+        'pulse': min(100, max(40, round(rng.gauss(72, 6)))),
+    }
+
+
+# Endpoint -> function drawing the fields of one device reading
+READINGS = {
+    'heart-rate': heart_rate,
+    'spo2': spo2,
+    'blood-pressure': blood_pressure,
+}
+
+
+class Device(threading.Thread):
+    """
+    A patient's device posting readings of each metric every `intervals[metric]` seconds.
+
+    With batch > 1, readings are buffered and posted batch at a time to the
+    metric's bulk endpoint, as devices syncing over a phone do.
+    """
+
+    def __init__(self, client: ApiClient, email: str, password: str, intervals: dict, batch: int,
+                 stop: threading.Event, seed: Optional[int] = None):
+        super().__init__(daemon=True)
+        self.client = client
+        self.email = email
+        self.password = password
+        self.intervals = {metric: seconds for metric, seconds in intervals.items() if seconds}
+        self.batch = batch
+        self.stop_event = stop
+        self.rng = random.Random(seed)
+        self.buffers = {metric: [] for metric in self.intervals}
+
+    def post(self, metric: str):
+        readings, self.buffers[metric] = self.buffers[metric], []
+        if self.batch > 1:
+            self.client.request(f'POST /{metric}/bulk/', 'POST', f'/{metric}/bulk/', json=readings)
+        else:
+            self.client.request(f'POST /{metric}/', 'POST', f'/{metric}/', json=readings[0])
+
+    def run(self):
+        if not self.client.login(self.email, self.password):
+            return
+        # Devices don't tick in lockstep: the first reading of each metric comes at a random point of its interval
+        now = time.monotonic()
+        due = {metric: now + self.rng.uniform(0, seconds) for metric, seconds in self.intervals.items()}
+        while due:
+            metric = min(due, key=due.get)
+            if self.stop_event.wait(max(0.0, due[metric] - time.monotonic())):
+                break
+            self.buffers[metric].append({
+                'timestamp': datetime.now(timezone.utc).isoformat(), 'source': 'device', **READINGS[metric](self.rng)
+            })
+            if len(self.buffers[metric]) >= self.batch:
+                self.post(metric)
+            due[metric] += self.intervals[metric]
+
+
+@dataclass(frozen=True)
+class Page:
+    """The list endpoint a frontend page fetches on a cache miss, as in frontend/utils/api.py."""
+    path: str
+    fields: Tuple[str, ...]
+    page_size: int
+    days: int
+    cursor: bool = False
+
+    def params(self):
+        start = datetime.now() - timedelta(days=self.days)
+        params = {
+            # Whole minutes (or days) keep the URL, and so its ETag, stable between refreshes
+            'start_date': start.strftime('%Y-%m-%dT%H:%M:00' if self.cursor else '%Y-%m-%d'),
+            'fields': ','.join(self.fields),
+            'page_size': self.page_size,
+        }
+        if self.cursor:
+            params['pagination'] = 'cursor'
+        else:
+            params['page'] = 1
+        return params
+
+
+# Frontend page -> its list fetch; 'dashboard' is the single request of the dashboard page
+PAGES = {
+    'heart_rate': Page('/heart-rate/', ('id', 'timestamp', 'value', 'activity_level'), 1000, 1, cursor=True),
+    'blood_pressure': Page('/blood-pressure/', ('id', 'timestamp', 'systolic', 'diastolic'), 100, 7),
+    'spo2': Page('/spo2/', ('id', 'timestamp', 'value'), 1000, 1, cursor=True),
+    'daily_steps': Page('/daily-steps/', ('id', 'timestamp', 'count', 'goal'), 100, 7),
+    'sleep_duration': Page(
+        '/sleep-duration/', ('id', 'timestamp', 'start_time', 'end_time', 'duration', 'quality', 'interruptions'), 100, 7
+    ),
+    'dashboard': None,
+}
+
+
+class Dashboard(threading.Thread):
+    """
+    A browser tab with one frontend page open, rerun by st_autorefresh every `refresh` seconds.
+
+    Like the Streamlit pages, the list fetch (following every next page) is
+    cached for `cache_ttl` seconds (st.cache_data) and revalidated with the
+    last ETag; the dashboard page requests /dashboard/ on every rerun.
+    """
+
+    def __init__(self, client: ApiClient, email: str, password: str, page: str, refresh: float, cache_ttl: float,
+                 stop: threading.Event, user_id: Optional[int] = None, max_pages: int = 10):
+        super().__init__(daemon=True)
+        self.client = client
+        self.email = email
+        self.password = password
+        self.page = page
+        self.refresh = refresh
+        self.cache_ttl = cache_ttl
+        self.stop_event = stop
+        self.user_id = user_id
+        self.max_pages = max_pages
+        self.fetched = None
+
+    def fetch_list(self, page: Page):
+        endpoint = f'GET {page.path}'
+        url, params = page.path, page.params()
+        if self.user_id is not None:
+            params['user_id'] = self.user_id
+        for _ in range(self.max_pages):
+            response = self.client.request(
+                endpoint, 'GET', url, conditional=True, params=params, headers={'Accept': ARROW_STREAM}
+            )
+            if response is None or response.status_code != 200 or 'next' not in response.links:
+                return
+            # The next link carries every parameter of the next page
+            url, params = response.links['next']['url'], None
+
+    def rerun(self):
+        if self.page == 'dashboard':
+            params = {'window': '24h'}
+            if self.user_id is not None:
+                params['user_id'] = self.user_id
+            self.client.request('GET /dashboard/', 'GET', '/dashboard/', conditional=True, params=params)
+            return
+        if self.fetched is None or time.monotonic() - self.fetched >= self.cache_ttl:
+            self.fetch_list(PAGES[self.page])
+            self.fetched = time.monotonic()
+
+    def run(self):
+        if not self.client.login(self.email, self.password):
+            return
+        # Tabs are opened at different times, so their reruns don't line up
+        if self.stop_event.wait(random.uniform(0, self.refresh)):
+            return
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            self.rerun()
+            self.stop_event.wait(max(0.0, self.refresh - (time.monotonic() - started)))
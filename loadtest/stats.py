@@ -0,0 +1,106 @@
+"""Latency, error and throughput statistics per endpoint."""
+import json
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted values, None when there are none."""
+    if not values:
+        return None
+    return values[max(1, math.ceil(q / 100 * len(values))) - 1]
+
+
+class Stats:
+    """
+    Requests recorded by every client thread, keyed by endpoint (e.g. "GET /heart-rate/").
+
+    A request is an error when it failed to connect, timed out or got a
+    4xx/5xx status; 304 Not Modified answers to revalidations are successes.
+    Requests finishing before start() (setup, ramp-up) are not recorded.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.started = None
+        self.stopped = None
+
+    def start(self):
+        with self.lock:
+            self.latencies.clear()
+            self.statuses.clear()
+            self.started = time.monotonic()
+
+    def stop(self):
+        self.stopped = time.monotonic()
+
+    def record(self, endpoint, seconds, status):
+        """status is the HTTP status code, or the exception name of a request that got no response."""
+        if self.started is None or self.stopped is not None:
+            return
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            self.statuses[endpoint][status] += 1
+
+    @staticmethod
+    def is_error(status):
+        return not isinstance(status, int) or status >= 400
+
+    def summary(self, endpoint, latencies, statuses, duration):
+        latencies = sorted(latencies)
+        errors = sum(count for status, count in statuses.items() if self.is_error(status))
+        return {
+            'endpoint': endpoint,
+            'requests': len(latencies),
+            'errors': errors,
+            'error_rate': round(errors / len(latencies), 4) if latencies else 0.0,
+            'throughput': round(len(latencies) / duration, 2) if duration else 0.0,
+            **{
+                f'p{q}_ms': None if not latencies else round(percentile(latencies, q) * 1000, 1)
+                for q in PERCENTILES
+            },
+            'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        }
+
+    def report(self):
+        """One summary per endpoint, then one of every request ('ALL'); throughput is in requests/sec."""
+        with self.lock:
+            duration = (self.stopped or time.monotonic()) - self.started
+            rows = [
+                self.summary(endpoint, self.latencies[endpoint], self.statuses[endpoint], duration)
+                for endpoint in sorted(self.latencies)
+            ]
+            total = Counter()
+            for statuses in self.statuses.values():
+                total.update(statuses)
+            rows.append(self.summary(
+                'ALL', [seconds for latencies in self.latencies.values() for seconds in latencies], total, duration
+            ))
+        return {'duration_seconds': round(duration, 1), 'endpoints': rows}
+
+
+def format_report(report):
+    """The report as a fixed-width table."""
+    columns = [
+        ('endpoint', 'Endpoint', '<40'), ('requests', 'Requests', '>9'), ('throughput', 'Req/s', '>8'),
+        ('error_rate', 'Errors', '>7'), *((f'p{q}_ms', f'p{q} ms', '>9') for q in PERCENTILES),
+    ]
+    lines = [' '.join(f'{title:{align}}' for key, title, align in columns)]
+    for row in report['endpoints']:
+        values = dict(row, error_rate=f"{row['error_rate']:.1%}")
+        lines.append(' '.join(
+            f"{'-' if values[key] is None else values[key]:{align}}" for key, title, align in columns
+        ))
+    lines.append(f"{report['duration_seconds']}s measured")
+    return '\n'.join(lines)
+
+
+def write_report(report, path):
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2)